@@ -11,6 +11,9 @@ from alembic import context
 from app.database import Base
 from app.models.patient import Patient  # noqa: F401
 from app.models.migration_checkpoint import MigrationCheckpoint  # noqa: F401
+from app.models.table_version import TableVersion  # noqa: F401
+from app.models.patient_stat import PatientStat  # noqa: F401
+from app.models.patient_deletion import PatientDeletion  # noqa: F401
 
 # this is the Alembic Config object
 config = context.config
@@ -41,6 +44,16 @@ config.set_main_option("sqlalchemy.url", sync_url)
 # add your model's MetaData object here for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Database-generated columns intentionally left off the models
+UNMAPPED_COLUMNS = {("patients", "search_vector")}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping columns the models do not map."""
+    if type_ == "column" and (object.table.name, name) in UNMAPPED_COLUMNS:
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -65,7 +78,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
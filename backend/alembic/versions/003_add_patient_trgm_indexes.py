@@ -0,0 +1,63 @@
+"""Add trigram GIN indexes for patient search
+
+Revision ID: 003_add_patient_trgm_indexes
+Revises: 002_create_migration_checkpoints
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_add_patient_trgm_indexes'
+down_revision: Union[str, None] = '002_create_migration_checkpoints'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create pg_trgm GIN indexes serving ILIKE '%term%' on patient_id and name."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Build concurrently so a large patients table stays writable. CREATE INDEX
+    # CONCURRENTLY cannot run inside a transaction, hence the autocommit block;
+    # the later index revisions follow the same pattern.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_patient_id_trgm',
+            'patients',
+            ['patient_id'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'patient_id': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_patients_name_trgm',
+            'patients',
+            ['name'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop trigram indexes (the pg_trgm extension is left installed)."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_patients_name_trgm',
+            table_name='patients',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_patients_patient_id_trgm',
+            table_name='patients',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,94 @@
+"""Add trigger-maintained full-text search vector to patients
+
+Revision ID: 004_add_patient_search_vector
+Revises: 003_add_patient_trgm_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_add_patient_search_vector'
+down_revision: Union[str, None] = '003_add_patient_trgm_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows per backfill UPDATE, each committed on its own
+BACKFILL_BATCH_ROWS = 10000
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('english'::regconfig, coalesce({row}name, '')), 'A')
+    || setweight(to_tsvector('english'::regconfig, coalesce({row}medical_condition, '')), 'B')
+"""
+
+
+def upgrade() -> None:
+    """
+    Add a tsvector over name and medical_condition with a GIN index.
+
+    A GENERATED ... STORED column would rewrite the whole table under an
+    ACCESS EXCLUSIVE lock, blocking reads and writes until it finishes.
+    Instead the column is added empty (a catalog-only change), a trigger
+    fills it on every insert and on updates of the two source columns, and
+    existing rows are backfilled in id ranges, one short transaction each.
+    Until the backfill reaches a row, full-text search does not match it.
+    """
+    op.execute("ALTER TABLE patients ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION patients_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR.format(row="NEW.")};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER patients_search_vector
+        BEFORE INSERT OR UPDATE OF name, medical_condition ON patients
+        FOR EACH ROW EXECUTE FUNCTION patients_search_vector()
+        """
+    )
+    with op.get_context().autocommit_block():
+        # Rows above max_id are inserted after the trigger exists
+        connection = op.get_bind()
+        max_id = connection.scalar(sa.text("SELECT max(id) FROM patients")) or 0
+        for start in range(0, max_id, BACKFILL_BATCH_ROWS):
+            connection.execute(
+                sa.text(
+                    f"""
+                    UPDATE patients SET search_vector = {SEARCH_VECTOR.format(row="")}
+                    WHERE id > :start AND id <= :end AND search_vector IS NULL
+                    """
+                ),
+                {"start": start, "end": start + BACKFILL_BATCH_ROWS},
+            )
+        op.create_index(
+            'ix_patients_search_vector',
+            'patients',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the search vector index, trigger and column."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_patients_search_vector',
+            table_name='patients',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.execute("DROP TRIGGER IF EXISTS patients_search_vector ON patients")
+    op.execute("DROP FUNCTION IF EXISTS patients_search_vector()")
+    op.execute("ALTER TABLE patients DROP COLUMN IF EXISTS search_vector")
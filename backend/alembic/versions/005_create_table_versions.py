@@ -0,0 +1,55 @@
+"""Create table_versions and patients version trigger
+
+Revision ID: 005_create_table_versions
+Revises: 004_add_patient_search_vector
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_create_table_versions'
+down_revision: Union[str, None] = '004_add_patient_search_vector'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the per-table change counter and bump it on every patients write."""
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=255), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+    op.execute("INSERT INTO table_versions (table_name, version) VALUES ('patients', 1)")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_versions (table_name, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Statement-level: one bump per write statement, however many rows it touches
+    op.execute(
+        """
+        CREATE TRIGGER patients_bump_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON patients
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the trigger, its function and the counter table."""
+    op.execute("DROP TRIGGER IF EXISTS patients_bump_version ON patients")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table('table_versions')
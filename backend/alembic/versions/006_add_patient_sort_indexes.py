@@ -0,0 +1,69 @@
+"""Add composite covering indexes for patient list sorts
+
+Revision ID: 006_add_patient_sort_indexes
+Revises: 005_create_table_versions
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_add_patient_sort_indexes'
+down_revision: Union[str, None] = '005_create_table_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# One index per sort_column_map entry, keyed (sort_column, id) to match
+# ORDER BY sort_column, id and the keyset predicate (sort_column, id) > (...).
+# INCLUDE carries the picker fields (patientID, name) for index-only scans.
+SORT_INDEXES = [
+    ('ix_patients_patient_id_id', ['patient_id', 'id'], ['name']),
+    ('ix_patients_name_id', ['name', 'id'], ['patient_id']),
+    ('ix_patients_age_id', ['age', 'id'], ['patient_id', 'name']),
+]
+
+
+def upgrade() -> None:
+    """Create (sort column, id) indexes and drop ix_patients_name, now a redundant prefix."""
+    # ix_patients_name goes only after ix_patients_name_id exists, so name
+    # sorts and searches always have an index to use
+    with op.get_context().autocommit_block():
+        for name, columns, include in SORT_INDEXES:
+            op.create_index(
+                name,
+                'patients',
+                columns,
+                unique=False,
+                postgresql_include=include,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.drop_index(
+            'ix_patients_name',
+            table_name='patients',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore ix_patients_name and drop the sort indexes."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_name',
+            'patients',
+            ['name'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, _, _ in reversed(SORT_INDEXES):
+            op.drop_index(
+                name,
+                table_name='patients',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
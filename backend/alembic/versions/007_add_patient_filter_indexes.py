@@ -0,0 +1,71 @@
+"""Add indexes for structured patient list filters
+
+Revision ID: 007_add_patient_filter_indexes
+Revises: 006_add_patient_sort_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_add_patient_filter_indexes'
+down_revision: Union[str, None] = '006_add_patient_sort_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create indexes for the age/gender/condition/last-visit filters.
+
+    age_min/age_max already use ix_patients_age_id (revision 006).
+    last_visit gets a BRIN index (replaced by a B-tree in revision 016:
+    last_visit is updated in place, so it does not follow row order).
+    Equality filters get B-trees whose trailing columns let counts and
+    id-ordered pages come from the index.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_last_visit_brin',
+            'patients',
+            ['last_visit'],
+            unique=False,
+            postgresql_using='brin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_patients_medical_condition_id',
+            'patients',
+            ['medical_condition', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_patients_gender_age',
+            'patients',
+            ['gender', 'age'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the filter indexes."""
+    with op.get_context().autocommit_block():
+        for name in (
+            'ix_patients_gender_age',
+            'ix_patients_medical_condition_id',
+            'ix_patients_last_visit_brin',
+        ):
+            op.drop_index(
+                name,
+                table_name='patients',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,51 @@
+"""Add text_pattern_ops prefix indexes for patient typeahead
+
+Revision ID: 008_add_patient_prefix_indexes
+Revises: 007_add_patient_filter_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_add_patient_prefix_indexes'
+down_revision: Union[str, None] = '007_add_patient_filter_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create lower(column) text_pattern_ops indexes for GET /patients/suggest.
+
+    text_pattern_ops compares byte-wise, so LIKE 'prefix%' becomes an index
+    range scan whatever the database collation. INCLUDE lets the
+    suggestions come from an index-only scan.
+    """
+    with op.get_context().autocommit_block():
+        for column in ('patient_id', 'name'):
+            op.create_index(
+                f'ix_patients_{column}_prefix',
+                'patients',
+                [sa.text(f'lower({column}) text_pattern_ops')],
+                unique=False,
+                postgresql_include=['patient_id', 'name'],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Drop the prefix indexes."""
+    with op.get_context().autocommit_block():
+        for column in ('name', 'patient_id'):
+            op.drop_index(
+                f'ix_patients_{column}_prefix',
+                table_name='patients',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,119 @@
+"""Create patient_stats summary and its maintenance triggers
+
+Revision ID: 009_create_patient_stats
+Revises: 008_add_patient_prefix_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009_create_patient_stats'
+down_revision: Union[str, None] = '008_add_patient_prefix_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Bucket expressions per dimension, applied to a patients-shaped row alias
+BUCKETS = """
+    LATERAL (VALUES
+        ('total', ''),
+        ('gender', d.gender),
+        ('condition', d.medical_condition),
+        ('age', (d.age / 10 * 10)::text),
+        ('visit_month', to_char(d.last_visit, 'YYYY-MM'))
+    ) AS b (dimension, bucket)
+"""
+
+STATS_UPSERT = """
+    INSERT INTO patient_stats (dimension, bucket, count, updated_at)
+    SELECT b.dimension, b.bucket, sum(d.sign), now()
+    FROM ({source}) AS d, {buckets}
+    GROUP BY b.dimension, b.bucket
+    HAVING sum(d.sign) <> 0
+    ON CONFLICT (dimension, bucket) DO UPDATE
+    SET count = patient_stats.count + EXCLUDED.count, updated_at = EXCLUDED.updated_at;
+"""
+OLD_ROWS = "SELECT gender, medical_condition, age, last_visit, -1 AS sign FROM old_rows"
+NEW_ROWS = "SELECT gender, medical_condition, age, last_visit, 1 AS sign FROM new_rows"
+
+
+def _upsert(source: str) -> str:
+    """Render STATS_UPSERT for a (gender, medical_condition, age, last_visit, sign) source."""
+    return STATS_UPSERT.format(source=source, buckets=BUCKETS)
+
+
+def upgrade() -> None:
+    """Create the summary table, install its triggers and backfill it from patients."""
+    op.create_table(
+        'patient_stats',
+        sa.Column('dimension', sa.String(length=50), nullable=False),
+        sa.Column('bucket', sa.String(length=255), nullable=False),
+        sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint('dimension', 'bucket'),
+    )
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION apply_patient_stats() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM patient_stats;
+            ELSIF TG_OP = 'INSERT' THEN
+                {_upsert(NEW_ROWS)}
+            ELSIF TG_OP = 'DELETE' THEN
+                {_upsert(OLD_ROWS)}
+            ELSE
+                {_upsert(f"{OLD_ROWS} UNION ALL {NEW_ROWS}")}
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Statement-level with transition tables: one aggregated upsert per statement
+    op.execute(
+        "CREATE TRIGGER patients_stats_insert AFTER INSERT ON patients "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION apply_patient_stats()"
+    )
+    op.execute(
+        "CREATE TRIGGER patients_stats_update AFTER UPDATE ON patients "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION apply_patient_stats()"
+    )
+    op.execute(
+        "CREATE TRIGGER patients_stats_delete AFTER DELETE ON patients "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION apply_patient_stats()"
+    )
+    op.execute(
+        "CREATE TRIGGER patients_stats_truncate AFTER TRUNCATE ON patients "
+        "FOR EACH STATEMENT EXECUTE FUNCTION apply_patient_stats()"
+    )
+    # CREATE TRIGGER holds a lock that blocks patients writes until this
+    # transaction commits, so no write can slip between backfill and triggers
+    op.execute(
+        f"""
+        INSERT INTO patient_stats (dimension, bucket, count, updated_at)
+        SELECT b.dimension, b.bucket, count(*), now()
+        FROM patients AS d, {BUCKETS}
+        GROUP BY b.dimension, b.bucket
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the triggers, their function and the summary table."""
+    for operation in ('truncate', 'delete', 'update', 'insert'):
+        op.execute(f"DROP TRIGGER IF EXISTS patients_stats_{operation} ON patients")
+    op.execute("DROP FUNCTION IF EXISTS apply_patient_stats()")
+    op.drop_table('patient_stats')
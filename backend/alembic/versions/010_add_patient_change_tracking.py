@@ -0,0 +1,78 @@
+"""Add patient deletion log and updated_at index for delta sync
+
+Revision ID: 010_add_patient_change_tracking
+Revises: 009_create_patient_stats
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_add_patient_change_tracking'
+down_revision: Union[str, None] = '009_create_patient_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create patient_deletions, log deletes into it and index patients by (updated_at, id)."""
+    op.create_table(
+        'patient_deletions',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('patient_pk', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.String(length=50), nullable=False),
+        sa.Column(
+            'deleted_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION log_patient_deletions() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO patient_deletions (patient_pk, patient_id)
+            SELECT id, patient_id FROM old_rows ORDER BY id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER patients_log_deletions AFTER DELETE ON patients
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION log_patient_deletions()
+        """
+    )
+    # Outside the trigger's transaction: the delete log is already live, and
+    # the sync index can take as long as it needs on a large table
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_updated_at_id',
+            'patients',
+            ['updated_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the index, the deletion trigger, its function and the log."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_patients_updated_at_id',
+            table_name='patients',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.execute("DROP TRIGGER IF EXISTS patients_log_deletions ON patients")
+    op.execute("DROP FUNCTION IF EXISTS log_patient_deletions()")
+    op.drop_table('patient_deletions')
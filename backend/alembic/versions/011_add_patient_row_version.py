@@ -0,0 +1,31 @@
+"""Add patients.version for optimistic concurrency
+
+Revision ID: 011_add_patient_row_version
+Revises: 010_add_patient_change_tracking
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011_add_patient_row_version'
+down_revision: Union[str, None] = '010_add_patient_change_tracking'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the row version; a constant default makes this a catalog-only change."""
+    op.add_column(
+        'patients',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Drop the row version."""
+    op.drop_column('patients', 'version')
@@ -0,0 +1,127 @@
+"""Send patient change events with NOTIFY from statement-level triggers
+
+Revision ID: 012_add_patient_notify_triggers
+Revises: 011_add_patient_row_version
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012_add_patient_notify_triggers'
+down_revision: Union[str, None] = '011_add_patient_row_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Install notify_patient_events and its statement-level triggers on patients."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_patient_events() RETURNS trigger AS $$
+        BEGIN
+            -- Statements changing more than 1000 rows send one resync event;
+            -- others send their events in JSON arrays of 50 per NOTIFY
+            -- (payloads are capped at 8000 bytes)
+            IF TG_OP = 'TRUNCATE' THEN
+                PERFORM pg_notify('patient_events', '[{"type":"resync"}]');
+            ELSIF TG_OP = 'INSERT' THEN
+                IF (SELECT count(*) FROM new_rows) > 1000 THEN
+                    PERFORM pg_notify('patient_events', '[{"type":"resync"}]');
+                ELSE
+                    PERFORM pg_notify('patient_events', c.payload)
+                    FROM (
+                        SELECT json_agg(
+                            json_build_object(
+                                'type', 'created', 'id', r.id, 'patientID', r.patient_id
+                            )
+                            ORDER BY r.id
+                        )::text AS payload
+                        FROM (
+                            SELECT id, patient_id,
+                                   (row_number() OVER (ORDER BY id) - 1) / 50 AS chunk
+                            FROM new_rows
+                        ) AS r
+                        GROUP BY r.chunk
+                        ORDER BY r.chunk
+                    ) AS c;
+                END IF;
+            ELSIF TG_OP = 'UPDATE' THEN
+                IF (SELECT count(*) FROM new_rows) > 1000 THEN
+                    PERFORM pg_notify('patient_events', '[{"type":"resync"}]');
+                ELSE
+                    PERFORM pg_notify('patient_events', c.payload)
+                    FROM (
+                        SELECT json_agg(
+                            json_build_object(
+                                'type', 'updated', 'id', r.id, 'patientID', r.patient_id
+                            )
+                            ORDER BY r.id
+                        )::text AS payload
+                        FROM (
+                            SELECT id, patient_id,
+                                   (row_number() OVER (ORDER BY id) - 1) / 50 AS chunk
+                            FROM new_rows
+                        ) AS r
+                        GROUP BY r.chunk
+                        ORDER BY r.chunk
+                    ) AS c;
+                END IF;
+            ELSE
+                IF (SELECT count(*) FROM old_rows) > 1000 THEN
+                    PERFORM pg_notify('patient_events', '[{"type":"resync"}]');
+                ELSE
+                    PERFORM pg_notify('patient_events', c.payload)
+                    FROM (
+                        SELECT json_agg(
+                            json_build_object(
+                                'type', 'deleted', 'id', r.id, 'patientID', r.patient_id
+                            )
+                            ORDER BY r.id
+                        )::text AS payload
+                        FROM (
+                            SELECT id, patient_id,
+                                   (row_number() OVER (ORDER BY id) - 1) / 50 AS chunk
+                            FROM old_rows
+                        ) AS r
+                        GROUP BY r.chunk
+                        ORDER BY r.chunk
+                    ) AS c;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Statement-level with transition tables: a few NOTIFYs per statement,
+    # queued inside the writing transaction and delivered only on commit
+    op.execute(
+        "CREATE TRIGGER patients_notify_insert AFTER INSERT ON patients "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION notify_patient_events()"
+    )
+    op.execute(
+        "CREATE TRIGGER patients_notify_update AFTER UPDATE ON patients "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION notify_patient_events()"
+    )
+    op.execute(
+        "CREATE TRIGGER patients_notify_delete AFTER DELETE ON patients "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION notify_patient_events()"
+    )
+    op.execute(
+        "CREATE TRIGGER patients_notify_truncate AFTER TRUNCATE ON patients "
+        "FOR EACH STATEMENT EXECUTE FUNCTION notify_patient_events()"
+    )
+
+
+def downgrade() -> None:
+    """Drop the notify triggers and their function."""
+    for operation in ('truncate', 'delete', 'update', 'insert'):
+        op.execute(f"DROP TRIGGER IF EXISTS patients_notify_{operation} ON patients")
+    op.execute("DROP FUNCTION IF EXISTS notify_patient_events()")
@@ -0,0 +1,98 @@
+"""Split the table_versions counter into per-writer slots
+
+Revision ID: 013_add_table_version_slots
+Revises: 012_add_patient_notify_triggers
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_add_table_version_slots'
+down_revision: Union[str, None] = '012_add_patient_notify_triggers'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Key table_versions by (table_name, slot) and bump a slot per write transaction."""
+    # One row per table, so rebuilding the key is instant
+    op.add_column(
+        'table_versions',
+        sa.Column('slot', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.drop_constraint('table_versions_pkey', 'table_versions', type_='primary')
+    op.create_primary_key('table_versions_pkey', 'table_versions', ['table_name', 'slot'])
+    op.execute(
+        """
+        INSERT INTO table_versions (table_name, slot, version)
+        SELECT 'patients', slot, 0 FROM generate_series(0, 15) AS slot
+        ON CONFLICT (table_name, slot) DO NOTHING
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION table_version_slot(tracked_table text) RETURNS integer AS $$
+        DECLARE
+            setting text := 'table_versions.' || tracked_table;
+            held integer := nullif(current_setting(setting, true), '')::integer;
+        BEGIN
+            IF held IS NULL THEN
+                SELECT tv.slot INTO held FROM table_versions AS tv
+                WHERE tv.table_name = tracked_table
+                ORDER BY tv.slot
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED;
+                held := coalesce(held, pg_backend_pid() % 16);
+                PERFORM set_config(setting, held::text, true);
+            END IF;
+            RETURN held;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_versions (table_name, slot, version)
+            VALUES (TG_TABLE_NAME, table_version_slot(TG_TABLE_NAME), 1)
+            ON CONFLICT (table_name, slot) DO UPDATE SET version = table_versions.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+
+def downgrade() -> None:
+    """Fold the slots into one row per table and restore the single-row trigger."""
+    # Lock out writers so no trigger bumps a slot while they are folded
+    op.execute("LOCK TABLE patients IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_versions (table_name, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP FUNCTION IF EXISTS table_version_slot(text)")
+    op.execute(
+        """
+        INSERT INTO table_versions (table_name, slot, version)
+        SELECT table_name, 0, sum(version) FROM table_versions GROUP BY table_name
+        ON CONFLICT (table_name, slot) DO UPDATE SET version = EXCLUDED.version
+        """
+    )
+    op.execute("DELETE FROM table_versions WHERE slot <> 0")
+    op.drop_constraint('table_versions_pkey', 'table_versions', type_='primary')
+    op.drop_column('table_versions', 'slot')
+    op.create_primary_key('table_versions_pkey', 'table_versions', ['table_name'])
@@ -0,0 +1,196 @@
+"""Split patient_stats counts into per-writer slots
+
+Revision ID: 014_add_patient_stat_slots
+Revises: 013_add_table_version_slots
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014_add_patient_stat_slots'
+down_revision: Union[str, None] = '013_add_table_version_slots'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Key patient_stats by (dimension, bucket, slot) and add deltas to the writer's slot."""
+    # A few dozen rows, so rebuilding the key is instant
+    op.add_column(
+        'patient_stats',
+        sa.Column('slot', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.drop_constraint('patient_stats_pkey', 'patient_stats', type_='primary')
+    op.create_primary_key(
+        'patient_stats_pkey', 'patient_stats', ['dimension', 'bucket', 'slot']
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION apply_patient_stats() RETURNS trigger AS $$
+        DECLARE
+            write_slot integer := table_version_slot('patients');
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM patient_stats;
+            ELSIF TG_OP = 'INSERT' THEN
+                INSERT INTO patient_stats (dimension, bucket, slot, count, updated_at)
+                SELECT b.dimension, b.bucket, write_slot, sum(d.sign), now()
+                FROM (
+                    SELECT gender, medical_condition, age, last_visit, 1 AS sign
+                    FROM new_rows
+                ) AS d,
+                LATERAL (VALUES
+                    ('total', ''),
+                    ('gender', d.gender),
+                    ('condition', d.medical_condition),
+                    ('age', (d.age / 10 * 10)::text),
+                    ('visit_month', to_char(d.last_visit, 'YYYY-MM'))
+                ) AS b (dimension, bucket)
+                GROUP BY b.dimension, b.bucket
+                HAVING sum(d.sign) <> 0
+                ON CONFLICT (dimension, bucket, slot) DO UPDATE
+                SET count = patient_stats.count + EXCLUDED.count,
+                    updated_at = EXCLUDED.updated_at;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO patient_stats (dimension, bucket, slot, count, updated_at)
+                SELECT b.dimension, b.bucket, write_slot, sum(d.sign), now()
+                FROM (
+                    SELECT gender, medical_condition, age, last_visit, -1 AS sign
+                    FROM old_rows
+                ) AS d,
+                LATERAL (VALUES
+                    ('total', ''),
+                    ('gender', d.gender),
+                    ('condition', d.medical_condition),
+                    ('age', (d.age / 10 * 10)::text),
+                    ('visit_month', to_char(d.last_visit, 'YYYY-MM'))
+                ) AS b (dimension, bucket)
+                GROUP BY b.dimension, b.bucket
+                HAVING sum(d.sign) <> 0
+                ON CONFLICT (dimension, bucket, slot) DO UPDATE
+                SET count = patient_stats.count + EXCLUDED.count,
+                    updated_at = EXCLUDED.updated_at;
+            ELSE
+                INSERT INTO patient_stats (dimension, bucket, slot, count, updated_at)
+                SELECT b.dimension, b.bucket, write_slot, sum(d.sign), now()
+                FROM (
+                    SELECT gender, medical_condition, age, last_visit, -1 AS sign
+                    FROM old_rows
+                    UNION ALL
+                    SELECT gender, medical_condition, age, last_visit, 1 AS sign
+                    FROM new_rows
+                ) AS d,
+                LATERAL (VALUES
+                    ('total', ''),
+                    ('gender', d.gender),
+                    ('condition', d.medical_condition),
+                    ('age', (d.age / 10 * 10)::text),
+                    ('visit_month', to_char(d.last_visit, 'YYYY-MM'))
+                ) AS b (dimension, bucket)
+                GROUP BY b.dimension, b.bucket
+                HAVING sum(d.sign) <> 0
+                ON CONFLICT (dimension, bucket, slot) DO UPDATE
+                SET count = patient_stats.count + EXCLUDED.count,
+                    updated_at = EXCLUDED.updated_at;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+
+def downgrade() -> None:
+    """Fold the slots into one row per bucket and restore the single-row trigger."""
+    # Lock out writers so no trigger adds to a slot while they are folded
+    op.execute("LOCK TABLE patients IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION apply_patient_stats() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM patient_stats;
+            ELSIF TG_OP = 'INSERT' THEN
+                INSERT INTO patient_stats (dimension, bucket, count, updated_at)
+                SELECT b.dimension, b.bucket, sum(d.sign), now()
+                FROM (
+                    SELECT gender, medical_condition, age, last_visit, 1 AS sign
+                    FROM new_rows
+                ) AS d,
+                LATERAL (VALUES
+                    ('total', ''),
+                    ('gender', d.gender),
+                    ('condition', d.medical_condition),
+                    ('age', (d.age / 10 * 10)::text),
+                    ('visit_month', to_char(d.last_visit, 'YYYY-MM'))
+                ) AS b (dimension, bucket)
+                GROUP BY b.dimension, b.bucket
+                HAVING sum(d.sign) <> 0
+                ON CONFLICT (dimension, bucket) DO UPDATE
+                SET count = patient_stats.count + EXCLUDED.count,
+                    updated_at = EXCLUDED.updated_at;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO patient_stats (dimension, bucket, count, updated_at)
+                SELECT b.dimension, b.bucket, sum(d.sign), now()
+                FROM (
+                    SELECT gender, medical_condition, age, last_visit, -1 AS sign
+                    FROM old_rows
+                ) AS d,
+                LATERAL (VALUES
+                    ('total', ''),
+                    ('gender', d.gender),
+                    ('condition', d.medical_condition),
+                    ('age', (d.age / 10 * 10)::text),
+                    ('visit_month', to_char(d.last_visit, 'YYYY-MM'))
+                ) AS b (dimension, bucket)
+                GROUP BY b.dimension, b.bucket
+                HAVING sum(d.sign) <> 0
+                ON CONFLICT (dimension, bucket) DO UPDATE
+                SET count = patient_stats.count + EXCLUDED.count,
+                    updated_at = EXCLUDED.updated_at;
+            ELSE
+                INSERT INTO patient_stats (dimension, bucket, count, updated_at)
+                SELECT b.dimension, b.bucket, sum(d.sign), now()
+                FROM (
+                    SELECT gender, medical_condition, age, last_visit, -1 AS sign
+                    FROM old_rows
+                    UNION ALL
+                    SELECT gender, medical_condition, age, last_visit, 1 AS sign
+                    FROM new_rows
+                ) AS d,
+                LATERAL (VALUES
+                    ('total', ''),
+                    ('gender', d.gender),
+                    ('condition', d.medical_condition),
+                    ('age', (d.age / 10 * 10)::text),
+                    ('visit_month', to_char(d.last_visit, 'YYYY-MM'))
+                ) AS b (dimension, bucket)
+                GROUP BY b.dimension, b.bucket
+                HAVING sum(d.sign) <> 0
+                ON CONFLICT (dimension, bucket) DO UPDATE
+                SET count = patient_stats.count + EXCLUDED.count,
+                    updated_at = EXCLUDED.updated_at;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO patient_stats (dimension, bucket, slot, count, updated_at)
+        SELECT dimension, bucket, 0, sum(count), max(updated_at)
+        FROM patient_stats GROUP BY dimension, bucket
+        ON CONFLICT (dimension, bucket, slot) DO UPDATE
+        SET count = EXCLUDED.count, updated_at = EXCLUDED.updated_at
+        """
+    )
+    op.execute("DELETE FROM patient_stats WHERE slot <> 0")
+    op.drop_constraint('patient_stats_pkey', 'patient_stats', type_='primary')
+    op.drop_column('patient_stats', 'slot')
+    op.create_primary_key('patient_stats_pkey', 'patient_stats', ['dimension', 'bucket'])
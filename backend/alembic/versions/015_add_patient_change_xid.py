@@ -0,0 +1,84 @@
+"""Order delta sync by writing transaction id instead of updated_at
+
+Revision ID: 015_add_patient_change_xid
+Revises: 014_add_patient_stat_slots
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '015_add_patient_change_xid'
+down_revision: Union[str, None] = '014_add_patient_stat_slots'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGE_XID = "pg_current_xact_id()::text::bigint"
+
+
+def upgrade() -> None:
+    """Add change_xid to patients and patient_deletions and index both by (change_xid, id)."""
+    # A constant default keeps the ADD COLUMN catalog-only; existing rows sort
+    # first, and new writes take their transaction id from the next default
+    for table in ('patients', 'patient_deletions'):
+        op.add_column(
+            table,
+            sa.Column('change_xid', sa.BigInteger(), server_default='0', nullable=False),
+        )
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN change_xid SET DEFAULT ({CHANGE_XID})")
+    # Swap the sync index under live writes: the app reads (change_xid, id)
+    # from this release on, so the (updated_at, id) index is dead weight
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_change_xid_id',
+            'patients',
+            ['change_xid', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_patient_deletions_change_xid_id',
+            'patient_deletions',
+            ['change_xid', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_patients_updated_at_id',
+            table_name='patients',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore the (updated_at, id) index and drop change_xid with its indexes."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_updated_at_id',
+            'patients',
+            ['updated_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_patient_deletions_change_xid_id',
+            table_name='patient_deletions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_patients_change_xid_id',
+            table_name='patients',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('patient_deletions', 'change_xid')
+    op.drop_column('patients', 'change_xid')
@@ -0,0 +1,65 @@
+"""Replace the last_visit BRIN index with a B-tree
+
+Revision ID: 016_add_patient_last_visit_btree
+Revises: 015_add_patient_change_xid
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '016_add_patient_last_visit_btree'
+down_revision: Union[str, None] = '015_add_patient_change_xid'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Index last_visit with a (last_visit, id) B-tree instead of BRIN.
+
+    BRIN only prunes when a column follows the physical row order, but
+    last_visit is rewritten in place on every visit, so updated rows land
+    wherever there is free space and each block range soon spans most
+    dates. The B-tree serves the range filter whatever the row order.
+    """
+    # The B-tree is in place before the BRIN index goes, so date filters
+    # always have an index while both builds run without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_last_visit_id',
+            'patients',
+            ['last_visit', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_patients_last_visit_brin',
+            table_name='patients',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Restore the BRIN index and drop the B-tree."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patients_last_visit_brin',
+            'patients',
+            ['last_visit'],
+            unique=False,
+            postgresql_using='brin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_patients_last_visit_id',
+            table_name='patients',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
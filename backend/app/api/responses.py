@@ -0,0 +1,21 @@
+"""Response classes shared by API routes."""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response rendered by orjson in a single pass.
+
+    Routes that return plain dicts/lists (e.g. rows read without the ORM)
+    can hand them straight to this class, skipping response-model
+    validation and FastAPI's jsonable_encoder. Dates and datetimes are
+    written in ISO 8601, as pydantic would.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Serialize content to JSON bytes."""
+        return orjson.dumps(content)
@@ -1,43 +1,245 @@
 """Patient API routes."""
 
+import csv
+import hashlib
+import io
+import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import date
+from typing import Literal
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
+from app.api.responses import OrjsonResponse
+from app.config import settings
 from app.database import get_db
 from app.schemas.patient import (
+    BulkPatientResponse,
+    PatientBatchRequest,
+    PatientBatchResponse,
+    PatientChangesResponse,
     PatientCreate,
+    PatientImportResponse,
     PatientUpdate,
     PatientResponse,
+    PatientStatsResponse,
+    PatientSuggestion,
     PaginatedResponse,
 )
 from app.services.patient_service import (
+    PatientFilters,
+    PatientVersionConflictError,
+    bulk_upsert_patients,
     get_all_patients,
+    get_patient_changes,
     get_patient_by_patient_id,
+    get_patient_version,
+    get_patients_version,
+    get_patient_stats,
     create_patient,
+    import_patients,
+    parse_facets,
+    parse_fields,
+    run_patient_batch,
+    response_field_columns,
     search_patients,
+    patient_event_broker,
+    stream_patients,
+    subscribe_patient_events,
+    suggest_patients,
     update_patient,
     delete_patient,
 )
+from app.services.idempotency import IdempotencyKeyReusedError, IdempotencyStore, StoredResponse
+from app.services.patient_import import read_patient_batches
 from math import ceil
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/patients", tags=["patients"])
 
+# Clients may reuse a cached copy only after revalidating it with If-None-Match
+CACHE_CONTROL = "no-cache"
+
+# First responses to POST/PUT requests sent with an Idempotency-Key
+idempotency_store = IdempotencyStore(settings.idempotency_cache_size, settings.idempotency_ttl)
+
+
+def _patient_etag(pk: int, version: int, fields: tuple[str, ...] | None = None) -> str:
+    """
+    Strong ETag for a single patient, derived from its id and row version.
+
+    A sparse fieldset is a different representation, so it gets its own tag.
+    """
+    if fields and len(fields) < len(response_field_columns):
+        digest = hashlib.blake2b(",".join(fields).encode(), digest_size=4).hexdigest()
+        return f'"{pk}-{version}-{digest}"'
+    return f'"{pk}-{version}"'
+
+
+def _if_match_versions(if_match: str) -> list[tuple[int, int]] | None:
+    """
+    Parse an If-Match header into the (id, version) pairs of its patient ETags.
+
+    Returns None for ``*`` (any current version). Weak tags never match
+    (If-Match uses strong comparison) and unknown tags are ignored, so an
+    empty list means the precondition cannot hold.
+    """
+    if if_match.strip() == "*":
+        return None
+    expected = []
+    for tag in (tag.strip() for tag in if_match.split(",")):
+        if not (len(tag) > 1 and tag.startswith('"') and tag.endswith('"')):
+            continue
+        parts = tag[1:-1].split("-")
+        if len(parts) in (2, 3) and parts[0].isdigit() and parts[1].isdigit():
+            expected.append((int(parts[0]), int(parts[1])))
+    return expected
+
+
+def _list_etag(version: int, request: Request) -> str:
+    """Strong ETag for a list response: collection version plus normalized query."""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2b(query.encode(), digest_size=8).hexdigest()
+    return f'"v{version}-{digest}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def _not_modified(etag: str) -> Response:
+    """Build an empty 304 response carrying the current validator."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+async def _idempotent(
+    idempotency_key: str,
+    request_line: str,
+    payload: BaseModel,
+    execute: Callable[[], Awaitable[Response]],
+    headers: dict[str, str | None] | None = None,
+) -> Response:
+    """
+    Run a write once per Idempotency-Key and replay its response to retries.
+
+    The key is bound to the request line, the given request headers and the
+    body that first used it. Pass every header that can change the outcome
+    (e.g. If-Match), so that a retry with a different precondition is
+    rejected instead of replaying a response it would not have produced.
+    Both the success response (with its ETag) and 4xx errors are replayed;
+    5xx errors are not stored, so a retry runs the write again. Replays
+    carry an Idempotent-Replayed: true header.
+
+    Raises:
+        HTTPException: 422 if the key was already used for a different request
+    """
+    request_headers = "".join(
+        f"{name}: {value}\n" for name, value in sorted((headers or {}).items()) if value is not None
+    )
+    fingerprint = hashlib.blake2b(
+        f"{request_line}\n{request_headers}{payload.model_dump_json(exclude_unset=True)}".encode(),
+        digest_size=16,
+    ).hexdigest()
+
+    async def render() -> StoredResponse:
+        try:
+            response = await execute()
+        except HTTPException as e:
+            response = OrjsonResponse({"detail": e.detail}, status_code=e.status_code)
+        headers = {"ETag": response.headers["etag"]} if "etag" in response.headers else {}
+        return StoredResponse(
+            status_code=response.status_code, body=response.body, headers=headers
+        )
+
+    try:
+        stored, replayed = await idempotency_store.run(idempotency_key, fingerprint, render)
+    except IdempotencyKeyReusedError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request",
+        )
+    response_headers = dict(stored.headers)
+    if replayed:
+        response_headers["Idempotent-Replayed"] = "true"
+    return Response(
+        content=stored.body,
+        status_code=stored.status_code,
+        media_type=OrjsonResponse.media_type,
+        headers=response_headers,
+    )
+
+
+def patient_filters(
+    age_min: int | None = None,
+    age_max: int | None = None,
+    gender: Literal["Male", "Female", "Other"] | None = None,
+    medical_condition: str | None = None,
+    last_visit_from: date | None = None,
+    last_visit_to: date | None = None,
+) -> PatientFilters:
+    """
+    Collect the structured list filters from the query string.
+
+    Query Parameters:
+        age_min, age_max: Inclusive age range (optional)
+        gender: Male, Female or Other (optional)
+        medical_condition: Exact medical condition (optional)
+        last_visit_from, last_visit_to: Inclusive last-visit date range,
+            YYYY-MM-DD (optional)
+
+    Raises:
+        HTTPException: 400 if a range is empty (min greater than max)
+    """
+    filters = PatientFilters(
+        age_min=age_min,
+        age_max=age_max,
+        gender=gender,
+        medical_condition=medical_condition,
+        last_visit_from=last_visit_from,
+        last_visit_to=last_visit_to,
+    )
+    try:
+        filters.validate()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return filters
+
 
-@router.get("", response_model=PaginatedResponse)
+@router.get("", response_model=PaginatedResponse, response_class=OrjsonResponse)
 async def get_patients(
+    request: Request,
     search: str | None = None,
     page: int = 1,
     page_size: int = 20,
     sort_by: str = "patientID",
     sort_order: str = "asc",
+    cursor: str | None = None,
+    count: Literal["exact", "estimated", "none"] = "exact",
+    search_mode: Literal["substring", "fulltext"] = "substring",
+    fields: str | None = None,
+    facets: str | None = None,
+    filters: PatientFilters = Depends(patient_filters),
+    if_none_match: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Get patients with search, pagination, and sorting.
+    Get patients with search, filters, pagination, and sorting.
 
     Query Parameters:
         search: Search term to filter by patientID or name (optional)
@@ -45,43 +247,80 @@ async def get_patients(
         page_size: Number of items per page (default: 20)
         sort_by: Field to sort by - patientID, name, or age (default: patientID)
         sort_order: Sort order - asc or desc (default: asc)
+        cursor: Keyset cursor from a previous response's next_cursor (optional).
+            When given, page is ignored and the page after the cursor is returned.
+        count: Count strategy - exact, estimated (planner statistics, unfiltered
+            lists only) or none (skip the total, rely on has_more) (default: exact).
+            Pages requested with a cursor are never counted (count_mode none).
+        search_mode: substring matches patientID/name; fulltext matches words in
+            name/medicalCondition ranked by relevance (default: substring)
+        fields: Comma-separated PatientResponse fields to return, e.g.
+            patientID,name (default: all fields)
+        facets: Comma-separated facets to count over all matches - gender,
+            medicalCondition (default: none)
+        age_min, age_max, gender, medical_condition, last_visit_from,
+            last_visit_to: Structured filters, see patient_filters
+
+    Headers:
+        If-None-Match: ETag from a previous response; answered with 304 Not
+            Modified (checked against the collection version only) if unchanged
 
     Returns:
-        Paginated response with patients list and metadata
+        Paginated response with patients list and metadata, serialized from
+        plain rows by orjson (PaginatedResponse documents the shape)
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid for the requested sort or
+            fields/facets names an unknown field
     """
     try:
-        # Normalize sort_by to match database column names
-        sort_by_map = {
-            "patientID": "patient_id",
-            "patient_id": "patient_id",
-            "name": "name",
-            "age": "age",
-        }
-        sort_by_db = sort_by_map.get(sort_by, "patient_id")
-
-        patients, total = await search_patients(
+        selected_fields = parse_fields(fields)
+        selected_facets = parse_facets(facets)
+
+        if if_none_match:
+            etag = _list_etag(await get_patients_version(db), request)
+            if _etag_matches(if_none_match, etag):
+                return _not_modified(etag)
+
+        result = await search_patients(
             db=db,
             search=search,
             page=page,
             page_size=page_size,
-            sort_by=sort_by_db,
+            sort_by=sort_by,
             sort_order=sort_order,
+            cursor=cursor,
+            count=count,
+            search_mode=search_mode,
+            fields=selected_fields,
+            filters=filters,
+            facets=selected_facets,
         )
 
-        # Convert to response format with camelCase fields
-        items = [PatientResponse.from_orm(p) for p in patients]
-        total_pages = ceil(total / page_size) if total > 0 else 0
-
-        return PaginatedResponse(
-            items=items,
-            total=total,
-            page=page,
-            page_size=page_size,
-            total_pages=total_pages,
+        # Items are already camelCase dicts; serialize them without re-validation
+        total_pages = ceil(result.total / page_size) if result.total is not None else None
+        return OrjsonResponse(
+            {
+                "items": result.items,
+                "total": result.total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": total_pages,
+                "count_mode": result.count_mode,
+                "has_more": result.has_more,
+                "next_cursor": result.next_cursor,
+                "facets": result.facets,
+            },
+            headers={
+                "ETag": _list_etag(result.version, request),
+                "Cache-Control": CACHE_CONTROL,
+            },
         )
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         # Log the error for debugging
         logger.error(f"Error fetching patients: {type(e).__name__}: {e}", exc_info=True)
@@ -91,35 +330,278 @@ async def get_patients(
         )
 
 
-@router.get("/{patient_id}", response_model=PatientResponse)
+# Rows fetched per server-side cursor round trip during exports
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def _export_lines(batches: AsyncIterator[list[dict]], fmt: str) -> AsyncIterator[str]:
+    """Encode streamed patient batches as NDJSON lines or CSV rows, one chunk per batch."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(response_field_columns)
+        async for batch in batches:
+            writer.writerows(row.values() for row in batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # No rows: the header alone
+            yield buffer.getvalue()
+        return
+
+    async for batch in batches:
+        yield "".join(json.dumps(row, default=str) + "\n" for row in batch)
+
+
+@router.get("/export")
+async def export_patients(
+    search: str | None = None,
+    sort_by: str = "patientID",
+    sort_order: str = "asc",
+    search_mode: Literal["substring", "fulltext"] = "substring",
+    format: Literal["ndjson", "csv"] = "ndjson",
+    filters: PatientFilters = Depends(patient_filters),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream all matching patients as NDJSON or CSV.
+
+    Rows are read through a server-side cursor in batches of
+    EXPORT_BATCH_SIZE and written out as they arrive, so memory stays flat
+    however large the table is. Field names match PatientResponse.
+
+    Query Parameters:
+        search: Search term, as for GET /patients (optional)
+        sort_by: Field to sort by - patientID, name, or age (default: patientID)
+        sort_order: Sort order - asc or desc (default: asc)
+        search_mode: substring or fulltext, as for GET /patients (default: substring)
+        format: ndjson or csv (default: ndjson)
+        age_min, age_max, gender, medical_condition, last_visit_from,
+            last_visit_to: Structured filters, as for GET /patients
+
+    Returns:
+        Streaming response with one patient per line
+    """
+    batches = stream_patients(
+        db=db,
+        search=search,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        search_mode=search_mode,
+        batch_size=EXPORT_BATCH_SIZE,
+        filters=filters,
+    )
+    return StreamingResponse(
+        _export_lines(batches, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="patients.{format}"'},
+    )
+
+
+# Maximum changes (and deletions) per delta sync response
+CHANGES_MAX_LIMIT = 1000
+
+
+@router.get("/changes", response_model=PatientChangesResponse, response_class=OrjsonResponse)
+async def get_patient_changes_endpoint(
+    since: str | None = None,
+    limit: int = Query(500, ge=1, le=CHANGES_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delta sync: patients created, updated or deleted after a watermark.
+
+    Call without since for an initial full sync, then keep passing the
+    returned next_since; while has_more is true, call again immediately.
+    Traffic is proportional to the number of changes, not the table size.
+
+    Query Parameters:
+        since: next_since token from the previous response (optional)
+        limit: Maximum changes and maximum deletions per response (default: 500)
+
+    Returns:
+        Changed patients, deletion tombstones (keyed by id), next_since and has_more
+
+    Raises:
+        HTTPException: 400 if since is not a valid token
+    """
+    try:
+        return OrjsonResponse(await get_patient_changes(db, since, limit))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        # Log the error for debugging
+        logger.error(f"Error fetching patient changes: {type(e).__name__}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch patient changes: {str(e)}",
+        )
+
+
+# Seconds between comment lines on an idle event stream, so proxies keep it open
+EVENTS_KEEPALIVE = 15.0
+
+
+async def _sse_messages(events: AsyncIterator[dict | None]) -> AsyncIterator[str]:
+    """Encode patient events as server-sent event messages."""
+    # Ask EventSource clients to wait 5 s before reconnecting
+    yield "retry: 5000\n\n"
+    async for event in events:
+        if event is None:
+            yield ": keepalive\n\n"
+        else:
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+@router.get("/events")
+async def patient_events_endpoint(db: AsyncSession = Depends(get_db)):
+    """
+    Server-sent event stream of patient creates, updates and deletes.
+
+    Each message is named after its type (created, updated, deleted) and
+    carries the patient's id and patientID. A resync message means events
+    may have been lost, because the client fell behind or the server lost
+    its database listener; catch up with GET /patients/changes. Idle streams
+    get a comment line every EVENTS_KEEPALIVE seconds.
+
+    The session is only used to detect the database; no connection is held
+    while the stream is open.
+
+    Returns:
+        text/event-stream response that stays open until the client disconnects
+
+    Raises:
+        HTTPException: 503 if this worker already serves its maximum of subscribers
+    """
+    try:
+        subscription = subscribe_patient_events(db)
+    except OverflowError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return StreamingResponse(
+        _sse_messages(patient_event_broker.events(subscription, EVENTS_KEEPALIVE)),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: no stops nginx from holding messages back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats", response_model=PatientStatsResponse, response_class=OrjsonResponse)
+async def get_patient_stats_endpoint(db: AsyncSession = Depends(get_db)):
+    """
+    Get precomputed dashboard statistics.
+
+    Returns the total, gender split, top conditions, age histogram and visit
+    recency buckets. Served from the trigger-maintained patient_stats summary, so the cost
+    does not grow with the number of patients.
+
+    Returns:
+        Statistics with the time the summary last changed (updated_at)
+    """
+    try:
+        return OrjsonResponse(await get_patient_stats(db))
+    except Exception as e:
+        # Log the error for debugging
+        logger.error(f"Error fetching patient stats: {type(e).__name__}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch patient stats: {str(e)}",
+        )
+
+
+@router.get(
+    "/suggest", response_model=list[PatientSuggestion], response_class=OrjsonResponse
+)
+async def suggest_patients_endpoint(
+    q: str = "",
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Typeahead suggestions for patientID and name prefixes.
+
+    Meant to be called on every keystroke: no total is counted and only
+    patientID and name are read, through prefix indexes.
+
+    Query Parameters:
+        q: Prefix typed so far, case-insensitive (empty returns [])
+        limit: Maximum number of suggestions, 1-50 (default: 10)
+
+    Returns:
+        patientID matches first, then name matches, each in prefix order
+    """
+    try:
+        return OrjsonResponse(await suggest_patients(db, q, limit))
+    except Exception as e:
+        # Log the error for debugging
+        logger.error(f"Error suggesting patients: {type(e).__name__}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to suggest patients: {str(e)}",
+        )
+
+
+@router.get("/{patient_id}", response_model=PatientResponse, response_class=OrjsonResponse)
 async def get_patient_by_id(
-    patient_id: str, db: AsyncSession = Depends(get_db)
+    patient_id: str,
+    fields: str | None = None,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get a patient by patientID.
 
     Args:
         patient_id: Patient ID (e.g., "P001")
+        fields: Comma-separated PatientResponse fields to return, e.g.
+            patientID,name (default: all fields)
+        if_none_match: ETag from a previous response; answered with 304 Not
+            Modified (checked against id and version only) if unchanged
         db: Database session
 
     Returns:
         Patient with the specified patientID
 
     Raises:
-        HTTPException: 404 if patient not found
+        HTTPException: 400 if fields names an unknown field, 404 if patient not found
     """
     try:
-        patient = await get_patient_by_patient_id(db, patient_id)
-        if patient is None:
+        selected_fields = parse_fields(fields)
+        current = None
+        if if_none_match:
+            current = await get_patient_version(db, patient_id)
+            etag = _patient_etag(*current, selected_fields) if current is not None else None
+            if etag and _etag_matches(if_none_match, etag):
+                return _not_modified(etag)
+
+        record = None
+        if current is not None or not if_none_match:
+            record = await get_patient_by_patient_id(
+                db, patient_id, revision=current, fields=selected_fields
+            )
+        if record is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Patient with ID '{patient_id}' not found",
             )
-        # Convert to response format with camelCase fields
-        return PatientResponse.from_orm(patient)
+        # Fields are already camelCase; serialize them without re-validation
+        return OrjsonResponse(
+            record.fields,
+            headers={
+                "ETag": _patient_etag(record.id, record.version, selected_fields),
+                "Cache-Control": CACHE_CONTROL,
+            },
+        )
     except HTTPException:
         # Re-raise HTTP exceptions (including 404)
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         # Log the error for debugging
         logger.error(
@@ -134,25 +616,51 @@ async def get_patient_by_id(
 
 @router.post("", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
 async def create_patient_endpoint(
-    patient: PatientCreate, db: AsyncSession = Depends(get_db)
+    patient: PatientCreate,
+    idempotency_key: str | None = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Create a new patient.
 
+    Send an Idempotency-Key header (e.g. a UUID per intake) to make retries
+    safe: a repeated request with the same key and body gets the first
+    response back without creating or conflicting again.
+
     Args:
         patient: Patient creation data
+        idempotency_key: Client-generated key identifying this create (optional)
         db: Database session
 
     Returns:
         Created patient with auto-generated ID
 
     Raises:
-        HTTPException: 400 if validation fails, 409 if patient_id already exists
+        HTTPException: 400 if validation fails, 409 if patient_id already exists,
+            422 if the Idempotency-Key was used for a different request
     """
+    if idempotency_key is None:
+        return await _create_patient(patient, db)
+    return await _idempotent(
+        idempotency_key, "POST /patients", patient, lambda: _create_patient(patient, db)
+    )
+
+
+def _written_patient(patient, status_code: int = status.HTTP_200_OK) -> Response:
+    """Render a created or updated patient with the ETag of its new version."""
+    # Convert to response format with camelCase fields
+    return OrjsonResponse(
+        PatientResponse.from_orm(patient).model_dump(mode="json"),
+        status_code=status_code,
+        headers={"ETag": _patient_etag(patient.id, patient.version)},
+    )
+
+
+async def _create_patient(patient: PatientCreate, db: AsyncSession) -> Response:
+    """Create a patient, mapping database errors to HTTP errors."""
     try:
         created_patient = await create_patient(db, patient)
-        # Convert to response format with camelCase fields
-        return PatientResponse.from_orm(created_patient)
+        return _written_patient(created_patient, status.HTTP_201_CREATED)
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
@@ -177,38 +685,203 @@ async def create_patient_endpoint(
         )
 
 
+# Largest payload accepted by POST /patients/bulk
+BULK_MAX_ROWS = 10000
+
+
+@router.post("/bulk", response_model=BulkPatientResponse)
+async def bulk_create_patients_endpoint(
+    patients: list[PatientCreate],
+    on_conflict: Literal["skip", "update", "fail"] = "fail",
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create or update many patients in one request.
+
+    Rows are written with multi-row INSERT ... ON CONFLICT (patient_id)
+    statements and committed once.
+
+    Args:
+        patients: Patients to write (at most BULK_MAX_ROWS)
+        on_conflict: What to do when a patientID already exists - skip the row,
+            update the existing patient, or fail the whole request (default: fail)
+        db: Database session
+
+    Returns:
+        Counts and a per-row result report
+
+    Raises:
+        HTTPException: 409 with the per-row report if on_conflict=fail and any
+            row conflicts; 413 if more than BULK_MAX_ROWS rows are sent
+    """
+    if len(patients) > BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BULK_MAX_ROWS} patients can be written per request",
+        )
+    try:
+        results = await bulk_upsert_patients(db, patients, on_conflict)
+    except Exception as e:
+        logger.error(f"Unexpected error in bulk write: {type(e).__name__}: {e}", exc_info=True)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to write patients: {str(e)}",
+        )
+
+    report = BulkPatientResponse(
+        created=sum(r.status == "created" for r in results),
+        updated=sum(r.status == "updated" for r in results),
+        skipped=sum(r.status in ("skipped", "duplicate") for r in results),
+        results=results,
+    )
+    if any(r.status in ("conflict", "rolled_back") for r in results):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=report.model_dump())
+    return report
+
+
+@router.post("/import", response_model=PatientImportResponse)
+async def import_patients_endpoint(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    on_conflict: Literal["skip", "update"] = "update",
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Import a CSV or NDJSON upload of any size.
+
+    The request body is the file itself (e.g. curl --data-binary @patients.csv).
+    It is parsed and validated with the PatientCreate rules as it arrives,
+    staged with COPY and merged into patients with one INSERT ... ON CONFLICT,
+    so memory stays flat and nothing is written unless the whole import
+    succeeds. Invalid records and repeated patientIDs are reported, not fatal.
+
+    Query Parameters:
+        format: ndjson or csv (with a header row, as from /patients/export) (default: ndjson)
+        on_conflict: update or skip patients that already exist (default: update)
+
+    Returns:
+        Counts, rows per second and the rejected records
+
+    Raises:
+        HTTPException: 400 if the body cannot be parsed at all
+    """
+    try:
+        summary = await import_patients(
+            db, read_patient_batches(request.stream(), format), on_conflict
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error importing patients: {type(e).__name__}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import patients: {str(e)}",
+        )
+    return PatientImportResponse(**summary)
+
+
+@router.post("/_batch", response_model=PatientBatchResponse)
+async def batch_patients_endpoint(
+    batch: PatientBatchRequest, db: AsyncSession = Depends(get_db)
+):
+    """
+    Apply an ordered list of create, update and delete operations in one transaction.
+
+    Args:
+        batch: Operations plus atomic flag (all-or-nothing when true, best-effort otherwise)
+        db: Database session
+
+    Returns:
+        One result per operation and whether the changes were committed
+
+    Raises:
+        HTTPException: 409 with the per-operation report if an atomic batch fails
+    """
+    try:
+        results, committed = await run_patient_batch(db, batch.operations, batch.atomic)
+    except Exception as e:
+        logger.error(f"Unexpected error in batch: {type(e).__name__}: {e}", exc_info=True)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to apply batch: {str(e)}",
+        )
+
+    report = PatientBatchResponse(committed=committed, results=results)
+    if not committed:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=report.model_dump())
+    return report
+
+
 @router.put("/{patient_id}", response_model=PatientResponse)
 async def update_patient_endpoint(
     patient_id: str,
     patient: PatientUpdate,
+    if_match: str | None = Header(None),
+    idempotency_key: str | None = Header(None, max_length=255),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Update a patient by patientID.
 
+    Send the ETag from a previous GET or PUT as If-Match to update only if
+    nobody else has changed the patient since; the check and the write are
+    one conditional UPDATE, so no lock is taken. A repeated request with the
+    same Idempotency-Key, If-Match and body gets the first response back
+    without writing again.
+
     Args:
         patient_id: Patient ID to update (e.g., "P001")
         patient: Patient update data (only provided fields will be updated)
+        if_match: ETag(s) of the version the update is based on (optional)
+        idempotency_key: Client-generated key identifying this update (optional)
         db: Database session
 
     Returns:
-        Updated patient
+        Updated patient, with the ETag of its new version
 
     Raises:
-        HTTPException: 404 if patient not found, 409 if updated patient_id already exists
+        HTTPException: 404 if patient not found, 409 if updated patient_id already exists,
+            412 if If-Match does not name the current version,
+            422 if the Idempotency-Key was used for a different request
     """
+    expected = _if_match_versions(if_match) if if_match else None
+    if idempotency_key is None:
+        return await _update_patient(patient_id, patient, expected, db)
+    return await _idempotent(
+        idempotency_key,
+        f"PUT /patients/{patient_id}",
+        patient,
+        lambda: _update_patient(patient_id, patient, expected, db),
+        headers={"If-Match": if_match},
+    )
+
+
+async def _update_patient(
+    patient_id: str,
+    patient: PatientUpdate,
+    expected: list[tuple[int, int]] | None,
+    db: AsyncSession,
+) -> Response:
+    """Update a patient, mapping a missing row and database errors to HTTP errors."""
     try:
-        updated_patient = await update_patient(db, patient_id, patient)
+        updated_patient = await update_patient(db, patient_id, patient, expected)
         if updated_patient is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Patient with ID '{patient_id}' not found",
             )
-        # Convert to response format with camelCase fields
-        return PatientResponse.from_orm(updated_patient)
+        return _written_patient(updated_patient)
     except HTTPException:
         # Re-raise HTTP exceptions (including 404)
         raise
+    except PatientVersionConflictError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Patient with ID '{patient_id}' was modified; fetch it and retry",
+        )
     except IntegrityError as e:
         await db.rollback()
         if "patient_id" in str(e.orig).lower() or "unique" in str(e.orig).lower():
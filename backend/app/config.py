@@ -31,6 +31,18 @@ class Settings(BaseSettings):
     # Server port
     port: int = 8000
 
+    # In-process cache for patient reads (entries per cache; 0 disables)
+    query_cache_size: int = 1024
+    query_cache_ttl: float = 30.0  # seconds
+
+    # Idempotency-Key replay store for POST/PUT (responses per worker process)
+    idempotency_cache_size: int = 10000
+    idempotency_ttl: float = 86400.0  # seconds
+
+    # Server-sent patient events (per worker process)
+    events_queue_size: int = 256  # events buffered per subscriber before a resync
+    events_max_subscribers: int = 10000
+
     @field_validator("database_url", "database_url_migration")
     @classmethod
     def validate_database_url(cls, v: Optional[str], info: ValidationInfo) -> Optional[str]:
@@ -30,6 +30,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Idempotent-Replayed"],
 )
 
 # Include routers
@@ -80,6 +81,14 @@ async def startup_event():
         raise RuntimeError("Database connection failed on startup")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the patient event listener."""
+    from app.services.patient_service import patient_event_broker
+
+    await patient_event_broker.close()
+
+
 @app.get("/health")
 async def health_check():
     """
@@ -98,6 +107,24 @@ async def health_check():
     }
 
 
+@app.get("/health/cache")
+async def cache_stats():
+    """
+    Patient read cache statistics.
+
+    Returns:
+        Hit, miss and eviction counters plus size for each cache
+    """
+    from app.api.routes.patients import idempotency_store
+    from app.services.patient_service import patient_detail_cache, patient_list_cache
+
+    return {
+        "patient_list": patient_list_cache.stats(),
+        "patient_detail": patient_detail_cache.stats(),
+        "idempotency": idempotency_store.stats(),
+    }
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
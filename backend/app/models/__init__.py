@@ -3,6 +3,16 @@
 from app.database import Base
 from app.models.patient import Patient
 from app.models.migration_checkpoint import MigrationCheckpoint
+from app.models.table_version import TableVersion
+from app.models.patient_stat import PatientStat
+from app.models.patient_deletion import PatientDeletion
 
-__all__ = ["Base", "Patient", "MigrationCheckpoint"]
+__all__ = [
+    "Base",
+    "Patient",
+    "MigrationCheckpoint",
+    "TableVersion",
+    "PatientStat",
+    "PatientDeletion",
+]
 
@@ -1,9 +1,64 @@
 """Patient SQLAlchemy model."""
 
-from sqlalchemy import Column, Integer, String, Date, DateTime, CheckConstraint
+import json
+
+from sqlalchemy import (
+    BigInteger, Column, Integer, String, Date, DateTime, CheckConstraint, DDL, Index, event, text
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.models import Base
+from app.services.patient_events import (
+    EVENTS_PER_NOTIFY,
+    MAX_EVENTS_PER_STATEMENT,
+    PATIENT_EVENTS_CHANNEL,
+    RESYNC_EVENT,
+)
+
+
+# Delta sync orders writes by change_xid, see patient_service.get_patient_changes.
+# On PostgreSQL it is the writing transaction's id: every transaction below the
+# snapshot xmin has finished, so rows under that horizon can no longer appear
+# behind a client's watermark, whatever order their transactions committed in.
+# SQLite serializes writers, so a counter one past every stored value works.
+POSTGRESQL_CHANGE_XID = "pg_current_xact_id()::text::bigint"
+POSTGRESQL_CHANGE_HORIZON = "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+SQLITE_NEXT_CHANGE_XID = (
+    "(SELECT max(coalesce((SELECT max(change_xid) FROM patients), 0), "
+    "coalesce((SELECT max(change_xid) FROM patient_deletions), 0)) + 1)"
+)
+
+
+class CurrentChangeXid(FunctionElement):
+    """change_xid for a row written by the current transaction."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+class ChangeHorizon(FunctionElement):
+    """Lowest change_xid that a transaction still in progress may write."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(CurrentChangeXid, "postgresql")
+def _postgresql_current_change_xid(element, compiler, **kw):
+    return f"({POSTGRESQL_CHANGE_XID})"
+
+
+@compiles(ChangeHorizon, "postgresql")
+def _postgresql_change_horizon(element, compiler, **kw):
+    return f"({POSTGRESQL_CHANGE_HORIZON})"
+
+
+@compiles(CurrentChangeXid)
+@compiles(ChangeHorizon)
+def _sqlite_next_change_xid(element, compiler, **kw):
+    return SQLITE_NEXT_CHANGE_XID
 
 
 class Patient(Base):
@@ -13,7 +68,7 @@ class Patient(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_id = Column(String(50), unique=True, nullable=False, index=True)
-    name = Column(String(255), nullable=False, index=True)
+    name = Column(String(255), nullable=False)
     age = Column(Integer, nullable=False)
     gender = Column(String(20), nullable=False)
     medical_condition = Column(String(255), nullable=False)
@@ -22,6 +77,157 @@ class Patient(Base):
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    # Row version for ETags and If-Match; every UPDATE bumps it in the same
+    # statement (revision 011). ON CONFLICT DO UPDATE must set it explicitly.
+    version = Column(Integer, nullable=False, server_default="1", onupdate=text("version + 1"))
+    # Delta sync watermark (revision 015); ON CONFLICT DO UPDATE must set it
+    # explicitly. PostgreSQL also has it as the server default, for direct SQL.
+    change_xid = Column(
+        BigInteger, nullable=False, default=CurrentChangeXid(), onupdate=CurrentChangeXid()
+    )
+    # search_vector (tsvector kept by the patients_search_vector trigger, revision
+    # 004) exists on PostgreSQL only and is not mapped; see the DDL below and
+    # patient_service._fulltext_filter.
+
+    __table_args__ = (
+        CheckConstraint("age > 0", name="check_age_positive"),
+        # Trigram indexes for substring search (PostgreSQL pg_trgm, revision 003)
+        Index(
+            "ix_patients_patient_id_trgm",
+            "patient_id",
+            postgresql_using="gin",
+            postgresql_ops={"patient_id": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_patients_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # (sort column, id) indexes serving each list sort and its keyset
+        # predicate; INCLUDE covers patientID/name (revision 006)
+        Index(
+            "ix_patients_patient_id_id", "patient_id", "id", postgresql_include=["name"]
+        ),
+        Index("ix_patients_name_id", "name", "id", postgresql_include=["patient_id"]),
+        Index(
+            "ix_patients_age_id", "age", "id", postgresql_include=["patient_id", "name"]
+        ),
+        # Structured list filters (revision 007; last_visit B-tree, revision 016)
+        Index("ix_patients_last_visit_id", "last_visit", "id"),
+        Index("ix_patients_medical_condition_id", "medical_condition", "id"),
+        Index("ix_patients_gender_age", "gender", "age"),
+        # Case-insensitive typeahead prefixes, see suggest_patients (revision 008)
+        Index(
+            "ix_patients_patient_id_prefix",
+            func.lower(patient_id).label("patient_id_lower"),
+            postgresql_ops={"patient_id_lower": "text_pattern_ops"},
+            postgresql_include=["patient_id", "name"],
+        ),
+        Index(
+            "ix_patients_name_prefix",
+            func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+            postgresql_include=["patient_id", "name"],
+        ),
+        # Delta sync watermark order, see get_patient_changes (revision 015)
+        Index("ix_patients_change_xid_id", "change_xid", "id"),
+    )
+
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        f"ALTER TABLE patients ALTER COLUMN change_xid SET DEFAULT ({POSTGRESQL_CHANGE_XID})"
+    ).execute_if(dialect="postgresql"),
+)
+
+# Full-text vector over name (weight A) and medical_condition (weight B),
+# filled by a row trigger rather than GENERATED ... STORED so that revision
+# 004 could add it without rewriting the table
+POSTGRESQL_SEARCH_VECTOR_DDL = [
+    "ALTER TABLE patients ADD COLUMN search_vector tsvector",
+    """
+CREATE OR REPLACE FUNCTION patients_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english'::regconfig, coalesce(NEW.name, '')), 'A')
+        || setweight(to_tsvector('english'::regconfig, coalesce(NEW.medical_condition, '')), 'B');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+""",
+    "CREATE TRIGGER patients_search_vector "
+    "BEFORE INSERT OR UPDATE OF name, medical_condition ON patients "
+    "FOR EACH ROW EXECUTE FUNCTION patients_search_vector()",
+    "CREATE INDEX ix_patients_search_vector ON patients USING gin (search_vector)",
+]
+
+for _ddl in POSTGRESQL_SEARCH_VECTOR_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+
+
+# Change events for GET /patients/events, sent by triggers so every write path
+# (including direct SQL) announces itself without an extra statement. Tables
+# created through metadata.create_all (tests, fresh local databases) get them
+# here; Alembic revision 012 installs the same PostgreSQL objects. SQLite has
+# no NOTIFY: patient_service publishes to the local broker after commit.
+_RESYNC_PAYLOAD = json.dumps([RESYNC_EVENT], separators=(",", ":"))
+
+
+def _postgresql_notify_rows(rows: str, event_type: str) -> str:
+    """NOTIFY a transition table as JSON arrays of EVENTS_PER_NOTIFY events (or one resync)."""
+    return f"""IF (SELECT count(*) FROM {rows}) > {MAX_EVENTS_PER_STATEMENT} THEN
+            PERFORM pg_notify('{PATIENT_EVENTS_CHANNEL}', '{_RESYNC_PAYLOAD}');
+        ELSE
+            PERFORM pg_notify('{PATIENT_EVENTS_CHANNEL}', c.payload)
+            FROM (
+                SELECT json_agg(
+                    json_build_object('type', '{event_type}', 'id', r.id, 'patientID', r.patient_id)
+                    ORDER BY r.id
+                )::text AS payload
+                FROM (
+                    SELECT id, patient_id,
+                           (row_number() OVER (ORDER BY id) - 1) / {EVENTS_PER_NOTIFY} AS chunk
+                    FROM {rows}
+                ) AS r
+                GROUP BY r.chunk
+                ORDER BY r.chunk
+            ) AS c;
+        END IF;"""
+
+
+POSTGRESQL_NOTIFY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION notify_patient_events() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('{PATIENT_EVENTS_CHANNEL}', '{_RESYNC_PAYLOAD}');
+    ELSIF TG_OP = 'INSERT' THEN
+        {_postgresql_notify_rows("new_rows", "created")}
+    ELSIF TG_OP = 'UPDATE' THEN
+        {_postgresql_notify_rows("new_rows", "updated")}
+    ELSE
+        {_postgresql_notify_rows("old_rows", "deleted")}
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
 
-    __table_args__ = (CheckConstraint("age > 0", name="check_age_positive"),)
+POSTGRESQL_NOTIFY_TRIGGERS = [
+    "CREATE TRIGGER patients_notify_insert AFTER INSERT ON patients "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_patient_events()",
+    "CREATE TRIGGER patients_notify_update AFTER UPDATE ON patients "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_patient_events()",
+    "CREATE TRIGGER patients_notify_delete AFTER DELETE ON patients "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_patient_events()",
+    "CREATE TRIGGER patients_notify_truncate AFTER TRUNCATE ON patients "
+    "FOR EACH STATEMENT EXECUTE FUNCTION notify_patient_events()",
+]
 
+for _ddl in (POSTGRESQL_NOTIFY_FUNCTION, *POSTGRESQL_NOTIFY_TRIGGERS):
+    event.listen(Base.metadata, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
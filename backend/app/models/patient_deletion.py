@@ -0,0 +1,74 @@
+"""Patient deletion log SQLAlchemy model."""
+
+from sqlalchemy import BigInteger, Column, DateTime, DDL, Index, Integer, String, event
+from sqlalchemy.sql import func
+
+from app.models import Base
+from app.models.patient import POSTGRESQL_CHANGE_XID, SQLITE_NEXT_CHANGE_XID
+
+
+class PatientDeletion(Base):
+    """
+    Tombstone for a deleted patient, read by the delta sync endpoint.
+
+    Rows are appended by database triggers on patients, so every delete path
+    (single, batch, bulk or direct SQL) is logged in the same transaction.
+    The log only grows; ``(change_xid, id)`` is the sync watermark for
+    deletions, as ``(change_xid, id)`` is for patients.
+    """
+
+    __tablename__ = "patient_deletions"
+
+    # BigInteger does not autoincrement on SQLite; the variant keeps tests working
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    patient_pk = Column(Integer, nullable=False)
+    patient_id = Column(String(50), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Set by the triggers below; see Patient.change_xid (revision 015)
+    change_xid = Column(BigInteger, nullable=False)
+
+    __table_args__ = (Index("ix_patient_deletions_change_xid_id", "change_xid", "id"),)
+
+    def __repr__(self) -> str:
+        """String representation of PatientDeletion."""
+        return f"<PatientDeletion(id={self.id}, patient_id='{self.patient_id}')>"
+
+
+# Triggers for tables created through metadata.create_all (tests, fresh local
+# databases). Alembic revisions 010 and 015 install the same PostgreSQL objects.
+POSTGRESQL_DELETION_FUNCTION = """
+CREATE OR REPLACE FUNCTION log_patient_deletions() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO patient_deletions (patient_pk, patient_id)
+    SELECT id, patient_id FROM old_rows ORDER BY id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+POSTGRESQL_DELETION_TRIGGER = """
+CREATE TRIGGER patients_log_deletions AFTER DELETE ON patients
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_patient_deletions()
+"""
+
+POSTGRESQL_DELETION_XID_DEFAULT = (
+    f"ALTER TABLE patient_deletions ALTER COLUMN change_xid SET DEFAULT ({POSTGRESQL_CHANGE_XID})"
+)
+
+for _ddl in (
+    POSTGRESQL_DELETION_XID_DEFAULT, POSTGRESQL_DELETION_FUNCTION, POSTGRESQL_DELETION_TRIGGER
+):
+    event.listen(Base.metadata, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS patients_log_deletions AFTER DELETE ON patients "
+        "BEGIN INSERT INTO patient_deletions (patient_pk, patient_id, change_xid) "
+        f"VALUES (OLD.id, OLD.patient_id, {SQLITE_NEXT_CHANGE_XID}); END"
+    ).execute_if(dialect="sqlite"),
+)
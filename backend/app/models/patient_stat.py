@@ -0,0 +1,134 @@
+"""Patient statistics summary SQLAlchemy model."""
+
+from sqlalchemy import BigInteger, Column, DateTime, DDL, Integer, String, event
+from sqlalchemy.sql import func
+
+from app.models import Base
+
+
+class PatientStat(Base):
+    """
+    Precomputed patient count for one bucket of one dimension.
+
+    Dimensions are ``total`` (single bucket ''), ``gender``, ``condition``,
+    ``age`` (decade lower bound, e.g. '30') and ``visit_month`` (last visit
+    as 'YYYY-MM'). Database triggers on patients apply every write to the
+    affected buckets in the same transaction, so the summary never drifts
+    and reading it costs a few dozen rows whatever the table size.
+
+    Like table_versions, each bucket is split into slots so concurrent
+    writers don't queue on one row (every insert touches ('total', '')): a
+    write transaction adds its deltas to its table_versions slot, and a
+    bucket's count is the sum over its slots. A single slot can go negative.
+    """
+
+    __tablename__ = "patient_stats"
+
+    dimension = Column(String(50), primary_key=True)
+    bucket = Column(String(255), primary_key=True)
+    slot = Column(Integer, primary_key=True, server_default="0")
+    count = Column(BigInteger, nullable=False, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        """String representation of PatientStat."""
+        return (
+            f"<PatientStat(dimension='{self.dimension}', bucket='{self.bucket}', "
+            f"slot={self.slot}, count={self.count})>"
+        )
+
+
+# Triggers for tables created through metadata.create_all (tests, fresh local
+# databases). Alembic revisions 009 and 014 install the same PostgreSQL objects.
+
+# Statement-level with transition tables: one aggregated upsert per write
+# statement, and none at all when an UPDATE leaves every bucket unchanged
+_POSTGRESQL_STATS_UPSERT = """
+        INSERT INTO patient_stats (dimension, bucket, slot, count, updated_at)
+        SELECT b.dimension, b.bucket, write_slot, sum(d.sign), now()
+        FROM ({source}) AS d,
+        LATERAL (VALUES
+            ('total', ''),
+            ('gender', d.gender),
+            ('condition', d.medical_condition),
+            ('age', (d.age / 10 * 10)::text),
+            ('visit_month', to_char(d.last_visit, 'YYYY-MM'))
+        ) AS b (dimension, bucket)
+        GROUP BY b.dimension, b.bucket
+        HAVING sum(d.sign) <> 0
+        ON CONFLICT (dimension, bucket, slot) DO UPDATE
+        SET count = patient_stats.count + EXCLUDED.count, updated_at = EXCLUDED.updated_at;
+"""
+_OLD_ROWS = "SELECT gender, medical_condition, age, last_visit, -1 AS sign FROM old_rows"
+_NEW_ROWS = "SELECT gender, medical_condition, age, last_visit, 1 AS sign FROM new_rows"
+
+POSTGRESQL_STATS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION apply_patient_stats() RETURNS trigger AS $$
+DECLARE
+    write_slot integer := table_version_slot('patients');
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM patient_stats;
+    ELSIF TG_OP = 'INSERT' THEN
+        {_POSTGRESQL_STATS_UPSERT.format(source=_NEW_ROWS)}
+    ELSIF TG_OP = 'DELETE' THEN
+        {_POSTGRESQL_STATS_UPSERT.format(source=_OLD_ROWS)}
+    ELSE
+        {_POSTGRESQL_STATS_UPSERT.format(source=f"{_OLD_ROWS} UNION ALL {_NEW_ROWS}")}
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+POSTGRESQL_STATS_TRIGGERS = [
+    "CREATE TRIGGER patients_stats_insert AFTER INSERT ON patients "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION apply_patient_stats()",
+    "CREATE TRIGGER patients_stats_update AFTER UPDATE ON patients "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION apply_patient_stats()",
+    "CREATE TRIGGER patients_stats_delete AFTER DELETE ON patients "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION apply_patient_stats()",
+    "CREATE TRIGGER patients_stats_truncate AFTER TRUNCATE ON patients "
+    "FOR EACH STATEMENT EXECUTE FUNCTION apply_patient_stats()",
+]
+
+for _ddl in (POSTGRESQL_STATS_FUNCTION, *POSTGRESQL_STATS_TRIGGERS):
+    event.listen(Base.metadata, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+
+
+def _sqlite_stats_upserts(row: str, sign: int) -> str:
+    """Upserts applying one OLD/NEW row to every dimension (SQLite trigger body)."""
+    buckets = [
+        ("total", "''"),
+        ("gender", f"{row}.gender"),
+        ("condition", f"{row}.medical_condition"),
+        ("age", f"CAST({row}.age / 10 * 10 AS TEXT)"),
+        # DDL statements are %-formatted: %% renders as a single %
+        ("visit_month", f"strftime('%%Y-%%m', {row}.last_visit)"),
+    ]
+    return "".join(
+        "INSERT INTO patient_stats (dimension, bucket, count, updated_at) "
+        f"VALUES ('{dimension}', {bucket}, {sign}, CURRENT_TIMESTAMP) "
+        "ON CONFLICT (dimension, bucket, slot) DO UPDATE SET "
+        "count = patient_stats.count + excluded.count, updated_at = excluded.updated_at; "
+        for dimension, bucket in buckets
+    )
+
+
+# SQLite has no statement-level triggers or transition tables: row triggers
+for _operation, _body in (
+    ("INSERT", _sqlite_stats_upserts("NEW", 1)),
+    ("UPDATE", _sqlite_stats_upserts("OLD", -1) + _sqlite_stats_upserts("NEW", 1)),
+    ("DELETE", _sqlite_stats_upserts("OLD", -1)),
+):
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER IF NOT EXISTS patients_stats_{_operation.lower()} "
+            f"AFTER {_operation} ON patients BEGIN {_body}END"
+        ).execute_if(dialect="sqlite"),
+    )
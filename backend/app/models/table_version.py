@@ -0,0 +1,110 @@
+"""Table version SQLAlchemy model."""
+
+from sqlalchemy import BigInteger, Column, DDL, Integer, String, event
+
+from app.models import Base
+
+
+# Counter rows per table on PostgreSQL: up to this many write transactions
+# can hold one each without queueing on a shared row lock
+TABLE_VERSION_SLOTS = 16
+
+
+class TableVersion(Base):
+    """
+    One slot of a monotonic change counter per table, bumped by database triggers.
+
+    Any INSERT, UPDATE or DELETE on a tracked table increments one of its
+    slots in the same transaction, so readers get a cheap, cross-worker
+    collection version (used for list ETags) without the write paths issuing
+    an extra statement. The version is the sum over the table's slots. On
+    PostgreSQL each write transaction takes a slot no other open transaction
+    holds (see table_version_slot()); SQLite serializes writers and uses slot 0.
+    """
+
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(255), primary_key=True)
+    slot = Column(Integer, primary_key=True, server_default="0")
+    version = Column(BigInteger, nullable=False, server_default="0")
+
+    def __repr__(self) -> str:
+        """String representation of TableVersion."""
+        return (
+            f"<TableVersion(table_name='{self.table_name}', slot={self.slot}, "
+            f"version={self.version})>"
+        )
+
+
+# Triggers for tables created through metadata.create_all (tests, fresh local
+# databases). Alembic revisions 005 and 013 install the same PostgreSQL objects.
+_BUMP_UPSERT = (
+    "INSERT INTO table_versions (table_name, slot, version) VALUES ('{table}', 0, 1) "
+    "ON CONFLICT (table_name, slot) DO UPDATE SET version = table_versions.version + 1"
+)
+
+# The first call in a transaction locks a free slot row (SKIP LOCKED) and
+# remembers it in a transaction-local setting; later calls, including those
+# from other tables' summary triggers (patient_stats), reuse it. Only when
+# every slot is held does a writer fall back to waiting on one.
+POSTGRESQL_SLOT_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION table_version_slot(tracked_table text) RETURNS integer AS $$
+DECLARE
+    setting text := 'table_versions.' || tracked_table;
+    held integer := nullif(current_setting(setting, true), '')::integer;
+BEGIN
+    IF held IS NULL THEN
+        SELECT tv.slot INTO held FROM table_versions AS tv
+        WHERE tv.table_name = tracked_table
+        ORDER BY tv.slot
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED;
+        held := coalesce(held, pg_backend_pid() %% {TABLE_VERSION_SLOTS});
+        PERFORM set_config(setting, held::text, true);
+    END IF;
+    RETURN held;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+POSTGRESQL_BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, slot, version)
+    VALUES (TG_TABLE_NAME, table_version_slot(TG_TABLE_NAME), 1)
+    ON CONFLICT (table_name, slot) DO UPDATE SET version = table_versions.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+POSTGRESQL_PATIENTS_SLOTS = f"""
+INSERT INTO table_versions (table_name, slot, version)
+SELECT 'patients', slot, 0 FROM generate_series(0, {TABLE_VERSION_SLOTS - 1}) AS slot
+"""
+
+POSTGRESQL_PATIENTS_TRIGGER = """
+CREATE TRIGGER patients_bump_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON patients
+FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+"""
+
+for _ddl in (
+    POSTGRESQL_SLOT_FUNCTION,
+    POSTGRESQL_BUMP_FUNCTION,
+    POSTGRESQL_PATIENTS_SLOTS,
+    POSTGRESQL_PATIENTS_TRIGGER,
+):
+    event.listen(Base.metadata, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+
+# SQLite has no statement-level triggers or trigger functions: one row trigger per event
+for _operation in ("INSERT", "UPDATE", "DELETE"):
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER IF NOT EXISTS patients_bump_version_{_operation.lower()} "
+            f"AFTER {_operation} ON patients "
+            f"BEGIN {_BUMP_UPSERT.format(table='patients')}; END"
+        ).execute_if(dialect="sqlite"),
+    )
@@ -1,7 +1,7 @@
 """Pydantic schemas for Patient entity."""
 
-from datetime import date
-from typing import Literal
+from datetime import date, datetime
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -82,12 +82,178 @@ class PatientResponse(PatientBase):
         }
 
 
+class PatientSuggestion(BaseModel):
+    """Typeahead suggestion: just enough to label and select a patient."""
+
+    patientID: str = Field(..., description="Patient ID")
+    name: str = Field(..., description="Patient name")
+
+
+class PatientTombstone(BaseModel):
+    """A deleted patient, as reported by the delta sync endpoint."""
+
+    id: int = Field(..., description="Auto-generated ID of the deleted patient")
+    patientID: str = Field(..., description="Patient ID at deletion time")
+    deletedAt: datetime = Field(..., description="When the patient was deleted")
+
+
+class PatientChangesResponse(BaseModel):
+    """Schema for a delta sync response."""
+
+    changes: list[PatientResponse] = Field(
+        ..., description="Patients created or updated after the watermark, oldest first"
+    )
+    deleted: list[PatientTombstone] = Field(
+        ..., description="Patients deleted after the watermark, oldest first"
+    )
+    next_since: str = Field(..., description="Watermark to pass as since on the next call")
+    has_more: bool = Field(..., description="Whether more changes are waiting (call again)")
+
+
+class StatsBucket(BaseModel):
+    """Patient count for one bucket of a statistics breakdown."""
+
+    bucket: str = Field(..., description="Bucket label")
+    count: int = Field(..., ge=0, description="Number of patients in the bucket")
+
+
+class PatientStatsResponse(BaseModel):
+    """Schema for precomputed patient statistics."""
+
+    total: int = Field(..., ge=0, description="Total number of patients")
+    gender: dict[str, int] = Field(..., description="Patients per gender, largest first")
+    top_conditions: list[StatsBucket] = Field(
+        ..., description="Most common medical conditions, largest first"
+    )
+    age_histogram: list[StatsBucket] = Field(..., description="Patients per age decade")
+    visit_recency: list[StatsBucket] = Field(
+        ..., description="Patients by calendar months since their last visit"
+    )
+    updated_at: datetime | None = Field(
+        None, description="When the summary last changed (null if never written)"
+    )
+
+
 class PaginatedResponse(BaseModel):
     """Schema for paginated response."""
 
     items: list[PatientResponse]
-    total: int = Field(..., description="Total number of items")
+    total: int | None = Field(..., description="Total number of items (null when count=none)")
     page: int = Field(..., ge=1, description="Current page number")
     page_size: int = Field(..., ge=1, description="Number of items per page")
-    total_pages: int = Field(..., ge=0, description="Total number of pages")
+    total_pages: int | None = Field(..., ge=0, description="Total number of pages")
+    count_mode: Literal["exact", "estimated", "none"] = Field(
+        "exact", description="Count strategy that produced total"
+    )
+    has_more: bool = Field(False, description="Whether another page follows this one")
+    next_cursor: str | None = Field(
+        None, description="Keyset cursor for the next page (null on the last page)"
+    )
+    facets: dict[str, dict[str, int]] | None = Field(
+        None,
+        description="Per-value match counts for each requested facet (null when not requested)",
+    )
+
+
+
+class BulkPatientResult(BaseModel):
+    """Outcome of one row of a bulk write."""
+
+    index: int = Field(..., ge=0, description="Position of the row in the request")
+    patientID: str = Field(..., description="Patient ID of the row")
+    status: Literal["created", "updated", "skipped", "conflict", "duplicate", "rolled_back"] = (
+        Field(..., description="What happened to the row")
+    )
+    id: int | None = Field(None, description="Database id of the written row")
+
+
+class BulkPatientResponse(BaseModel):
+    """Schema for bulk write response with per-row results."""
+
+    created: int = Field(..., ge=0, description="Rows inserted")
+    updated: int = Field(..., ge=0, description="Existing rows overwritten")
+    skipped: int = Field(..., ge=0, description="Rows left untouched (conflicts or duplicates)")
+    results: list[BulkPatientResult]
+
+
+class PatientImportReject(BaseModel):
+    """An upload record that was not imported."""
+
+    row: int = Field(..., ge=1, description="1-based record number in the upload")
+    patientID: str | None = Field(None, description="Patient ID of the record, if readable")
+    error: str = Field(..., description="Why the record was rejected")
+
+
+class PatientImportResponse(BaseModel):
+    """Schema for a streaming import summary."""
+
+    received: int = Field(..., ge=0, description="Records read from the upload")
+    created: int = Field(..., ge=0, description="Rows inserted")
+    updated: int = Field(..., ge=0, description="Existing rows overwritten")
+    skipped: int = Field(..., ge=0, description="Existing rows left untouched")
+    rejected: int = Field(
+        ..., ge=0, description="Records that failed validation or repeat a patientID"
+    )
+    rejects: list[PatientImportReject] = Field(
+        ..., description="Rejected records in upload order (at most the first 1000)"
+    )
+    elapsed_seconds: float = Field(..., ge=0, description="Time spent parsing and loading")
+    rows_per_second: float = Field(..., ge=0, description="Records read per second")
+
+
+class PatientCreateOperation(BaseModel):
+    """Batch operation creating a patient."""
+
+    op: Literal["create"]
+    data: PatientCreate
+
+
+class PatientUpdateOperation(BaseModel):
+    """Batch operation updating a patient by patientID."""
+
+    op: Literal["update"]
+    patientID: str = Field(..., min_length=1, max_length=50, description="Patient to update")
+    data: PatientUpdate
+
+
+class PatientDeleteOperation(BaseModel):
+    """Batch operation deleting a patient by patientID."""
+
+    op: Literal["delete"]
+    patientID: str = Field(..., min_length=1, max_length=50, description="Patient to delete")
+
+
+PatientBatchOperation = Annotated[
+    PatientCreateOperation | PatientUpdateOperation | PatientDeleteOperation,
+    Field(discriminator="op"),
+]
+
+
+class PatientBatchRequest(BaseModel):
+    """Schema for an ordered batch of patient writes (request body)."""
+
+    atomic: bool = Field(
+        True, description="All-or-nothing when true; otherwise apply every operation that succeeds"
+    )
+    operations: list[PatientBatchOperation] = Field(..., max_length=1000)
+
+
+class PatientBatchResult(BaseModel):
+    """Outcome of one batch operation."""
+
+    index: int = Field(..., ge=0, description="Position of the operation in the request")
+    op: Literal["create", "update", "delete"]
+    patientID: str = Field(..., description="Patient the operation targeted")
+    status: Literal["ok", "not_found", "conflict", "rolled_back", "skipped"] = Field(
+        ..., description="What happened to the operation"
+    )
+    patient: PatientResponse | None = Field(
+        None, description="Patient after a successful create or update"
+    )
+
+
+class PatientBatchResponse(BaseModel):
+    """Schema for batch response with one result per operation."""
 
+    committed: bool = Field(..., description="Whether any changes were committed")
+    results: list[PatientBatchResult]
@@ -0,0 +1,103 @@
+"""Replay store for requests carrying an Idempotency-Key header."""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from app.services.query_cache import MISSING, QueryCache
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """A rendered response kept for replay."""
+
+    status_code: int
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when a key is sent again with a different request."""
+
+
+class IdempotencyStore:
+    """
+    Runs each keyed request once and replays its response to retries.
+
+    Responses are kept in a bounded LRU + TTL QueryCache, so the store costs
+    one dictionary lookup per keyed request and nothing otherwise. A retry
+    that arrives while the original is still running waits for it instead
+    of executing a second time. Server errors (5xx) are not stored, so the
+    client can retry them.
+
+    Like QueryCache the store is per process: with several workers a retry
+    is only deduplicated when it reaches the worker that served the original.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Create an empty store.
+
+        Args:
+            maxsize: Maximum number of stored responses
+            ttl: Seconds a response can be replayed after it is stored
+            clock: Monotonic time source (overridable in tests)
+        """
+        self._responses = QueryCache(maxsize, ttl, clock)
+        self._in_flight: dict[str, tuple[str, asyncio.Future]] = {}
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        execute: Callable[[], Awaitable[StoredResponse]],
+    ) -> tuple[StoredResponse, bool]:
+        """
+        Execute a keyed request at most once.
+
+        Args:
+            key: Client-supplied Idempotency-Key
+            fingerprint: Digest of the request (method, path, body) sent with the key
+            execute: Performs the request and renders its response
+
+        Returns:
+            Tuple of (response, whether it was replayed)
+
+        Raises:
+            IdempotencyKeyReusedError: If the key was first used for a different request
+        """
+        while True:
+            stored = self._responses.get(key)
+            if stored is not MISSING:
+                stored_fingerprint, response = stored
+                if stored_fingerprint != fingerprint:
+                    raise IdempotencyKeyReusedError(key)
+                return response, True
+            if key not in self._in_flight:
+                break
+            running_fingerprint, done = self._in_flight[key]
+            if running_fingerprint != fingerprint:
+                raise IdempotencyKeyReusedError(key)
+            # Shielded: a cancelled retry must not cancel the original's future
+            await asyncio.shield(done)
+
+        done = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, done)
+        try:
+            response = await execute()
+            if response.status_code < 500:
+                self._responses.set(key, (fingerprint, response))
+            return response, False
+        finally:
+            del self._in_flight[key]
+            done.set_result(None)
+
+    def stats(self) -> dict:
+        """Return the response cache counters (see QueryCache.stats)."""
+        return self._responses.stats()
@@ -0,0 +1,168 @@
+"""Patient change events: in-process fan-out plus PostgreSQL LISTEN/NOTIFY."""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel shared by every worker
+PATIENT_EVENTS_CHANNEL = "patient_events"
+
+# NOTIFY payloads are capped at 8000 bytes; events are ~100 bytes each
+EVENTS_PER_NOTIFY = 50
+
+# A statement changing more rows (e.g. an import) announces one resync
+# instead: a subscriber queue would overflow into a resync anyway, and the
+# NOTIFY queue stays small
+MAX_EVENTS_PER_STATEMENT = 1000
+
+# Queued for a subscriber that fell behind or may have missed events; the
+# client should catch up through GET /patients/changes
+RESYNC_EVENT = {"type": "resync"}
+
+# Seconds to wait before reconnecting a dropped LISTEN connection
+LISTEN_RETRY_DELAY = 5.0
+
+
+class Subscription:
+    """
+    One subscriber's bounded event queue.
+
+    When the queue is full the backlog is discarded and replaced by a single
+    resync event, so a slow consumer costs at most ``maxsize`` events of
+    memory and never blocks publishers or other subscribers.
+    """
+
+    def __init__(self, maxsize: int):
+        """Create an empty subscription holding up to maxsize events."""
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event: dict) -> None:
+        """Queue an event without waiting, collapsing the backlog on overflow."""
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC_EVENT)
+
+    async def get(self) -> dict:
+        """Wait for the next event."""
+        return await self._queue.get()
+
+
+class PatientEventBroker:
+    """
+    Fans patient events out to the subscribers of this process.
+
+    On SQLite (tests, local runs) patient_service publishes directly after
+    commit. On PostgreSQL statement-level triggers on patients send NOTIFY
+    inside the writing transaction (see app.models.patient) and a single
+    LISTEN connection per process feeds publish(), so every worker sees
+    every committed write exactly once. Idle subscribers cost a queue
+    and no database connection.
+    """
+
+    def __init__(self, queue_size: int = 256, max_subscribers: int = 10000):
+        """
+        Create a broker with no subscribers.
+
+        Args:
+            queue_size: Events buffered per subscriber before it is resynced
+            max_subscribers: Subscribers allowed at once in this process
+        """
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: set[Subscription] = set()
+        self._listener: asyncio.Task | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of open subscriptions."""
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        """
+        Register a new subscriber.
+
+        Raises:
+            OverflowError: If max_subscribers are already connected
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            raise OverflowError("Too many event subscribers")
+        subscription = Subscription(self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber (no-op if already removed)."""
+        self._subscribers.discard(subscription)
+
+    def publish(self, events: list[dict]) -> None:
+        """Deliver events, in order, to every subscriber of this process."""
+        for subscription in list(self._subscribers):
+            for event in events:
+                subscription.deliver(event)
+
+    def ensure_listening(self, database_url: str) -> None:
+        """Start the LISTEN task for a PostgreSQL database if it is not running."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(database_url))
+
+    async def close(self) -> None:
+        """Stop the LISTEN task, if any."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self, database_url: str) -> None:
+        """Relay NOTIFY payloads to publish(), reconnecting after failures."""
+        import psycopg
+
+        # psycopg wants a libpq URL, not SQLAlchemy's postgresql+psycopg form
+        conninfo = make_url(database_url).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        reconnecting = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    conninfo, autocommit=True
+                ) as conn:
+                    await conn.execute(f"LISTEN {PATIENT_EVENTS_CHANNEL}")
+                    if reconnecting:
+                        # Anything committed while we were not listening is lost
+                        self.publish([RESYNC_EVENT])
+                    async for notify in conn.notifies():
+                        self.publish(json.loads(notify.payload))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Patient event listener disconnected: {e}")
+            reconnecting = True
+            await asyncio.sleep(LISTEN_RETRY_DELAY)
+
+    async def events(
+        self, subscription: Subscription, keepalive: float
+    ) -> AsyncIterator[dict | None]:
+        """
+        Yield a subscription's events, or None after keepalive idle seconds.
+
+        The subscription is removed when the consumer stops iterating.
+        """
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.unsubscribe(subscription)
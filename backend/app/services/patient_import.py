@@ -0,0 +1,196 @@
+"""Streaming CSV/NDJSON parsing and validation for patient imports."""
+
+import codecs
+import csv
+import json
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Literal
+
+from pydantic import ValidationError
+
+from app.schemas.patient import PatientCreate, PatientImportReject
+
+ImportFormat = Literal["ndjson", "csv"]
+
+# Validated rows handed to the database per batch (one COPY each)
+IMPORT_BATCH_ROWS = 5000
+
+# A single line longer than this fails the import, so a file without line
+# breaks cannot grow the buffer without bound; a longer quoted CSV record is
+# rejected like one left open past MAX_RECORD_LINES
+MAX_RECORD_CHARS = 1_000_000
+
+# A quoted CSV field still open after this many lines is taken to be a stray
+# quote: that record is rejected and parsing resumes on the line after it
+MAX_RECORD_LINES = 100
+
+
+@dataclass
+class ImportBatch:
+    """Validated rows (with their 1-based record numbers) and rejects from one batch."""
+
+    rows: list[tuple[int, PatientCreate]] = field(default_factory=list)
+    rejects: list[PatientImportReject] = field(default_factory=list)
+
+
+async def _text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[list[str]]:
+    """
+    Decode UTF-8 byte chunks into lists of complete lines (line breaks kept).
+
+    Lines end at "\n" only (a preceding "\r" stays on the line): characters
+    such as U+2028 or form feed are data inside a JSON string or CSV field.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        cut = pending.rfind("\n") + 1
+        if cut:
+            yield [line + "\n" for line in pending[: cut - 1].split("\n")]
+            pending = pending[cut:]
+        elif len(pending) > MAX_RECORD_CHARS:
+            raise ValueError(f"Line longer than {MAX_RECORD_CHARS} characters")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield [pending]
+
+
+async def _ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[list]:
+    """Yield one list per input chunk of parsed JSON values (or the decode error text)."""
+    async for lines in _text_lines(chunks):
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                records.append(f"Invalid JSON: {e.msg}")
+        yield records
+
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[list]:
+    """
+    Yield one list per input chunk of CSV rows as dicts keyed by the header.
+
+    A quoted field may contain line breaks, so a record's lines are only
+    handed to the csv module once its count of quote characters is even.
+    A record still open after MAX_RECORD_LINES lines (or MAX_RECORD_CHARS
+    characters), or at end of file, is rejected as an unterminated quoted
+    field and the lines after its first are parsed again, so one stray
+    quote costs one record rather than the rest of the upload.
+    """
+    header = None
+    record: list[str] = []
+    record_chars = 0
+    quoted = False
+
+    def parse(lines: list[str], records: list) -> None:
+        nonlocal header
+        for values in csv.reader(lines):
+            if not values:
+                continue
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                records.append(f"Expected {len(header)} columns, found {len(values)}")
+            else:
+                records.append(dict(zip(header, values)))
+
+    def split(lines: list[str], final: bool = False) -> list:
+        nonlocal record, record_chars, quoted
+        records: list = []
+        complete: list[str] = []
+        queue = deque(lines)
+        while queue or (final and record):
+            if queue:
+                line = queue.popleft()
+                record.append(line)
+                record_chars += len(line)
+                quoted ^= bool(line.count('"') & 1)
+                if not quoted:
+                    complete.extend(record)
+                    record, record_chars = [], 0
+                    continue
+                if len(record) <= MAX_RECORD_LINES and record_chars <= MAX_RECORD_CHARS:
+                    continue
+            parse(complete, records)
+            complete = []
+            records.append("Unterminated quoted field")
+            queue.extendleft(reversed(record[1:]))
+            record, record_chars, quoted = [], 0, False
+        parse(complete, records)
+        return records
+
+    async for lines in _text_lines(chunks):
+        yield split(lines)
+    if record:
+        yield split([], final=True)
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Summarize a ValidationError as 'field: message' pairs."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+async def read_patient_batches(
+    chunks: AsyncIterator[bytes],
+    fmt: ImportFormat,
+    batch_rows: int = IMPORT_BATCH_ROWS,
+) -> AsyncIterator[ImportBatch]:
+    """
+    Parse and validate an upload incrementally.
+
+    CSV needs a header row naming PatientCreate fields (extra columns, such
+    as id from GET /patients/export?format=csv, are ignored). NDJSON has one
+    PatientCreate object per line. Every record is validated with the
+    PatientCreate rules; records that fail are returned as rejects with
+    their 1-based record number. At most about batch_rows records (plus one
+    input chunk) are held in memory at once, whatever the size of the upload.
+
+    Args:
+        chunks: Upload body as raw byte chunks
+        fmt: ndjson or csv
+        batch_rows: Records (rows plus rejects) per yielded batch
+
+    Returns:
+        Async iterator of ImportBatch
+
+    Raises:
+        ValueError: If a line exceeds MAX_RECORD_CHARS
+    """
+    records = _csv_records(chunks) if fmt == "csv" else _ndjson_records(chunks)
+    batch = ImportBatch()
+    number = 0
+    async for parsed in records:
+        for record in parsed:
+            number += 1
+            if isinstance(record, str):
+                batch.rejects.append(PatientImportReject(row=number, error=record))
+            elif not isinstance(record, dict):
+                batch.rejects.append(
+                    PatientImportReject(row=number, error="Expected a JSON object")
+                )
+            else:
+                try:
+                    batch.rows.append((number, PatientCreate.model_validate(record)))
+                except ValidationError as e:
+                    patient_id = record.get("patientID")
+                    batch.rejects.append(
+                        PatientImportReject(
+                            row=number,
+                            patientID=patient_id if isinstance(patient_id, str) else None,
+                            error=_validation_message(e),
+                        )
+                    )
+            if len(batch.rows) + len(batch.rejects) >= batch_rows:
+                yield batch
+                batch = ImportBatch()
+    if batch.rows or batch.rejects:
+        yield batch
@@ -1,12 +1,444 @@
 """Business logic for patient operations."""
 
+import base64
+import binascii
+import json
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import astuple, dataclass, replace
+from datetime import date
+from typing import Literal
+
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, asc, desc
+from sqlalchemy import (
+    select, func, or_, and_, asc, cast, delete, desc, false, insert, literal_column, true,
+    tuple_, null, union_all, update, BigInteger, Column, Date, Integer, MetaData, String, Table,
+)
 from sqlalchemy.exc import IntegrityError
 from math import ceil
 
-from app.models.patient import Patient
-from app.schemas.patient import PatientCreate, PatientUpdate
+from app.config import settings
+from app.models.patient import ChangeHorizon, CurrentChangeXid, Patient
+from app.models.patient_deletion import PatientDeletion
+from app.models.patient_stat import PatientStat
+from app.models.table_version import TableVersion
+from app.schemas.patient import (
+    BulkPatientResult,
+    PatientBatchOperation,
+    PatientBatchResult,
+    PatientCreate,
+    PatientImportReject,
+    PatientResponse,
+    PatientUpdate,
+)
+from app.services.patient_events import (
+    MAX_EVENTS_PER_STATEMENT,
+    RESYNC_EVENT,
+    PatientEventBroker,
+    Subscription,
+)
+from app.services.patient_import import IMPORT_BATCH_ROWS, ImportBatch
+from app.services.query_cache import MISSING, QueryCache
+
+CountMode = Literal["exact", "estimated", "none"]
+SearchMode = Literal["substring", "fulltext"]
+ConflictMode = Literal["skip", "update", "fail"]
+ImportConflictMode = Literal["skip", "update"]
+
+# Rows per multi-row INSERT (7 bind parameters each, far below driver limits)
+BULK_CHUNK_SIZE = 1000
+
+# Read caches; see QueryCache for the per-process caveat
+patient_list_cache = QueryCache(settings.query_cache_size, settings.query_cache_ttl)
+patient_detail_cache = QueryCache(settings.query_cache_size, settings.query_cache_ttl)
+
+# Subscribers of GET /patients/events in this process
+patient_event_broker = PatientEventBroker(
+    settings.events_queue_size, settings.events_max_subscribers
+)
+
+# Text search configuration of the search_vector column (revision 004)
+FULLTEXT_CONFIG = "english"
+
+
+@dataclass(frozen=True)
+class PatientFilters:
+    """Structured list filters; unset fields do not filter."""
+
+    age_min: int | None = None
+    age_max: int | None = None
+    gender: str | None = None
+    medical_condition: str | None = None
+    last_visit_from: date | None = None
+    last_visit_to: date | None = None
+
+    def __bool__(self) -> bool:
+        """True if any filter is set."""
+        return any(value is not None for value in astuple(self))
+
+    def validate(self) -> None:
+        """Raise ValueError if a range is empty by construction."""
+        if self.age_min is not None and self.age_max is not None and self.age_min > self.age_max:
+            raise ValueError("age_min must not be greater than age_max")
+        if (
+            self.last_visit_from is not None
+            and self.last_visit_to is not None
+            and self.last_visit_from > self.last_visit_to
+        ):
+            raise ValueError("last_visit_from must not be after last_visit_to")
+
+
+class PatientVersionConflictError(Exception):
+    """Raised when a conditional update names a version that is no longer current."""
+
+
+@dataclass
+class PatientRecord:
+    """A patient read as plain column values by get_patient_by_patient_id."""
+
+    fields: dict
+    id: int
+    version: int
+
+
+@dataclass
+class PatientPage:
+    """One page of patients returned by search_patients."""
+
+    items: list[dict]
+    total: int | None
+    has_more: bool
+    next_cursor: str | None
+    count_mode: CountMode
+    version: int
+    facets: dict[str, dict[str, int]] | None = None
+
+
+def _dialect_name(db: AsyncSession) -> str:
+    """Return the SQL dialect name (e.g. postgresql, sqlite) behind a session."""
+    return db.get_bind().dialect.name
+
+
+def _escape_like(term: str) -> str:
+    """Escape LIKE wildcards (and the backslash escape character) in term."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _like_pattern(term: str) -> str:
+    """Return a '%term%' LIKE pattern with wildcards in term escaped by backslash."""
+    return f"%{_escape_like(term)}%"
+
+
+def _search_filter(search: str):
+    """
+    Build the substring filter on patient_id and name for a search term.
+
+    On PostgreSQL this renders ``col ILIKE '%term%'``, which the
+    ``gin_trgm_ops`` indexes from revision 003 serve for terms of three or
+    more characters. The pattern is bound as one literal (not concatenated
+    in SQL) so the planner can extract trigrams from it, and LIKE wildcards
+    in the term are escaped so a stray ``%`` cannot widen the match. Other
+    dialects such as the SQLite test engine render ``lower(col) LIKE
+    lower(pattern)`` with the same semantics.
+
+    Args:
+        search: Raw search term from the client
+
+    Returns:
+        SQL boolean expression matching patient_id or name
+    """
+    pattern = _like_pattern(search)
+    return or_(
+        Patient.patient_id.ilike(pattern, escape="\\"),
+        Patient.name.ilike(pattern, escape="\\"),
+    )
+
+
+def _fulltext_filter(db: AsyncSession, search: str) -> tuple:
+    """
+    Build the full-text match over name and medical_condition.
+
+    On PostgreSQL the term is parsed with ``websearch_to_tsquery`` and matched
+    against the stored, GIN-indexed ``search_vector`` column (name weighted
+    above medical_condition), with ``ts_rank_cd`` as relevance. The column is
+    kept by a database trigger and deliberately not mapped on the model. Other
+    dialects fall back to requiring every word as a substring of either
+    column, without ranking.
+
+    Args:
+        db: Database session
+        search: Search phrase from the client
+
+    Returns:
+        Tuple of (SQL boolean expression, rank expression or None)
+    """
+    if _dialect_name(db) == "postgresql":
+        config = literal_column(f"'{FULLTEXT_CONFIG}'::regconfig")
+        tsquery = func.websearch_to_tsquery(config, search)
+        vector = literal_column(f"{Patient.__tablename__}.search_vector")
+        return vector.op("@@")(tsquery), func.ts_rank_cd(vector, tsquery)
+
+    conditions = []
+    for word in search.split():
+        pattern = _like_pattern(word)
+        conditions.append(
+            or_(
+                Patient.name.ilike(pattern, escape="\\"),
+                Patient.medical_condition.ilike(pattern, escape="\\"),
+            )
+        )
+    return and_(true(), *conditions), None
+
+
+def _apply_search(db: AsyncSession, query, search: str | None, search_mode: SearchMode):
+    """
+    Narrow a patients query by the list endpoint's search parameters.
+
+    Args:
+        db: Database session (selects the dialect-specific full-text filter)
+        query: Select over the patients table
+        search: Search term (no filtering when empty)
+        search_mode: substring or fulltext
+
+    Returns:
+        Tuple of (filtered query, relevance rank expression or None)
+    """
+    if not search:
+        return query, None
+    if search_mode == "fulltext":
+        condition, rank = _fulltext_filter(db, search)
+        return query.where(condition), rank
+    return query.where(_search_filter(search)), None
+
+
+def _apply_filters(query, filters: PatientFilters | None):
+    """
+    Narrow a patients query by the list endpoint's structured filters.
+
+    Each filter is a plain equality or range predicate (bounds inclusive) on
+    an indexed column; see revisions 006 and 007.
+
+    Args:
+        query: Select over the patients table
+        filters: Filters to apply (None or empty for no filtering)
+
+    Returns:
+        Filtered query
+    """
+    if not filters:
+        return query
+    conditions = []
+    if filters.age_min is not None:
+        conditions.append(Patient.age >= filters.age_min)
+    if filters.age_max is not None:
+        conditions.append(Patient.age <= filters.age_max)
+    if filters.gender is not None:
+        conditions.append(Patient.gender == filters.gender)
+    if filters.medical_condition is not None:
+        conditions.append(Patient.medical_condition == filters.medical_condition)
+    if filters.last_visit_from is not None:
+        conditions.append(Patient.last_visit >= filters.last_visit_from)
+    if filters.last_visit_to is not None:
+        conditions.append(Patient.last_visit <= filters.last_visit_to)
+    return query.where(*conditions)
+
+
+def _apply_order(query, sort_column, sort_order: str, rank=None):
+    """Order by relevance when ranked, else by the sort column; id breaks ties."""
+    if rank is not None:
+        return query.order_by(desc(rank), asc(Patient.id))
+    direction = desc if sort_order == "desc" else asc
+    return query.order_by(direction(sort_column), direction(Patient.id))
+
+
+# Response field names (camelCase, as in PatientResponse) and their columns
+response_field_columns = {
+    "id": Patient.id,
+    "patientID": Patient.patient_id,
+    "name": Patient.name,
+    "age": Patient.age,
+    "gender": Patient.gender,
+    "medicalCondition": Patient.medical_condition,
+    "lastVisit": Patient.last_visit,
+}
+
+# Response field name of each column, by column key
+_column_response_fields = {
+    column.key: field for field, column in response_field_columns.items()
+}
+
+
+# Columns that GET /patients can facet on, by response field name
+facet_columns = {
+    "gender": Patient.gender,
+    "medicalCondition": Patient.medical_condition,
+}
+
+
+def parse_facets(facets: str | None) -> tuple[str, ...]:
+    """
+    Validate a comma-separated facet list such as "gender,medicalCondition".
+
+    Args:
+        facets: Value of the facets= query parameter (None or empty for no facets)
+
+    Returns:
+        Requested facet names, in facet_columns order
+
+    Raises:
+        ValueError: If a name is not a facetable field
+    """
+    requested = {name.strip() for name in (facets or "").split(",") if name.strip()}
+    unknown = requested - facet_columns.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown facets: {', '.join(sorted(unknown))} "
+            f"(valid facets: {', '.join(facet_columns)})"
+        )
+    return tuple(name for name in facet_columns if name in requested)
+
+
+def _facet_counts_column(
+    db: AsyncSession,
+    facets: tuple[str, ...],
+    search: str | None,
+    search_mode: SearchMode,
+    filters: PatientFilters | None,
+):
+    """
+    Scalar subquery aggregating per-value counts of each facet into one JSON array.
+
+    Each element is [value of facet 1 or null, ..., value of facet N or null,
+    count]; exactly one value is set (facet columns are NOT NULL). Counts
+    cover the same rows as the list filters, not just one page.
+
+    On PostgreSQL a single GROUPING SETS pass counts every facet, so the
+    filtered set (often an index-only scan) is read once however many facets
+    are requested. Other dialects fall back to one GROUP BY per facet.
+    """
+    columns = [facet_columns[name] for name in facets]
+
+    def matching(*selected):
+        query, _ = _apply_search(db, select(*selected, func.count()), search, search_mode)
+        return _apply_filters(query, filters)
+
+    if _dialect_name(db) == "postgresql":
+        grouped = matching(*columns).group_by(func.grouping_sets(*columns)).subquery()
+        aggregate = func.json_agg(func.json_build_array(*grouped.c))
+    else:
+        grouped = union_all(
+            *(
+                matching(
+                    *(
+                        (other if other is column else null()).label(f"facet_{i}")
+                        for i, other in enumerate(columns)
+                    )
+                ).group_by(column)
+                for column in columns
+            )
+        ).subquery()
+        aggregate = func.json_group_array(func.json_array(*grouped.c))
+    return select(aggregate).scalar_subquery()
+
+
+def _facet_counts(facets: tuple[str, ...], rows) -> dict[str, dict[str, int]]:
+    """Decode the _facet_counts_column array into {facet: {value: count}}, largest first."""
+    if isinstance(rows, str):
+        rows = json.loads(rows)
+    counts = {name: [] for name in facets}
+    for *values, n in rows or []:
+        for name, value in zip(facets, values):
+            if value is not None:
+                counts[name].append((value, n))
+    return {
+        name: dict(sorted(pairs, key=lambda pair: (-pair[1], pair[0])))
+        for name, pairs in counts.items()
+    }
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...]:
+    """
+    Validate a comma-separated sparse fieldset such as "patientID,name".
+
+    Args:
+        fields: Value of the fields= query parameter (None or empty for all fields)
+
+    Returns:
+        Requested response field names, in response order
+
+    Raises:
+        ValueError: If a name is not a PatientResponse field
+    """
+    requested = {name.strip() for name in (fields or "").split(",") if name.strip()}
+    unknown = requested - response_field_columns.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))} "
+            f"(valid fields: {', '.join(response_field_columns)})"
+        )
+    return tuple(name for name in response_field_columns if not requested or name in requested)
+
+
+# Sortable columns exposed by the list endpoint (camelCase aliases included)
+sort_column_map = {
+    "patient_id": Patient.patient_id,
+    "patientID": Patient.patient_id,
+    "name": Patient.name,
+    "age": Patient.age,
+}
+
+
+def encode_cursor(sort_by: str, sort_order: str, value, last_id: int) -> str:
+    """
+    Encode the position after a row as an opaque keyset cursor.
+
+    Args:
+        sort_by: Sort key the cursor was produced for
+        sort_order: Sort order the cursor was produced for (asc or desc)
+        value: Sort column value of the last row returned
+        last_id: Primary key of the last row returned (tie-breaker)
+
+    Returns:
+        URL-safe cursor token
+    """
+    payload = json.dumps([sort_by, sort_order, value, last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> tuple:
+    """
+    Decode a keyset cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor token from a previous page's next_cursor
+        sort_by: Sort key of the current request
+        sort_order: Sort order of the current request
+
+    Returns:
+        Tuple of (sort column value, last id)
+
+    Raises:
+        ValueError: If the cursor is malformed (including a value or id of the
+            wrong type) or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort_by, cursor_order, value, last_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if cursor_sort_by != sort_by or cursor_order != sort_order:
+        raise ValueError("Cursor does not match the requested sort order")
+    # Exact type checks: bool is an int subclass, and a list or dict would
+    # only fail later inside the row comparison
+    value_type = sort_column_map[sort_by].type.python_type
+    if type(last_id) is not int or type(value) is not value_type:
+        raise ValueError("Invalid cursor")
+    return value, last_id
 
 
 async def get_all_patients(db: AsyncSession) -> list[Patient]:
@@ -30,10 +462,45 @@ async def search_patients(
     page_size: int = 20,
     sort_by: str = "patient_id",
     sort_order: str = "asc",
-) -> tuple[list[Patient], int]:
+    cursor: str | None = None,
+    count: CountMode = "exact",
+    search_mode: SearchMode = "substring",
+    fields: tuple[str, ...] | None = None,
+    filters: PatientFilters | None = None,
+    facets: tuple[str, ...] = (),
+) -> PatientPage:
     """
     Search and retrieve patients with pagination and sorting.
 
+    Rows are ordered by the sort column with ``id`` as tie-breaker. When a
+    cursor is given the page is located with a keyset predicate on
+    ``(sort_column, id)`` instead of OFFSET, so deep pages cost the same as
+    the first one and ``page`` is ignored.
+
+    With ``search_mode="fulltext"`` the search term is matched against the
+    stored ``search_vector`` (name and medical_condition) and rows are
+    ordered by relevance; sort_by/sort_order and cursors do not apply.
+
+    ``filters`` adds equality/range predicates on indexed columns, which
+    apply to the page and the total alike.
+
+    ``facets`` adds per-value counts (e.g. by gender) over all matching rows,
+    carried by the same statement as the page; see _facet_counts_column.
+
+    ``fields`` narrows the SQL projection to the requested columns (plus
+    ``id`` and the sort column, needed for the cursor), so a covering index
+    can answer the query with an index-only scan.
+
+    The total is fetched in the same statement as the page, and only for
+    OFFSET pages: with a cursor ``count`` is ignored and reported as ``none``,
+    since counting the filtered set would make every deep page scan it.
+
+    - ``exact``: ``(SELECT count(*) FROM (<filtered>))`` scalar subquery,
+      so the page itself can still stop after page_size + 1 rows
+    - ``estimated``: planner row estimate from ``pg_class.reltuples``; only
+      for unfiltered lists on PostgreSQL, otherwise falls back to ``exact``
+    - ``none``: no total, callers rely on ``has_more``
+
     Args:
         db: Database session
         search: Search term to filter by patientID or name
@@ -41,75 +508,688 @@ async def search_patients(
         page_size: Number of items per page
         sort_by: Field to sort by (patient_id, name, age)
         sort_order: Sort order (asc or desc)
+        cursor: Keyset cursor from a previous page's next_cursor (optional)
+        count: Count strategy (exact, estimated or none)
+        search_mode: substring (patientID/name) or fulltext (name/medicalCondition)
+        fields: Response fields to return, from parse_fields (default: all)
+        filters: Structured filters (age range, gender, condition, last visit)
+        facets: Facets to count, from parse_facets (default: none)
 
     Returns:
-        Tuple of (list of Patient models, total count)
+        PatientPage with the rows (dicts keyed by camelCase response field
+        names, ready for direct JSON serialization), total and the count mode
+        that produced it
+        (possibly served from patient_list_cache without touching the database)
+
+    Raises:
+        ValueError: If the cursor is invalid for the requested sort, or a
+            filter range is empty
     """
-    # Build base query
-    query = select(Patient)
+    if filters:
+        filters.validate()
+    # Normalize parameters so equivalent requests share a cache entry
+    sort_column = sort_column_map.get(sort_by, Patient.patient_id)
+    sort_by = sort_column.key
+    sort_order = "desc" if sort_order.lower() == "desc" else "asc"
+    search = search or None
+    fields = tuple(fields or response_field_columns)
+    cache_key = (
+        fields,
+        filters or None,
+        facets,
+        search,
+        search_mode if search else None,
+        None if cursor else page,
+        page_size,
+        sort_by,
+        sort_order,
+        cursor,
+        count,
+    )
+    generation = patient_list_cache.generation
+    cached = patient_list_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    # Plain column rows: no ORM instances, identity map or per-row validation.
+    # id and the sort column are always read, to build next_cursor.
+    sort_field = _column_response_fields[sort_column.key]
+    query_fields = [
+        name
+        for name in response_field_columns
+        if name in fields or name in ("id", sort_field)
+    ]
+    query = select(*(response_field_columns[name] for name in query_fields))
 
     # Apply search filter
-    if search:
-        search_term = f"%{search}%"
-        query = query.where(
-            or_(
-                Patient.patient_id.ilike(search_term),
-                Patient.name.ilike(search_term),
+    fulltext = bool(search) and search_mode == "fulltext"
+    if fulltext and cursor:
+        raise ValueError("Cursor pagination is not supported for full-text search")
+    query, rank = _apply_search(db, query, search, search_mode)
+    query = _apply_filters(query, filters)
+
+    if cursor:
+        # Keyset pages stay O(page_size): the first page already carried the total
+        count = "none"
+    elif count == "estimated" and (search or filters or _dialect_name(db) != "postgresql"):
+        # Planner statistics describe the whole table, not a filtered subset
+        count = "exact"
+
+    # Total count column, evaluated in the same statement as the page
+    filtered = query
+    if count == "estimated":
+        total_column = literal_column(
+            "(SELECT reltuples::bigint FROM pg_class WHERE oid = 'patients'::regclass)",
+            BigInteger,
+        )
+    elif count == "exact":
+        # Uncorrelated scalar subquery, computed once: unlike count(*) OVER ()
+        # it leaves the outer ORDER BY ... LIMIT free to stop at page_size rows
+        total_column = select(func.count()).select_from(filtered.subquery()).scalar_subquery()
+    else:
+        total_column = None
+    if total_column is not None:
+        query = query.add_columns(total_column.label("total"))
+    # Collection version read in the same snapshot as the rows (for list ETags)
+    query = query.add_columns(_patients_version_column().label("version"))
+    facet_column = None
+    if facets:
+        facet_column = _facet_counts_column(db, facets, search, search_mode, filters)
+        query = query.add_columns(facet_column.label("facets"))
+
+    # Apply sorting (id breaks ties so the order is stable across pages)
+    query = _apply_order(query, sort_column, sort_order, rank)
+
+    # Apply pagination: keyset when a cursor is given, OFFSET otherwise
+    offset = 0
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        position = tuple_(sort_column, Patient.id)
+        if sort_order == "desc":
+            query = query.where(position < tuple_(value, last_id))
+        else:
+            query = query.where(position > tuple_(value, last_id))
+    else:
+        offset = (page - 1) * page_size
+        query = query.offset(offset)
+
+    # Fetch one extra row to learn whether a next page exists
+    result = await db.execute(query.limit(page_size + 1))
+    rows = result.all()
+    patients = [dict(zip(query_fields, row)) for row in rows]
+
+    version = rows[0].version if rows else await get_patients_version(db)
+
+    total = None
+    if total_column is not None:
+        if rows:
+            total = rows[0].total
+        elif offset == 0:
+            total = 0
+        else:
+            # Past the end: no row carried the total, so count separately
+            count_query = select(func.count()).select_from(filtered.subquery())
+            total = (await db.execute(count_query)).scalar_one()
+            count = "exact"
+        if count == "estimated":
+            # reltuples is -1 before the first ANALYZE and may lag behind inserts;
+            # the lookahead row is not on this page, so it does not count
+            total = max(total, offset + min(len(patients), page_size))
+
+    facet_counts = None
+    if facet_column is not None:
+        if rows:
+            facet_rows = rows[0].facets
+        elif offset == 0 and not cursor:
+            facet_rows = []
+        else:
+            # Past the end: no row carried the facets, so count separately
+            facet_rows = (await db.execute(select(facet_column))).scalar_one()
+        facet_counts = _facet_counts(facets, facet_rows)
+
+    has_more = len(patients) > page_size
+    next_cursor = None
+    if has_more:
+        patients = patients[:page_size]
+        last = patients[-1]
+        if not fulltext:
+            next_cursor = encode_cursor(
+                sort_by,
+                sort_order,
+                last[sort_field],
+                last["id"],
+            )
+    if len(query_fields) > len(fields):
+        patients = [{name: patient[name] for name in fields} for patient in patients]
+
+    patient_page = PatientPage(
+        items=patients,
+        total=total,
+        has_more=has_more,
+        next_cursor=next_cursor,
+        count_mode=count,
+        version=version,
+        facets=facet_counts,
+    )
+    patient_list_cache.set(cache_key, patient_page, generation)
+    return patient_page
+
+
+def _prefix_matches(db: AsyncSession, column, prefix: str, source: int, limit: int):
+    """
+    Select up to limit (source, sort key, patient_id, name) rows whose column starts with prefix.
+
+    Matching is case-insensitive on lower(column). On PostgreSQL the
+    ``text_pattern_ops`` expression indexes from revision 008 serve both the
+    LIKE prefix and the ``USING ~<~`` ordering, so the scan stops after
+    limit index entries.
+    """
+    key = func.lower(column)
+    query = select(
+        literal_column(str(source)).label("source"),
+        key.label("sort_key"),
+        Patient.patient_id,
+        Patient.name,
+    ).where(key.like(f"{_escape_like(prefix.lower())}%", escape="\\"))
+    if _dialect_name(db) == "postgresql":
+        # Pattern-ops order (byte-wise), matching the index rather than the collation
+        order = literal_column(f"lower({column.expression}) USING ~<~")
+    else:
+        order = key
+    return select(query.order_by(order).limit(limit).subquery())
+
+
+async def suggest_patients(db: AsyncSession, q: str, limit: int = 10) -> list[dict]:
+    """
+    Return typeahead suggestions: patients whose patientID or name starts with q.
+
+    Unlike search_patients there is no count and only patientID and name are
+    read. Both prefix scans run in one UNION ALL statement; patientID matches
+    come first, then name matches, each in prefix order. Results are cached
+    in patient_list_cache, so repeated keystrokes cost no query until the
+    next write.
+
+    Args:
+        db: Database session
+        q: Prefix typed so far (case-insensitive; empty returns no suggestions)
+        limit: Maximum number of suggestions
+
+    Returns:
+        List of {"patientID", "name"} dicts
+    """
+    q = q.strip()
+    if not q:
+        return []
+    cache_key = ("suggest", q.lower(), limit)
+    generation = patient_list_cache.generation
+    cached = patient_list_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    query = union_all(
+        _prefix_matches(db, Patient.patient_id, q, 0, limit),
+        _prefix_matches(db, Patient.name, q, 1, limit),
+    )
+    rows = sorted((await db.execute(query)).all(), key=lambda row: (row[0], row[1]))
+
+    suggestions = []
+    seen = set()
+    for _, _, patient_id, name in rows:
+        if patient_id not in seen:
+            seen.add(patient_id)
+            suggestions.append({"patientID": patient_id, "name": name})
+    suggestions = suggestions[:limit]
+    patient_list_cache.set(cache_key, suggestions, generation)
+    return suggestions
+
+
+def encode_sync_token(
+    change_xid: int, last_id: int, deletion_xid: int, deletion_id: int
+) -> str:
+    """
+    Encode a delta sync watermark as an opaque token.
+
+    Args:
+        change_xid: change_xid of the last change returned (0 before any)
+        last_id: Primary key of the last change returned (tie-breaker)
+        deletion_xid: change_xid of the last patient_deletions entry returned
+        deletion_id: Id of the last patient_deletions entry returned
+
+    Returns:
+        URL-safe sync token
+    """
+    payload = json.dumps([change_xid, last_id, deletion_xid, deletion_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> tuple[int, int, int, int]:
+    """
+    Decode a delta sync token produced by encode_sync_token.
+
+    Args:
+        token: Token from a previous response's next_since
+
+    Returns:
+        Tuple of (change xid, last id, deletion xid, deletion id)
+
+    Raises:
+        ValueError: If the token is malformed (including tokens issued before
+            the watermark moved from updated_at to change_xid)
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        watermark = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid sync token") from e
+    if (
+        not isinstance(watermark, list)
+        or len(watermark) != 4
+        or not all(type(part) is int for part in watermark)
+    ):
+        raise ValueError("Invalid sync token")
+    return tuple(watermark)
+
+
+async def get_patient_changes(db: AsyncSession, since: str | None, limit: int = 500) -> dict:
+    """
+    Return patients written and deleted after a sync watermark.
+
+    Changes are rows whose (change_xid, id) follows the watermark, in that
+    order, read through the (change_xid, id) index; deletions come from the
+    trigger-maintained patient_deletions log, keyed the same way. Both are
+    capped at limit, so each call costs O(limit) however large the table is.
+    Without ``since`` every current patient is returned (an initial full
+    sync) and older deletions are skipped.
+
+    Each query stops below ChangeHorizon(), computed from the query's own
+    snapshot: writes of transactions still in progress (which may commit in
+    any order) wait for the next call instead of being passed over, so a
+    long transaction holds the feed back rather than losing rows from it.
+
+    Clients should key rows by ``id``: a patientID can be deleted and reused,
+    and the tombstone then names the old id.
+
+    Args:
+        db: Database session
+        since: Token from a previous response's next_since (None for a full sync)
+        limit: Maximum changes and maximum deletions per response
+
+    Returns:
+        Dictionary with changes (camelCase patient dicts), deleted
+        (id/patientID/deletedAt), next_since and has_more (call again with
+        next_since until false)
+
+    Raises:
+        ValueError: If since is not a valid sync token
+    """
+    if since:
+        change_xid, last_id, deletion_xid, deletion_id = decode_sync_token(since)
+    else:
+        # Skip deletions already committed; read before the changes, so any
+        # tombstone past this horizon names a patient the full sync may return
+        change_xid, last_id = 0, 0
+        deletion_xid, deletion_id = await db.scalar(select(ChangeHorizon())), 0
+
+    change_rows = (
+        await db.execute(
+            select(*response_field_columns.values(), Patient.change_xid)
+            .where(
+                tuple_(Patient.change_xid, Patient.id) > tuple_(change_xid, last_id),
+                Patient.change_xid < ChangeHorizon(),
             )
+            .order_by(Patient.change_xid, Patient.id)
+            .limit(limit + 1)
         )
+    ).all()
+    deletion_rows = (
+        await db.execute(
+            select(
+                PatientDeletion.id,
+                PatientDeletion.patient_pk,
+                PatientDeletion.patient_id,
+                PatientDeletion.deleted_at,
+                PatientDeletion.change_xid,
+            )
+            .where(
+                tuple_(PatientDeletion.change_xid, PatientDeletion.id)
+                > tuple_(deletion_xid, deletion_id),
+                PatientDeletion.change_xid < ChangeHorizon(),
+            )
+            .order_by(PatientDeletion.change_xid, PatientDeletion.id)
+            .limit(limit + 1)
+        )
+    ).all()
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
+    has_more = len(change_rows) > limit or len(deletion_rows) > limit
+    change_rows = change_rows[:limit]
+    deletion_rows = deletion_rows[:limit]
+    if change_rows:
+        change_xid, last_id = change_rows[-1].change_xid, change_rows[-1].id
+    if deletion_rows:
+        deletion_xid, deletion_id = deletion_rows[-1].change_xid, deletion_rows[-1].id
 
-    # Apply sorting
-    sort_column_map = {
-        "patient_id": Patient.patient_id,
-        "patientID": Patient.patient_id,
-        "name": Patient.name,
-        "age": Patient.age,
+    return {
+        "changes": [dict(zip(response_field_columns, row)) for row in change_rows],
+        "deleted": [
+            {"id": row.patient_pk, "patientID": row.patient_id, "deletedAt": row.deleted_at}
+            for row in deletion_rows
+        ],
+        "next_since": encode_sync_token(change_xid, last_id, deletion_xid, deletion_id),
+        "has_more": has_more,
     }
+
+
+# Conditions listed in /patients/stats, most common first
+STATS_TOP_CONDITIONS = 10
+
+# Visit recency buckets: (upper bound in calendar months ago or None, label)
+VISIT_RECENCY_BUCKETS = [
+    (3, "0-3 months"),
+    (6, "3-6 months"),
+    (12, "6-12 months"),
+    (None, "12+ months"),
+]
+
+
+async def get_patient_stats(db: AsyncSession, today: date | None = None) -> dict:
+    """
+    Read the dashboard statistics from the trigger-maintained patient_stats summary.
+
+    Cost depends on the number of buckets (genders, conditions, decades,
+    visit months), not on the number of patients. The summary is updated in
+    the same transaction as every patients write, so it is exact as of the
+    read; ``updated_at`` is when it last changed. Results are cached in
+    patient_list_cache until the next write.
+
+    Args:
+        db: Database session
+        today: Reference date for visit recency (default: today)
+
+    Returns:
+        Dictionary with total, gender, top_conditions, age_histogram,
+        visit_recency and updated_at
+    """
+    today = today or date.today()
+    cache_key = ("stats", today)
+    generation = patient_list_cache.generation
+    cached = patient_list_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    # Buckets are split into per-writer slots; a bucket's count is their sum
+    bucket_count = cast(func.sum(PatientStat.count), BigInteger)
+    result = await db.execute(
+        select(
+            PatientStat.dimension,
+            PatientStat.bucket,
+            bucket_count,
+            func.max(PatientStat.updated_at),
+        )
+        .group_by(PatientStat.dimension, PatientStat.bucket)
+        .having(bucket_count > 0)
+    )
+    counts: dict[str, dict[str, int]] = {}
+    updated_at = None
+    for dimension, bucket, count, changed in result.all():
+        counts.setdefault(dimension, {})[bucket] = count
+        if changed is not None and (updated_at is None or changed > updated_at):
+            updated_at = changed
+
+    def largest_first(buckets: dict[str, int]) -> list[tuple[str, int]]:
+        return sorted(buckets.items(), key=lambda item: (-item[1], item[0]))
+
+    recency = {label: 0 for _, label in VISIT_RECENCY_BUCKETS}
+    for month, count in counts.get("visit_month", {}).items():
+        year, month_number = map(int, month.split("-"))
+        months_ago = (today.year - year) * 12 + today.month - month_number
+        label = next(
+            label
+            for bound, label in VISIT_RECENCY_BUCKETS
+            if bound is None or months_ago < bound
+        )
+        recency[label] += count
+
+    stats = {
+        "total": counts.get("total", {}).get("", 0),
+        "gender": dict(largest_first(counts.get("gender", {}))),
+        "top_conditions": [
+            {"bucket": condition, "count": count}
+            for condition, count in largest_first(counts.get("condition", {}))[
+                :STATS_TOP_CONDITIONS
+            ]
+        ],
+        "age_histogram": [
+            {"bucket": f"{decade}-{decade + 9}", "count": count}
+            for decade, count in sorted(
+                (int(decade), count) for decade, count in counts.get("age", {}).items()
+            )
+        ],
+        "visit_recency": [{"bucket": label, "count": count} for label, count in recency.items()],
+        "updated_at": updated_at,
+    }
+    patient_list_cache.set(cache_key, stats, generation)
+    return stats
+
+
+async def stream_patients(
+    db: AsyncSession,
+    search: str | None = None,
+    sort_by: str = "patient_id",
+    sort_order: str = "asc",
+    search_mode: SearchMode = "substring",
+    batch_size: int = 1000,
+    filters: PatientFilters | None = None,
+) -> AsyncIterator[list[dict]]:
+    """
+    Stream every patient matching the list filters, in bounded batches.
+
+    Plain column rows are read through a server-side cursor (``stream`` with
+    ``yield_per``), so at most ``batch_size`` rows are held in memory at a
+    time regardless of table size. Filtering and ordering match
+    search_patients.
+
+    Args:
+        db: Database session (kept open for the whole iteration)
+        search: Search term to filter by
+        sort_by: Field to sort by (patient_id, name, age)
+        sort_order: Sort order (asc or desc)
+        search_mode: substring or fulltext
+        batch_size: Rows fetched from the cursor per round trip
+        filters: Structured filters, as for search_patients
+
+    Yields:
+        Lists of up to batch_size dicts keyed by camelCase response field names
+    """
     sort_column = sort_column_map.get(sort_by, Patient.patient_id)
-    if sort_order.lower() == "desc":
-        query = query.order_by(desc(sort_column))
-    else:
-        query = query.order_by(asc(sort_column))
+    sort_order = "desc" if sort_order.lower() == "desc" else "asc"
+
+    query = select(*response_field_columns.values())
+    query, rank = _apply_search(db, query, search, search_mode)
+    query = _apply_filters(query, filters)
+    query = _apply_order(query, sort_column, sort_order, rank)
+
+    fields = list(response_field_columns)
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.partitions():
+        yield [dict(zip(fields, row)) for row in partition]
+
+
+def _patients_version_column():
+    """Scalar subquery returning the patients collection version (0 if never written)."""
+    return func.coalesce(
+        select(cast(func.sum(TableVersion.version), BigInteger))
+        .where(TableVersion.table_name == Patient.__tablename__)
+        .scalar_subquery(),
+        0,
+    )
+
+
+async def get_patients_version(db: AsyncSession) -> int:
+    """
+    Read the patients collection version maintained by the table_versions trigger.
+
+    The version is the sum of the table's counter slots, so it is a handful
+    of primary key lookups however many writers bumped it.
+
+    The version changes on every committed write to the patients table, so it
+    identifies the state of every list view without touching patient rows.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Current collection version
+    """
+    result = await db.execute(select(_patients_version_column()))
+    return result.scalar_one()
 
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.limit(page_size).offset(offset)
 
-    # Execute query
-    result = await db.execute(query)
-    patients = list(result.scalars().all())
+async def get_patient_version(db: AsyncSession, patient_id: str) -> tuple | None:
+    """
+    Read only the fields that identify a patient's current revision.
+
+    Args:
+        db: Database session
+        patient_id: Patient ID (e.g., "P001")
 
-    return patients, total
+    Returns:
+        Tuple of (id, version) if found, None otherwise
+    """
+    result = await db.execute(
+        select(Patient.id, Patient.version).where(Patient.patient_id == patient_id)
+    )
+    row = result.one_or_none()
+    return tuple(row) if row is not None else None
 
 
 async def get_patient_by_patient_id(
-    db: AsyncSession, patient_id: str
-) -> Patient | None:
+    db: AsyncSession,
+    patient_id: str,
+    revision: tuple | None = None,
+    fields: tuple[str, ...] | None = None,
+) -> PatientRecord | None:
     """
-    Retrieve a patient by patient_id.
+    Retrieve a patient by patient_id as plain column values.
+
+    Only the response columns and version (for the ETag) are selected;
+    no ORM instance is built. Results (including "not found") are served
+    from patient_detail_cache when possible, in which case no connection is
+    checked out. The returned record may be shared between requests and
+    must not be modified.
+
+    A sparse fieldset is cut from the cached full record when there is one;
+    otherwise only the requested columns are selected and nothing is cached.
 
     Args:
         db: Database session
         patient_id: Patient ID (e.g., "P001")
+        revision: Current (id, version) from get_patient_version, if the
+            caller already read it; a cached record of another revision
+            (e.g. after a write by another worker) is then refetched
+        fields: Response fields to return, from parse_fields (default: all)
 
     Returns:
-        Patient model if found, None otherwise
+        PatientRecord if found, None otherwise
     """
+    fields = tuple(fields or response_field_columns)
+    sparse = len(fields) < len(response_field_columns)
+    generation = patient_detail_cache.generation
+    cached = patient_detail_cache.get(patient_id)
+    if cached is not MISSING and (
+        revision is None
+        or (cached is not None and (cached.id, cached.version) == revision)
+    ):
+        if cached is not None and sparse:
+            return replace(cached, fields={name: cached.fields[name] for name in fields})
+        return cached
+
+    result = await db.execute(
+        select(
+            Patient.id,
+            Patient.version,
+            *(response_field_columns[name] for name in fields),
+        ).where(Patient.patient_id == patient_id)
+    )
+    row = result.one_or_none()
+    record = None
+    if row is not None:
+        record = PatientRecord(
+            fields=dict(zip(fields, row[2:])), id=row[0], version=row[1]
+        )
+    if not sparse:
+        patient_detail_cache.set(patient_id, record, generation)
+    return record
+
+
+async def _fetch_patient(db: AsyncSession, patient_id: str) -> Patient | None:
+    """Load a patient by patient_id from the database, bypassing the cache."""
     result = await db.execute(
         select(Patient).where(Patient.patient_id == patient_id)
     )
     return result.scalar_one_or_none()
 
 
+def _invalidate_patient_caches(*patient_ids: str) -> None:
+    """
+    Drop cached reads affected by a committed write.
+
+    Detail entries are dropped only for the given patient IDs (old and new
+    IDs on a rename, so a cached "not found" is cleared too). Any write can
+    change list membership, order and totals, so every list entry is dropped.
+    """
+    for patient_id in patient_ids:
+        patient_detail_cache.invalidate(patient_id)
+    patient_list_cache.clear()
+
+
+def subscribe_patient_events(db: AsyncSession) -> Subscription:
+    """
+    Register a GET /patients/events subscriber in this process.
+
+    On PostgreSQL this also starts the process's LISTEN connection on first
+    use. It connects to DATABASE_URL_MIGRATION when set, because LISTEN
+    does not work through transaction-mode poolers such as Supabase's on
+    port 6543.
+
+    Raises:
+        OverflowError: If this process already has its maximum of subscribers
+    """
+    if _dialect_name(db) == "postgresql":
+        patient_event_broker.ensure_listening(
+            settings.database_url_migration or settings.database_url
+        )
+    return patient_event_broker.subscribe()
+
+
+def _patient_event(event_type: str, pk: int, patient_id: str) -> dict:
+    """Build a change event as sent to GET /patients/events subscribers."""
+    return {"type": event_type, "id": pk, "patientID": patient_id}
+
+
+async def _commit_with_events(db: AsyncSession, events: list[dict]) -> None:
+    """
+    Commit the session and announce its patient events.
+
+    On PostgreSQL the notify_patient_events triggers already sent the
+    events with NOTIFY inside the transaction, so they reach the LISTEN
+    connection of every worker only if the commit succeeds, at no extra
+    statement. Other databases have a single process; events are published
+    to the local broker after commit, collapsed into one resync above
+    MAX_EVENTS_PER_STATEMENT like the trigger does.
+    """
+    await db.commit()
+    if events and _dialect_name(db) != "postgresql":
+        if len(events) > MAX_EVENTS_PER_STATEMENT:
+            events = [RESYNC_EVENT]
+        patient_event_broker.publish(events)
+
+
 async def create_patient(db: AsyncSession, patient_data: PatientCreate) -> Patient:
     """
     Create a new patient in the database.
 
+    Issues a single INSERT ... RETURNING (no refresh afterwards) plus commit.
+
     Args:
         db: Database session
         patient_data: Patient creation data
@@ -121,74 +1201,92 @@ async def create_patient(db: AsyncSession, patient_data: PatientCreate) -> Patie
         IntegrityError: If patient_id already exists
     """
     # Convert camelCase to snake_case for database
-    patient = Patient(
-        patient_id=patient_data.patientID,
-        name=patient_data.name,
-        age=patient_data.age,
-        gender=patient_data.gender,
-        medical_condition=patient_data.medicalCondition,
-        last_visit=patient_data.lastVisit,
-    )
-
-    db.add(patient)
+    statement = insert(Patient).values(**_patient_values(patient_data)).returning(Patient)
     try:
-        await db.commit()
-        await db.refresh(patient)
-        return patient
+        patient = (await db.execute(statement)).scalar_one()
+        await _commit_with_events(
+            db, [_patient_event("created", patient.id, patient.patient_id)]
+        )
     except IntegrityError as e:
         await db.rollback()
         raise e
+    _invalidate_patient_caches(patient.patient_id)
+    return patient
 
 
 async def update_patient(
-    db: AsyncSession, patient_id: str, patient_data: PatientUpdate
+    db: AsyncSession,
+    patient_id: str,
+    patient_data: PatientUpdate,
+    expected: list[tuple[int, int]] | None = None,
 ) -> Patient | None:
     """
     Update a patient by patient_id.
 
+    Issues a single UPDATE ... WHERE patient_id = :id RETURNING plus commit;
+    a missing patient is detected from the empty RETURNING set rather than a
+    prior SELECT. The update bumps the row version.
+
+    With expected versions the precondition is part of the same UPDATE
+    (``AND (id, version) = ...``), so concurrent writers never wait on a
+    lock: the loser matches no row and gets PatientVersionConflictError. Only
+    then is the row read again, to tell a conflict from a missing patient.
+
     Args:
         db: Database session
         patient_id: Patient ID to update (e.g., "P001")
         patient_data: Patient update data (only provided fields will be updated)
+        expected: (id, version) pairs, one of which must be current (optional)
 
     Returns:
         Updated Patient model if found, None otherwise
 
     Raises:
         IntegrityError: If updated patient_id already exists
+        PatientVersionConflictError: If the patient exists at none of the expected versions
     """
-    # Find the patient
-    patient = await get_patient_by_patient_id(db, patient_id)
-    if patient is None:
-        return None
-
     # Update only provided fields
-    if patient_data.patientID is not None:
-        patient.patient_id = patient_data.patientID
-    if patient_data.name is not None:
-        patient.name = patient_data.name
-    if patient_data.age is not None:
-        patient.age = patient_data.age
-    if patient_data.gender is not None:
-        patient.gender = patient_data.gender
-    if patient_data.medicalCondition is not None:
-        patient.medical_condition = patient_data.medicalCondition
-    if patient_data.lastVisit is not None:
-        patient.last_visit = patient_data.lastVisit
+    values = _update_values(patient_data)
+    if not values:
+        patient = await _fetch_patient(db, patient_id)
+        if patient is not None and expected is not None:
+            if (patient.id, patient.version) not in expected:
+                raise PatientVersionConflictError(patient_id)
+        return patient
 
+    statement = (
+        update(Patient)
+        .where(Patient.patient_id == patient_id)
+        .values(**values)
+        .returning(Patient)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    if expected is not None:
+        # An empty list matches nothing (the precondition cannot hold)
+        matches = [and_(Patient.id == pk, Patient.version == v) for pk, v in expected]
+        statement = statement.where(or_(false(), *matches))
     try:
-        await db.commit()
-        await db.refresh(patient)
-        return patient
+        patient = (await db.execute(statement)).scalar_one_or_none()
+        if patient is None:
+            if expected is not None and await get_patient_version(db, patient_id) is not None:
+                raise PatientVersionConflictError(patient_id)
+            return None
+        await _commit_with_events(
+            db, [_patient_event("updated", patient.id, patient.patient_id)]
+        )
     except IntegrityError as e:
         await db.rollback()
         raise e
+    _invalidate_patient_caches(patient_id, patient.patient_id)
+    return patient
 
 
 async def delete_patient(db: AsyncSession, patient_id: str) -> bool:
     """
     Delete a patient by patient_id.
 
+    Issues a single DELETE ... RETURNING plus commit.
+
     Args:
         db: Database session
         patient_id: Patient ID to delete (e.g., "P001")
@@ -196,11 +1294,566 @@ async def delete_patient(db: AsyncSession, patient_id: str) -> bool:
     Returns:
         True if patient was deleted, False if not found
     """
-    patient = await get_patient_by_patient_id(db, patient_id)
-    if patient is None:
+    statement = (
+        delete(Patient)
+        .where(Patient.patient_id == patient_id)
+        .returning(Patient.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = (await db.execute(statement)).first()
+    if deleted is None:
         return False
 
-    await db.delete(patient)
-    await db.commit()
+    await _commit_with_events(db, [_patient_event("deleted", deleted.id, patient_id)])
+    _invalidate_patient_caches(patient_id)
     return True
 
+
+def _patient_values(patient_data: PatientCreate) -> dict:
+    """Convert a PatientCreate (camelCase) to patients column values."""
+    return {
+        "patient_id": patient_data.patientID,
+        "name": patient_data.name,
+        "age": patient_data.age,
+        "gender": patient_data.gender,
+        "medical_condition": patient_data.medicalCondition,
+        "last_visit": patient_data.lastVisit,
+    }
+
+
+def _dialect_insert(db: AsyncSession):
+    """Return the dialect's INSERT construct (with ON CONFLICT support)."""
+    if _dialect_name(db) == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+async def batch_change_xid(db: AsyncSession) -> dict:
+    """
+    change_xid to bind into every row of a multi-row INSERT into patients.
+
+    SQLite runs the CurrentChangeXid() subquery for every VALUES row, which
+    makes a large multi-row INSERT many times slower, so the value is read
+    once per transaction instead. Rows of one transaction may share it, as
+    they do on PostgreSQL: id breaks ties. On PostgreSQL the column default
+    is a plain function call and nothing is bound.
+
+    Args:
+        db: Database session, inside the transaction that will write
+
+    Returns:
+        Column values to merge into each row ({} on PostgreSQL)
+    """
+    if _dialect_name(db) == "postgresql":
+        return {}
+    return {"change_xid": await db.scalar(select(CurrentChangeXid()))}
+
+
+async def bulk_upsert_patients(
+    db: AsyncSession,
+    patients: list[PatientCreate],
+    on_conflict: ConflictMode = "fail",
+) -> list[BulkPatientResult]:
+    """
+    Write many patients with set-based multi-row INSERT ... ON CONFLICT.
+
+    Rows are sent BULK_CHUNK_SIZE at a time, one statement per chunk, and
+    committed once. A patient_id repeated within the request is written once
+    (first occurrence) and later copies are reported as ``duplicate``;
+    with ``fail`` a duplicate aborts the request like a conflict does.
+
+    Conflicts on an existing patient_id are handled per on_conflict:
+
+    - ``skip``: ``DO NOTHING``; the row is reported as ``skipped``
+    - ``update``: ``DO UPDATE`` with the new values; reported as ``updated``
+    - ``fail``: nothing is committed if any row conflicts; conflicting rows are
+      reported as ``conflict`` and the others as ``rolled_back``
+
+    Args:
+        db: Database session
+        patients: Patients to write, in request order
+        on_conflict: Conflict strategy (skip, update or fail)
+
+    Returns:
+        One BulkPatientResult per input row, in request order
+    """
+    insert = _dialect_insert(db)
+    is_postgresql = _dialect_name(db) == "postgresql"
+
+    first_index: dict[str, int] = {}
+    statuses: dict[int, tuple[str, int | None]] = {}
+    for index, patient_data in enumerate(patients):
+        if patient_data.patientID in first_index:
+            statuses[index] = ("duplicate", None)
+        else:
+            first_index[patient_data.patientID] = index
+
+    unique_ids = list(first_index)
+    change_xid = await batch_change_xid(db)
+    for start in range(0, len(unique_ids), BULK_CHUNK_SIZE):
+        chunk_ids = unique_ids[start : start + BULK_CHUNK_SIZE]
+        values = [
+            {**_patient_values(patients[first_index[pid]]), **change_xid} for pid in chunk_ids
+        ]
+        statement = insert(Patient).values(values)
+
+        if on_conflict == "update":
+            statement = on_conflict_update_patients(statement)
+            if is_postgresql:
+                # xmax is 0 only for tuples this statement inserted
+                inserted = literal_column("(xmax = 0)").label("inserted")
+            else:
+                existing = await db.execute(
+                    select(Patient.patient_id).where(Patient.patient_id.in_(chunk_ids))
+                )
+                existing_ids = set(existing.scalars().all())
+                inserted = None
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=[Patient.patient_id])
+            inserted = None
+
+        returning = [Patient.id, Patient.patient_id]
+        if inserted is not None:
+            returning.append(inserted)
+        result = await db.execute(statement.returning(*returning))
+
+        written = set()
+        for row in result.all():
+            written.add(row.patient_id)
+            if on_conflict != "update":
+                created = True
+            elif inserted is not None:
+                created = bool(row.inserted)
+            else:
+                created = row.patient_id not in existing_ids
+            statuses[first_index[row.patient_id]] = ("created" if created else "updated", row.id)
+        for pid in chunk_ids:
+            if pid not in written:
+                statuses[first_index[pid]] = (
+                    "conflict" if on_conflict == "fail" else "skipped", None
+                )
+
+    rejected = any(status in ("conflict", "duplicate") for status, _ in statuses.values())
+    if on_conflict == "fail" and rejected:
+        await db.rollback()
+        statuses = {
+            index: (status, None) if status in ("conflict", "duplicate") else ("rolled_back", None)
+            for index, (status, _) in statuses.items()
+        }
+    else:
+        events = [
+            _patient_event(status, pk, patients[index].patientID)
+            for index, (status, pk) in sorted(statuses.items())
+            if status in ("created", "updated")
+        ]
+        await _commit_with_events(db, events)
+        _invalidate_patient_caches(*unique_ids)
+
+    return [
+        BulkPatientResult(
+            index=index,
+            patientID=patient_data.patientID,
+            status=statuses[index][0],
+            id=statuses[index][1],
+        )
+        for index, patient_data in enumerate(patients)
+    ]
+
+
+# Rejects listed in an import summary; the rest are only counted
+MAX_REPORTED_REJECTS = 1000
+
+# Validated import rows kept in memory before the spool spills to a temp file
+IMPORT_SPOOL_BYTES = 16 << 20
+
+# Session-local staging table for import_patients (dropped at commit on PostgreSQL)
+_import_staging = Table(
+    "patient_import_staging",
+    MetaData(),
+    Column("record", Integer, nullable=False),
+    Column("patient_id", String(50), nullable=False),
+    Column("name", String(255), nullable=False),
+    Column("age", Integer, nullable=False),
+    Column("gender", String(20), nullable=False),
+    Column("medical_condition", String(255), nullable=False),
+    Column("last_visit", Date, nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+_IMPORT_COLUMNS = ["patient_id", "name", "age", "gender", "medical_condition", "last_visit"]
+
+
+def _spooled_import_rows(spool) -> Iterator[list[tuple]]:
+    """Read (record, *_IMPORT_COLUMNS) rows back from an import spool in batches."""
+    rows = []
+    for line in spool:
+        *values, last_visit = json.loads(line)
+        rows.append((*values, date.fromisoformat(last_visit)))
+        if len(rows) >= IMPORT_BATCH_ROWS:
+            yield rows
+            rows = []
+    if rows:
+        yield rows
+
+
+async def _stage_import_rows(db: AsyncSession, rows: list[tuple]) -> None:
+    """Append (record, *_IMPORT_COLUMNS) rows to the staging table: COPY on PostgreSQL."""
+    connection = await db.connection()
+    columns = ["record", *_IMPORT_COLUMNS]
+    if _dialect_name(db) != "postgresql":
+        await connection.execute(insert(_import_staging), [dict(zip(columns, row)) for row in rows])
+        return
+
+    # COPY goes through the driver connection, inside the session's transaction
+    raw = (await connection.get_raw_connection()).driver_connection
+    async with raw.cursor() as cursor:
+        copy_sql = f"COPY {_import_staging.name} ({', '.join(columns)}) FROM STDIN"
+        async with cursor.copy(copy_sql) as copy:
+            for row in rows:
+                await copy.write_row(row)
+
+
+async def import_patients(
+    db: AsyncSession,
+    batches: AsyncIterator[ImportBatch],
+    on_conflict: ImportConflictMode = "update",
+) -> dict:
+    """
+    Load a streamed upload through a staging table and one set-based merge.
+
+    The upload is parsed and validated into a temporary spool file first, so
+    a slow client never holds a database connection. The spooled rows are
+    then appended to a TEMPORARY staging table a batch at a time (with COPY
+    on PostgreSQL), so memory is bounded by one batch however large the
+    upload, and a single INSERT ... SELECT ... ON CONFLICT (patient_id)
+    merges them into patients. Later records repeating a
+    patientID are rejected; the first one wins. Everything commits once,
+    so a failed import leaves patients untouched.
+
+    On PostgreSQL subscribers of GET /patients/events get an event per
+    merged row from the notify triggers (one resync event when more than
+    MAX_EVENTS_PER_STATEMENT rows change); elsewhere they get one resync.
+
+    Args:
+        db: Database session
+        batches: Validated batches from patient_import.read_patient_batches
+        on_conflict: update (overwrite existing patients) or skip them
+
+    Returns:
+        Dictionary matching PatientImportResponse
+
+    Raises:
+        ValueError: If the upload cannot be parsed (nothing is written)
+    """
+    started = time.perf_counter()
+    received = rejected = 0
+    rejects = []
+    with tempfile.SpooledTemporaryFile(IMPORT_SPOOL_BYTES, mode="w+", encoding="utf-8") as spool:
+        # Read the whole upload before touching the database, so a slow client
+        # never holds a pooled connection or an open transaction
+        async for batch in batches:
+            received += len(batch.rows) + len(batch.rejects)
+            rejected += len(batch.rejects)
+            rejects.extend(batch.rejects[: MAX_REPORTED_REJECTS - len(rejects)])
+            spool.writelines(
+                json.dumps([number, *_patient_values(patient).values()], default=str) + "\n"
+                for number, patient in batch.rows
+            )
+        spool.seek(0)
+        try:
+            connection = await db.connection()
+            await connection.run_sync(
+                lambda sync_connection: _import_staging.drop(sync_connection, checkfirst=True)
+            )
+            await connection.run_sync(_import_staging.create)
+            for rows in _spooled_import_rows(spool):
+                await _stage_import_rows(db, rows)
+
+            staged = _import_staging.c
+            ranked = select(
+                staged,
+                func.row_number()
+                .over(partition_by=staged.patient_id, order_by=staged.record)
+                .label("rank"),
+            ).subquery("ranked")
+            first = ranked.c.rank == 1
+            counts = (
+                await db.execute(
+                    select(
+                        func.count().filter(first).label("unique"),
+                        func.count(Patient.id).filter(first).label("existing"),
+                        func.count().filter(ranked.c.rank > 1).label("duplicates"),
+                    ).select_from(
+                        ranked.outerjoin(Patient, Patient.patient_id == ranked.c.patient_id)
+                    )
+                )
+            ).one()
+            if counts.duplicates and len(rejects) < MAX_REPORTED_REJECTS:
+                duplicates = await db.execute(
+                    select(ranked.c.record, ranked.c.patient_id)
+                    .where(ranked.c.rank > 1)
+                    .order_by(ranked.c.record)
+                    .limit(MAX_REPORTED_REJECTS - len(rejects))
+                )
+                rejects.extend(
+                    PatientImportReject(
+                        row=row.record,
+                        patientID=row.patient_id,
+                        error="Duplicate patientID in upload (first occurrence imported)",
+                    )
+                    for row in duplicates
+                )
+                rejects.sort(key=lambda reject: reject.row)
+            rejected += counts.duplicates
+
+            statement = _dialect_insert(db)(Patient).from_select(
+                _IMPORT_COLUMNS, select(*(ranked.c[name] for name in _IMPORT_COLUMNS)).where(first)
+            )
+            if on_conflict == "update":
+                statement = on_conflict_update_patients(statement)
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=[Patient.patient_id])
+            await db.execute(statement)
+        except Exception:
+            await db.rollback()
+            raise
+
+    created = counts.unique - counts.existing
+    updated = counts.existing if on_conflict == "update" else 0
+    await _commit_with_events(db, [RESYNC_EVENT] if created or updated else [])
+    patient_detail_cache.clear()
+    patient_list_cache.clear()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "received": received,
+        "created": created,
+        "updated": updated,
+        "skipped": counts.existing - updated,
+        "rejected": rejected,
+        "rejects": rejects,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(received / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+# Columns overwritten by on_conflict_update_patients
+UPSERT_COLUMNS = ["name", "age", "gender", "medical_condition", "last_visit"]
+
+
+def on_conflict_update_patients(statement, skip_unchanged: bool = False):
+    """
+    Add ON CONFLICT (patient_id) DO UPDATE to a dialect INSERT into patients.
+
+    The existing row is overwritten with the new values, and updated_at,
+    version and change_xid are bumped (column onupdate defaults do not apply to ON CONFLICT
+    DO UPDATE); change_xid is the one the INSERT row carries, from its column
+    default or batch_change_xid. Shared by bulk writes, imports and the
+    migration scripts.
+
+    Args:
+        statement: postgresql.insert or sqlite.insert of Patient (or its table)
+        skip_unchanged: Leave rows whose values already match untouched, so
+            re-running a load keeps their updated_at and version; such rows
+            are then absent from RETURNING
+
+    Returns:
+        The statement with its conflict clause
+    """
+    excluded = statement.excluded
+    columns = Patient.__table__.c
+    return statement.on_conflict_do_update(
+        index_elements=[Patient.patient_id],
+        set_={
+            **{name: excluded[name] for name in UPSERT_COLUMNS},
+            "updated_at": func.now(),
+            "version": Patient.version + 1,
+            "change_xid": excluded.change_xid,
+        },
+        where=(
+            or_(*(columns[name] != excluded[name] for name in UPSERT_COLUMNS))
+            if skip_unchanged
+            else None
+        ),
+    )
+
+
+def _update_values(patient_data: PatientUpdate) -> dict:
+    """Convert the provided fields of a PatientUpdate to patients column values."""
+    fields = {
+        "patient_id": patient_data.patientID,
+        "name": patient_data.name,
+        "age": patient_data.age,
+        "gender": patient_data.gender,
+        "medical_condition": patient_data.medicalCondition,
+        "last_visit": patient_data.lastVisit,
+    }
+    return {column: value for column, value in fields.items() if value is not None}
+
+
+def _batch_groups(operations: list[PatientBatchOperation]) -> list[list[int]]:
+    """Split operation indexes into runs executable as one statement, keeping order."""
+    groups: list[list[int]] = []
+    for index, operation in enumerate(operations):
+        if (
+            groups
+            and operation.op in ("create", "delete")
+            and operations[groups[-1][0]].op == operation.op
+        ):
+            groups[-1].append(index)
+        else:
+            groups.append([index])
+    return groups
+
+
+async def _run_batch_group(
+    db: AsyncSession,
+    operations: list[PatientBatchOperation],
+    group: list[int],
+    events: list[dict],
+) -> dict[int, tuple[str, PatientResponse | None]]:
+    """
+    Execute one run of batch operations as a single statement.
+
+    A change event is appended to events for each operation that succeeds.
+
+    Raises:
+        IntegrityError: If an update renames a patient onto an existing patientID
+
+    Returns:
+        Mapping of operation index to (status, patient) for the run
+    """
+    outcomes: dict[int, tuple[str, PatientResponse | None]] = {}
+    first = operations[group[0]]
+    patient_columns = list(Patient.__table__.columns)
+
+    if first.op == "create":
+        values = [_patient_values(operations[i].data) for i in group]
+        statement = (
+            _dialect_insert(db)(Patient)
+            .values(values)
+            .on_conflict_do_nothing(index_elements=[Patient.patient_id])
+            .returning(*patient_columns)
+        )
+        created = {row.patient_id: row for row in (await db.execute(statement)).all()}
+        for i in group:
+            row = created.pop(operations[i].data.patientID, None)
+            outcomes[i] = ("ok", PatientResponse.from_orm(row)) if row else ("conflict", None)
+            if row:
+                events.append(_patient_event("created", row.id, row.patient_id))
+
+    elif first.op == "delete":
+        ids = [operations[i].patientID for i in group]
+        statement = (
+            delete(Patient)
+            .where(Patient.patient_id.in_(ids))
+            .returning(Patient.patient_id, Patient.id)
+        )
+        deleted = dict((await db.execute(statement)).all())
+        for i in group:
+            patient_id = operations[i].patientID
+            pk = deleted.pop(patient_id, None)
+            outcomes[i] = ("ok", None) if pk is not None else ("not_found", None)
+            if pk is not None:
+                events.append(_patient_event("deleted", pk, patient_id))
+
+    else:
+        values = _update_values(first.data)
+        if values:
+            statement = (
+                update(Patient)
+                .where(Patient.patient_id == first.patientID)
+                .values(**values)
+                .returning(*patient_columns)
+            )
+        else:
+            statement = select(*patient_columns).where(Patient.patient_id == first.patientID)
+        row = (await db.execute(statement)).one_or_none()
+        outcomes[group[0]] = ("ok", PatientResponse.from_orm(row)) if row else ("not_found", None)
+        if row and values:
+            events.append(_patient_event("updated", row.id, row.patient_id))
+
+    return outcomes
+
+
+async def run_patient_batch(
+    db: AsyncSession,
+    operations: list[PatientBatchOperation],
+    atomic: bool = True,
+) -> tuple[list[PatientBatchResult], bool]:
+    """
+    Execute an ordered list of creates, updates and deletes in one transaction.
+
+    Consecutive creates become one multi-row INSERT ... ON CONFLICT DO NOTHING
+    and consecutive deletes one DELETE ... WHERE patient_id IN (...); each
+    update is a single UPDATE ... RETURNING without a prior SELECT. Everything
+    is committed once at the end.
+
+    When atomic, the first operation that fails (not found or conflict) rolls
+    back the whole batch: earlier operations are reported as ``rolled_back``
+    and later ones as ``skipped``. Otherwise failing operations are reported
+    and the rest are committed; updates run inside a SAVEPOINT so a
+    constraint violation only undoes that update.
+
+    Args:
+        db: Database session
+        operations: Operations in the order they must be applied
+        atomic: All-or-nothing (True) or best-effort (False)
+
+    Returns:
+        Tuple of (one PatientBatchResult per operation, whether changes were committed)
+    """
+    outcomes: dict[int, tuple[str, PatientResponse | None]] = {}
+    events: list[dict] = []
+    failed = False
+    for group in _batch_groups(operations):
+        try:
+            if atomic or operations[group[0]].op != "update":
+                group_outcomes = await _run_batch_group(db, operations, group, events)
+            else:
+                async with db.begin_nested():
+                    group_outcomes = await _run_batch_group(db, operations, group, events)
+        except IntegrityError:
+            # Only updates can raise here (a rename onto an existing patientID);
+            # creates resolve patientID conflicts with ON CONFLICT DO NOTHING
+            group_outcomes = {group[0]: ("conflict", None)}
+        outcomes.update(group_outcomes)
+        if atomic and any(status != "ok" for status, _ in group_outcomes.values()):
+            failed = True
+            break
+
+    touched = set()
+    for i, operation in enumerate(operations):
+        touched.add(operation.data.patientID if operation.op == "create" else operation.patientID)
+        patient = outcomes.get(i, (None, None))[1]
+        if patient is not None:
+            touched.add(patient.patientID)
+
+    if failed:
+        await db.rollback()
+        outcomes = {
+            i: (
+                outcomes[i]
+                if i in outcomes and outcomes[i][0] != "ok"
+                else ("rolled_back" if i in outcomes else "skipped", None)
+            )
+            for i in range(len(operations))
+        }
+    else:
+        await _commit_with_events(db, events)
+        _invalidate_patient_caches(*touched)
+
+    results = [
+        PatientBatchResult(
+            index=i,
+            op=operation.op,
+            patientID=(
+                operation.data.patientID if operation.op == "create" else operation.patientID
+            ),
+            status=outcomes[i][0],
+            patient=outcomes[i][1],
+        )
+        for i, operation in enumerate(operations)
+    ]
+    return results, not failed
@@ -0,0 +1,120 @@
+"""In-process LRU + TTL cache for query results."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+# Returned by QueryCache.get when the key is absent or expired
+MISSING = object()
+
+
+class QueryCache:
+    """
+    Bounded LRU cache whose entries also expire after a fixed TTL.
+
+    The cache is per process: with several workers each keeps its own copy,
+    so the TTL bounds how long another worker's write can go unnoticed.
+    Operations never await, so they are safe to call from async code without
+    locking.
+
+    A reader that misses must await the database before it can set(), and a
+    write may commit and invalidate in the meantime. Every invalidation bumps
+    ``generation``; a reader records it at the miss and passes it to set(),
+    which drops the (possibly pre-write) value if the cache was invalidated
+    since.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Create an empty cache.
+
+        Args:
+            maxsize: Maximum number of entries (0 disables caching)
+            ttl: Seconds an entry stays valid after it is stored
+            clock: Monotonic time source (overridable in tests)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self.stale_sets = 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Look up a key, refreshing its LRU position on a hit.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or MISSING if absent or expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self._clock():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return MISSING
+
+    def set(self, key: Hashable, value: Any, generation: int | None = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key: Cache key
+            value: Value to cache (None is a valid value)
+            generation: ``generation`` read before the value was computed; if
+                the cache has been invalidated since, the value is not stored
+        """
+        if self.maxsize <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            self.stale_sets += 1
+            return
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single key if present."""
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Return counters for sizing the cache.
+
+        Returns:
+            Dictionary with size, maxsize, ttl, hits, misses, evictions and
+            stale_sets (results not stored because a write invalidated the
+            cache while they were being read)
+        """
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_sets": self.stale_sets,
+        }
@@ -0,0 +1,178 @@
+"""Benchmark patient substring search with and without trigram indexes.
+
+Seeds a session-local TEMP copy of the patients table (nothing is written to
+the real table), runs the query shape produced by ``search_patients`` for a
+few search terms, then adds the ``gin_trgm_ops`` indexes from revision 003
+and runs the same queries again. Prints the plan root and latency for each.
+
+Usage:
+    python scripts/benchmark_search.py [options]
+
+Options:
+    --rows N          Number of rows to seed (default: 1000000)
+    --iterations N    Timed runs per query (default: 20)
+    --url URL         PostgreSQL connection URL (default: DATABASE_URL)
+
+Examples:
+    # 1M-row comparison against the configured database
+    python scripts/benchmark_search.py
+
+    # Quick smoke run
+    python scripts/benchmark_search.py --rows 50000 --iterations 5
+"""
+
+import asyncio
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection
+
+from app.config import settings
+
+BENCH_TABLE = "patients_bench"
+
+# Same shape as search_patients: filter, window count, stable order, LIMIT page_size + 1
+SEARCH_QUERY = f"""
+    SELECT *, count(*) OVER () AS total
+    FROM {BENCH_TABLE}
+    WHERE patient_id ILIKE :pattern OR name ILIKE :pattern
+    ORDER BY patient_id, id
+    LIMIT 21
+"""
+
+SEARCH_TERMS = ["P0012345", "Walker 4242", "tson 99", "no-such-patient"]
+
+
+async def seed_bench_table(conn: AsyncConnection, rows: int) -> None:
+    """
+    Create and fill a TEMP copy of the patients table with synthetic rows.
+
+    Only the B-tree indexes from revision 001 are created, so callers can add
+    the indexes they want to measure on top.
+
+    Args:
+        conn: Open connection (TEMP tables live as long as the connection)
+        rows: Number of rows to generate
+    """
+    await conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+    await conn.execute(
+        text(
+            f"CREATE TEMP TABLE {BENCH_TABLE} "
+            "(LIKE patients INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    await conn.execute(
+        text(
+            f"""
+            INSERT INTO {BENCH_TABLE}
+                (id, patient_id, name, age, gender, medical_condition, last_visit)
+            SELECT
+                g,
+                'P' || lpad(g::text, 7, '0'),
+                (ARRAY['James', 'Mary', 'Robert', 'Linda', 'Michael', 'Susan',
+                       'David', 'Karen', 'Daniel', 'Nancy'])[1 + g % 10]
+                    || ' ' ||
+                (ARRAY['Smith', 'Johnson', 'Walker', 'Brown', 'Jones', 'Garcia',
+                       'Miller', 'Davis', 'Wilson', 'Thompson'])[1 + (g / 10) % 10]
+                    || ' ' || g,
+                1 + g % 95,
+                (ARRAY['Male', 'Female', 'Other'])[1 + g % 3],
+                (ARRAY['Hypertension', 'Type 2 Diabetes', 'Asthma', 'Arthritis',
+                       'Migraine', 'Obesity', 'COPD', 'Anxiety'])[1 + g % 8],
+                DATE '2020-01-01' + (g % 1800)
+            FROM generate_series(1, :rows) AS g
+            """
+        ),
+        {"rows": rows},
+    )
+    await conn.execute(text(f"CREATE UNIQUE INDEX ON {BENCH_TABLE} (patient_id)"))
+    await conn.execute(text(f"CREATE INDEX ON {BENCH_TABLE} (name)"))
+    await conn.execute(text(f"ANALYZE {BENCH_TABLE}"))
+
+
+async def time_query(
+    conn: AsyncConnection, sql: str, params: dict, iterations: int
+) -> tuple[str, float, float]:
+    """
+    Run a query repeatedly and report its plan root and latency.
+
+    Args:
+        conn: Open connection
+        sql: Query to run
+        params: Bind parameters
+        iterations: Number of timed runs (after one warm-up run)
+
+    Returns:
+        Tuple of (plan root line, median ms, p95 ms)
+    """
+    plan = await conn.execute(text(f"EXPLAIN {sql}"), params)
+    plan_lines = [row[0].strip() for row in plan]
+    scan = next(
+        (line for line in plan_lines if "Scan" in line), plan_lines[0]
+    ).split("  (")[0]
+
+    await conn.execute(text(sql), params)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = await conn.execute(text(sql), params)
+        result.all()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return scan, statistics.median(timings), p95
+
+
+async def run_searches(conn: AsyncConnection, label: str, iterations: int) -> None:
+    """Time SEARCH_QUERY for every term in SEARCH_TERMS and print a table."""
+    print(f"\n{label}")
+    print(f"{'term':<18} {'median ms':>10} {'p95 ms':>10}  plan")
+    for term in SEARCH_TERMS:
+        scan, median, p95 = await time_query(
+            conn, SEARCH_QUERY, {"pattern": f"%{term}%"}, iterations
+        )
+        print(f"{term:<18} {median:>10.2f} {p95:>10.2f}  {scan}")
+
+
+async def main() -> None:
+    """Seed the benchmark table and compare search latency before/after trigram indexes."""
+    parser = argparse.ArgumentParser(description="Benchmark trigram search indexes")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--url", default=settings.database_url)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    try:
+        async with engine.connect() as conn:
+            print(f"Seeding {args.rows:,} rows into TEMP table {BENCH_TABLE}...")
+            start = time.perf_counter()
+            await seed_bench_table(conn, args.rows)
+            print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+            await run_searches(conn, "B-tree indexes only (revision 001)", args.iterations)
+
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await conn.execute(
+                text(f"CREATE INDEX ON {BENCH_TABLE} USING gin (patient_id gin_trgm_ops)")
+            )
+            await conn.execute(
+                text(f"CREATE INDEX ON {BENCH_TABLE} USING gin (name gin_trgm_ops)")
+            )
+            await conn.execute(text(f"ANALYZE {BENCH_TABLE}"))
+
+            await run_searches(conn, "With pg_trgm GIN indexes (revision 003)", args.iterations)
+            await conn.rollback()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+"""Benchmark per-request CPU of the patient list read path.
+
+Compares the previous ORM read path against the plain-row path used by
+``GET /patients`` for several page sizes:
+
+- orm: ``select(Patient)`` into ORM instances, ``PatientResponse.from_orm``
+  per row, a ``PaginatedResponse`` that FastAPI validates again against the
+  response model and renders with the standard json module
+- rows: ``search_patients`` (plain column rows as camelCase dicts) rendered
+  by ``OrjsonResponse`` in one pass
+
+Both paths run against a seeded in-memory SQLite database with the result
+caches disabled, so the numbers isolate the CPU spent in this process per
+request (query compilation, row processing, validation, serialization)
+rather than network or database server time.
+
+Usage:
+    python scripts/benchmark_serialization.py [options]
+
+Options:
+    --rows N          Number of rows to seed (default: 5000)
+    --iterations N    Timed requests per path and page size (default: 200)
+    --page-sizes N..  Page sizes to measure (default: 20 100 1000)
+
+Examples:
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --iterations 50 --page-sizes 20 1000
+"""
+
+import asyncio
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date
+from math import ceil
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api.responses import OrjsonResponse
+from app.database import Base
+from app.models.patient import Patient
+from app.schemas.patient import PaginatedResponse, PatientResponse
+from app.services import patient_service
+
+GENDERS = ["Male", "Female", "Other"]
+CONDITIONS = ["Hypertension", "Type 2 Diabetes", "Asthma", "Arthritis", "Migraine"]
+
+response_adapter = TypeAdapter(PaginatedResponse)
+
+
+async def seed(session: AsyncSession, rows: int) -> None:
+    """Insert rows synthetic patients P0000001.. in one multi-row INSERT."""
+    await session.execute(
+        insert(Patient),
+        [
+            {
+                "patient_id": f"P{i:07d}",
+                "name": f"Patient {i}",
+                "age": 1 + i % 95,
+                "gender": GENDERS[i % 3],
+                "medical_condition": CONDITIONS[i % 5],
+                "last_visit": date(2024, 1, 1 + i % 28),
+            }
+            for i in range(1, rows + 1)
+        ],
+    )
+    await session.commit()
+
+
+async def orm_request(session: AsyncSession, page_size: int) -> bytes:
+    """Serve one list page the way GET /patients did before the plain-row path."""
+    query = (
+        select(Patient, func.count().over().label("total"))
+        .order_by(Patient.patient_id, Patient.id)
+        .limit(page_size + 1)
+    )
+    rows = (await session.execute(query)).all()
+    patients = [row[0] for row in rows[:page_size]]
+    total = rows[0].total
+    content = PaginatedResponse(
+        items=[PatientResponse.from_orm(p) for p in patients],
+        total=total,
+        page=1,
+        page_size=page_size,
+        total_pages=ceil(total / page_size),
+    )
+    # FastAPI re-validates the return value against response_model, then encodes it
+    validated = response_adapter.validate_python(content)
+    body = jsonable_encoder(response_adapter.dump_python(validated, mode="json"))
+    # Ending the request clears the session, as get_db does
+    session.expunge_all()
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def rows_request(session: AsyncSession, page_size: int) -> bytes:
+    """Serve one list page through search_patients and OrjsonResponse."""
+    result = await patient_service.search_patients(session, page_size=page_size)
+    content = {
+        "items": result.items,
+        "total": result.total,
+        "page": 1,
+        "page_size": page_size,
+        "total_pages": ceil(result.total / page_size),
+        "count_mode": result.count_mode,
+        "has_more": result.has_more,
+        "next_cursor": result.next_cursor,
+    }
+    return OrjsonResponse(content).body
+
+
+async def measure(request, session: AsyncSession, page_size: int, iterations: int) -> float:
+    """Return the median process CPU time in ms of one request (after a warm-up)."""
+    await request(session, page_size)
+    timings = []
+    for _ in range(iterations):
+        start = time.process_time()
+        await request(session, page_size)
+        timings.append((time.process_time() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    """Seed an in-memory database and compare CPU per request for each page size."""
+    parser = argparse.ArgumentParser(description="Benchmark list serialization CPU")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[20, 100, 1000])
+    args = parser.parse_args()
+
+    # Measure every request end to end, not cache hits
+    patient_service.patient_list_cache.maxsize = 0
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as session:
+            await seed(session, args.rows)
+
+            print(f"Median CPU ms per request ({args.rows:,} rows, {args.iterations} runs)")
+            print(f"{'page_size':>9} {'orm':>10} {'rows':>10} {'speedup':>8}")
+            for page_size in args.page_sizes:
+                orm = await measure(orm_request, session, page_size, args.iterations)
+                rows = await measure(rows_request, session, page_size, args.iterations)
+                print(f"{page_size:>9} {orm:>10.3f} {rows:>10.3f} {orm / rows:>7.1f}x")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
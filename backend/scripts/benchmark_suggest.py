@@ -0,0 +1,148 @@
+"""Benchmark typeahead latency: GET /patients/suggest vs. the full list query.
+
+Seeds the same session-local TEMP table as benchmark_search.py (nothing is
+written to the real table) and adds the revision 006/008 indexes. Then, for
+each typed prefix it times:
+
+- list: the search_patients shape the search form used to fire per
+  keystroke (ILIKE filter, window count, full rows, LIMIT page_size + 1)
+- suggest: the suggest_patients shape (two prefix scans over the
+  text_pattern_ops indexes, patientID and name only)
+
+Latencies are measured as round trips from the client, an upper bound on
+server time. The target for suggest is under 5 ms p99 at 1M rows.
+
+Usage:
+    python scripts/benchmark_suggest.py [options]
+
+Options:
+    --rows N          Number of rows to seed (default: 1000000)
+    --iterations N    Timed runs per query (default: 200)
+    --url URL         PostgreSQL connection URL (default: DATABASE_URL)
+
+Examples:
+    python scripts/benchmark_suggest.py
+    python scripts/benchmark_suggest.py --rows 100000 --iterations 50
+"""
+
+import asyncio
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.config import settings
+from scripts.benchmark_search import BENCH_TABLE, seed_bench_table
+
+SUGGEST_LIMIT = 10
+
+LIST_QUERY = f"""
+    SELECT *, count(*) OVER () AS total
+    FROM {BENCH_TABLE}
+    WHERE patient_id ILIKE :contains OR name ILIKE :contains
+    ORDER BY patient_id, id
+    LIMIT 21
+"""
+
+# Same shape as suggest_patients on PostgreSQL
+SUGGEST_QUERY = f"""
+    SELECT * FROM (
+        SELECT 0 AS source, lower(patient_id) AS sort_key, patient_id, name
+        FROM {BENCH_TABLE}
+        WHERE lower(patient_id) LIKE :prefix
+        ORDER BY lower(patient_id) USING ~<~
+        LIMIT {SUGGEST_LIMIT}
+    ) AS by_id
+    UNION ALL
+    SELECT * FROM (
+        SELECT 1 AS source, lower(name) AS sort_key, patient_id, name
+        FROM {BENCH_TABLE}
+        WHERE lower(name) LIKE :prefix
+        ORDER BY lower(name) USING ~<~
+        LIMIT {SUGGEST_LIMIT}
+    ) AS by_name
+"""
+
+# Successive keystrokes of an ID lookup and a name lookup (seeded names are "First Last N")
+PREFIXES = ["p", "p00", "p00123", "m", "ma", "mary", "mary walker", "no-such"]
+
+
+async def add_indexes(conn: AsyncConnection) -> None:
+    """Create the sort (006) and prefix (008) indexes on the benchmark table."""
+    await conn.execute(text(f"CREATE INDEX ON {BENCH_TABLE} (patient_id, id) INCLUDE (name)"))
+    for column in ("patient_id", "name"):
+        await conn.execute(
+            text(
+                f"CREATE INDEX ON {BENCH_TABLE} (lower({column}) text_pattern_ops) "
+                "INCLUDE (patient_id, name)"
+            )
+        )
+    await conn.execute(text(f"VACUUM ANALYZE {BENCH_TABLE}"))
+
+
+async def time_query(
+    conn: AsyncConnection, sql: str, params: dict, iterations: int
+) -> tuple[float, float]:
+    """
+    Run a query repeatedly after one warm-up run.
+
+    Returns:
+        Tuple of (median ms, p99 ms)
+    """
+    await conn.execute(text(sql), params)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        (await conn.execute(text(sql), params)).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return statistics.median(timings), p99
+
+
+async def main() -> None:
+    """Seed the benchmark table and compare typeahead latency per prefix."""
+    parser = argparse.ArgumentParser(description="Benchmark the typeahead endpoint query")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--url", default=settings.database_url)
+    args = parser.parse_args()
+
+    # VACUUM cannot run inside a transaction block
+    engine = create_async_engine(args.url, isolation_level="AUTOCOMMIT")
+    try:
+        async with engine.connect() as conn:
+            print(f"Seeding {args.rows:,} rows into TEMP table {BENCH_TABLE}...")
+            start = time.perf_counter()
+            await seed_bench_table(conn, args.rows)
+            await add_indexes(conn)
+            print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+            print(
+                f"\n{'prefix':<10} {'list p50':>9} {'list p99':>9} "
+                f"{'suggest p50':>12} {'suggest p99':>12}"
+            )
+            for prefix in PREFIXES:
+                list_p50, list_p99 = await time_query(
+                    conn, LIST_QUERY, {"contains": f"%{prefix}%"}, args.iterations
+                )
+                suggest_p50, suggest_p99 = await time_query(
+                    conn, SUGGEST_QUERY, {"prefix": f"{prefix}%"}, args.iterations
+                )
+                print(
+                    f"{prefix:<10} {list_p50:>9.2f} {list_p99:>9.2f} "
+                    f"{suggest_p50:>12.2f} {suggest_p99:>12.2f}"
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""Import patients from a CSV or NDJSON file of any size.
+
+Streams the file through the same parser, validation and COPY + merge path
+as POST /patients/import, so memory stays flat and a failed run writes
+nothing. Re-running on the same file is safe: existing patients are updated
+(or skipped with --on-conflict skip).
+
+Usage:
+    python scripts/import_patients.py FILE [options]
+
+Options:
+    --format {csv,ndjson}       File format (default: from the file extension)
+    --on-conflict {update,skip} What to do with existing patientIDs (default: update)
+    --batch-size N              Rows per COPY batch (default: 5000)
+    --url URL                   Database URL (default: DATABASE_URL)
+
+Examples:
+    python scripts/import_patients.py clinic.csv
+    python scripts/import_patients.py export.ndjson --on-conflict skip
+"""
+
+import asyncio
+import argparse
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.services.patient_import import IMPORT_BATCH_ROWS, read_patient_batches
+from app.services.patient_service import import_patients
+
+# Bytes read from the file at a time
+READ_CHUNK_SIZE = 1 << 20
+
+# Rejects printed; the full count is always shown
+PRINT_REJECTS = 20
+
+
+async def read_chunks(path: Path) -> AsyncIterator[bytes]:
+    """Yield the file in READ_CHUNK_SIZE byte chunks."""
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def main() -> None:
+    """Parse arguments, run the import and print its summary."""
+    parser = argparse.ArgumentParser(description="Import patients from CSV or NDJSON")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--on-conflict", choices=["update", "skip"], default="update")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_ROWS)
+    parser.add_argument("--url", default=settings.database_url)
+    args = parser.parse_args()
+
+    if not args.file.exists():
+        print(f"Error: {args.file} not found")
+        sys.exit(1)
+    fmt = args.format or ("csv" if args.file.suffix.lower() == ".csv" else "ndjson")
+
+    engine = create_async_engine(args.url, echo=False)
+    async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with async_session() as session:
+            print(f"Importing {args.file} ({fmt}, on conflict: {args.on_conflict})...")
+            batches = read_patient_batches(read_chunks(args.file), fmt, args.batch_size)
+            summary = await import_patients(session, batches, args.on_conflict)
+    except ValueError as e:
+        print(f"\n✗ Import failed, nothing was written: {e}")
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+
+    print("\n" + "=" * 50)
+    print("Import Summary")
+    print("=" * 50)
+    print(f"Records read: {summary['received']:,}")
+    print(f"Created: {summary['created']:,}")
+    print(f"Updated: {summary['updated']:,}")
+    print(f"Skipped: {summary['skipped']:,}")
+    print(f"Rejected: {summary['rejected']:,}")
+    print(
+        f"Elapsed: {summary['elapsed_seconds']:.2f}s "
+        f"({summary['rows_per_second']:,.0f} rows/s)"
+    )
+
+    if summary["rejects"]:
+        print("\nRejected records:")
+        for reject in summary["rejects"][:PRINT_REJECTS]:
+            print(f"  - row {reject.row} ({reject.patientID or 'unknown'}): {reject.error}")
+        if summary["rejected"] > PRINT_REJECTS:
+            print(f"  ... and {summary['rejected'] - PRINT_REJECTS:,} more")
+        sys.exit(1)
+    print("\n✓ Import completed successfully!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,130 +1,343 @@
-"""Script to migrate patient data from db.json to PostgreSQL."""
+"""Script to migrate patient data from db.json to PostgreSQL.
+
+The file is parsed incrementally (only the current batch of patients is
+held in memory), validated with PatientCreate and written with one
+multi-row INSERT ... ON CONFLICT (patient_id) DO UPDATE per batch, each
+committed on its own. Rows whose values already match are left untouched,
+so re-running on the same file is fast, changes nothing and reports no
+errors. A later record with the same patientID wins.
+
+Usage:
+    python scripts/migrate_db_json.py [options]
+
+Options:
+    --file PATH        db.json to read (default: ../db.json next to backend/)
+    --batch-size N     Patients per INSERT statement and commit (default: 1000)
+    --url URL          Database URL (default: DATABASE_URL)
+
+Examples:
+    python scripts/migrate_db_json.py
+    python scripts/migrate_db_json.py --file export/db.json --batch-size 5000
+"""
 
 import asyncio
+import argparse
 import json
 import sys
+import time
+from collections.abc import Iterator
 from pathlib import Path
-from datetime import date
+from typing import IO, Any
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from pydantic import ValidationError
+from sqlalchemy import literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 from app.config import settings
 from app.models.patient import Patient
 from app.schemas.patient import PatientCreate
+from app.services.patient_service import batch_change_xid, on_conflict_update_patients
 
+# Characters read from db.json at a time
+READ_CHUNK_SIZE = 1 << 16
 
-async def migrate_patients(db_path: Path, db_session: AsyncSession) -> dict:
+# Characters that may follow a complete JSON value
+_VALUE_DELIMITERS = frozenset(" \t\r\n,:]}")
+
+# 6 bind parameters per row plus the upsert's own; SQLAlchemy splits a
+# multi-row VALUES statement at 32700 parameters (insertmanyvalues_max_parameters),
+# so this keeps a batch in one statement
+MAX_BATCH_SIZE = 4000
+
+class JsonArrayStream:
     """
-    Migrate patients from db.json to PostgreSQL.
+    Incremental reader for one JSON array inside a large document.
+
+    Values are decoded one at a time with json.JSONDecoder.raw_decode over a
+    buffer refilled from the file, so memory holds a single element plus a
+    read chunk rather than the whole document.
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int = READ_CHUNK_SIZE):
+        """Wrap an open text file."""
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; False at end of file."""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        self._eof = not chunk
+        return bool(chunk)
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return self._buffer[self._pos : self._pos + 1]
+
+    def _expect(self, char: str) -> None:
+        """Consume char or raise ValueError."""
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in db.json, found {found!r}")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number is only complete once a delimiter follows it: "-6" or
+                # "-6." at the buffer end may continue as "-6.25e1" in the next chunk
+                if self._eof or self._buffer[end : end + 1] in _VALUE_DELIMITERS:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def seek_array(self, key: str) -> None:
+        """
+        Position the stream inside the array stored under a top-level key.
+
+        Other top-level values are decoded and discarded. A document that is
+        itself an array is read as is.
+
+        Raises:
+            ValueError: If the key is missing
+        """
+        if self._peek() == "[":
+            self._pos += 1
+            return
+        self._expect("{")
+        while self._peek() != "}":
+            name = self._value()
+            self._expect(":")
+            if name == key:
+                self._expect("[")
+                return
+            self._value()
+            if self._peek() == ",":
+                self._pos += 1
+        raise ValueError(f'No "{key}" array in db.json')
+
+    def items(self) -> Iterator[Any]:
+        """Yield the elements of the array entered by seek_array."""
+        if self._peek() == "]":
+            return
+        while True:
+            yield self._value()
+            if self._peek() == "]":
+                return
+            self._expect(",")
+
+
+def to_patient_create(record: Any) -> PatientCreate:
+    """
+    Validate one db.json record (camelCase or snake_case keys).
+
+    Raises:
+        ValidationError: If the record breaks the PatientCreate rules
+        ValueError: If the record is not an object
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Expected a JSON object")
+    return PatientCreate.model_validate(
+        {
+            "patientID": record.get("patientID") or record.get("patient_id"),
+            "name": record.get("name"),
+            "age": record.get("age"),
+            "gender": record.get("gender"),
+            "medicalCondition": record.get("medicalCondition") or record.get("medical_condition"),
+            "lastVisit": record.get("lastVisit") or record.get("last_visit"),
+        }
+    )
+
+
+def _error_message(error: Exception) -> str:
+    """Summarize a validation failure on one line."""
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    return str(error)
+
+
+async def upsert_batch(db_session: AsyncSession, patients: list[PatientCreate]) -> tuple[int, int]:
+    """
+    Write one batch with a single multi-row INSERT ... ON CONFLICT DO UPDATE and commit.
+
+    Existing rows are only rewritten when a value differs, so unchanged
+    patients keep their updated_at and version.
 
     Args:
-        db_path: Path to db.json file
         db_session: Database session
+        patients: Validated patients with unique patientIDs
 
     Returns:
-        Dictionary with migration statistics
+        Tuple of (rows inserted, rows updated); the rest were unchanged
     """
-    # Read db.json
-    with open(db_path, "r") as f:
-        data = json.load(f)
-
-    patients_data = data.get("patients", [])
-    total = len(patients_data)
-    successful = 0
-    failed = 0
-    skipped = 0
-    errors = []
+    is_postgresql = db_session.get_bind().dialect.name == "postgresql"
+    insert = postgresql.insert if is_postgresql else sqlite.insert
+    # One compiled statement for every batch: the rows go in as executemany
+    # parameters, which SQLAlchemy renders as multi-row VALUES. Its pages
+    # default to 1000 rows, so widen them to the whole batch.
+    statement = on_conflict_update_patients(
+        insert(Patient.__table__), skip_unchanged=True
+    ).execution_options(insertmanyvalues_page_size=len(patients))
+    change_xid = await batch_change_xid(db_session)
+    rows = [
+        {
+            **change_xid,
+            "patient_id": patient.patientID,
+            "name": patient.name,
+            "age": patient.age,
+            "gender": patient.gender,
+            "medical_condition": patient.medicalCondition,
+            "last_visit": patient.lastVisit,
+        }
+        for patient in patients
+    ]
 
-    print(f"Found {total} patients in db.json")
-    print("Starting migration...\n")
+    if is_postgresql:
+        # xmax is 0 only for tuples this statement inserted
+        result = await db_session.execute(statement.returning(literal_column("(xmax = 0)")), rows)
+        flags = result.scalars().all()
+        inserted = sum(1 for flag in flags if flag)
+        written = len(flags)
+    else:
+        existing = await db_session.execute(
+            select(Patient.patient_id).where(
+                Patient.patient_id.in_([patient.patientID for patient in patients])
+            )
+        )
+        inserted = len(patients) - len(existing.all())
+        result = await db_session.execute(statement.returning(Patient.__table__.c.id), rows)
+        written = len(result.all())
+    await db_session.commit()
+    return inserted, written - inserted
 
-    for idx, patient_data in enumerate(patients_data, 1):
-        try:
-            # Convert db.json format to PatientCreate schema
-            # Handle id field (may be string in db.json, but we'll use patientID)
-            patient_id = patient_data.get("patientID") or patient_data.get("patient_id")
-            if not patient_id:
-                errors.append(f"Patient {idx}: Missing patientID")
-                skipped += 1
-                continue
 
-            # Create PatientCreate schema
-            patient_create = PatientCreate(
-                patientID=patient_id,
-                name=patient_data.get("name", ""),
-                age=patient_data.get("age", 0),
-                gender=patient_data.get("gender", ""),
-                medicalCondition=patient_data.get("medicalCondition") or patient_data.get("medical_condition", ""),
-                lastVisit=patient_data.get("lastVisit") or patient_data.get("last_visit", ""),
-            )
+async def migrate_patients(db_path: Path, db_session: AsyncSession, batch_size: int) -> dict:
+    """
+    Migrate patients from db.json to PostgreSQL.
 
-            # Create Patient model
-            patient = Patient(
-                patient_id=patient_create.patientID,
-                name=patient_create.name,
-                age=patient_create.age,
-                gender=patient_create.gender,
-                medical_condition=patient_create.medicalCondition,
-                last_visit=patient_create.lastVisit,
-            )
+    Args:
+        db_path: Path to db.json file
+        db_session: Database session
+        batch_size: Patients per INSERT statement and commit
 
-            db_session.add(patient)
-            await db_session.commit()
-            await db_session.refresh(patient)
+    Returns:
+        Dictionary with migration statistics
+    """
+    total = inserted = updated = failed = 0
+    errors = []
+    started = time.perf_counter()
 
-            successful += 1
-            print(f"✓ Migrated patient {idx}/{total}: {patient_id} - {patient.name}")
+    def report_progress() -> None:
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        print(f"  {total:,} records read, {inserted + updated:,} written ({rate:,.0f} records/s)")
 
-        except Exception as e:
-            await db_session.rollback()
-            failed += 1
-            error_msg = f"Patient {idx} ({patient_id if 'patient_id' in locals() else 'unknown'}): {str(e)}"
-            errors.append(error_msg)
-            print(f"✗ Failed to migrate patient {idx}: {error_msg}")
+    print(f"Reading {db_path} in batches of {batch_size:,}...\n")
+    with open(db_path, "r", encoding="utf-8") as f:
+        stream = JsonArrayStream(f)
+        stream.seek_array("patients")
+        # Keyed by patientID: a later record in the same batch replaces an earlier one
+        batch: dict[str, PatientCreate] = {}
+        for record in stream.items():
+            total += 1
+            try:
+                patient = to_patient_create(record)
+            except (ValidationError, ValueError) as e:
+                failed += 1
+                patient_id = record.get("patientID") if isinstance(record, dict) else None
+                errors.append(f"Patient {total} ({patient_id or 'unknown'}): {_error_message(e)}")
+                continue
+            batch.pop(patient.patientID, None)
+            batch[patient.patientID] = patient
+            if len(batch) >= batch_size:
+                batch_inserted, batch_updated = await upsert_batch(db_session, list(batch.values()))
+                inserted, updated = inserted + batch_inserted, updated + batch_updated
+                batch = {}
+                report_progress()
+        if batch:
+            batch_inserted, batch_updated = await upsert_batch(db_session, list(batch.values()))
+            inserted, updated = inserted + batch_inserted, updated + batch_updated
+            report_progress()
 
+    elapsed = time.perf_counter() - started
     return {
         "total": total,
-        "successful": successful,
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": total - failed - inserted - updated,
         "failed": failed,
-        "skipped": skipped,
         "errors": errors,
+        "elapsed": elapsed,
+        "rate": total / elapsed if elapsed else 0.0,
     }
 
 
 async def main():
     """Main migration function."""
-    # Get db.json path (parent directory from backend/)
-    db_json_path = Path(__file__).parent.parent.parent / "db.json"
+    parser = argparse.ArgumentParser(description="Migrate db.json patients into the database")
+    # Default: db.json in the parent directory of backend/
+    parser.add_argument(
+        "--file", type=Path, default=Path(__file__).parent.parent.parent / "db.json"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--url", default=settings.database_url)
+    args = parser.parse_args()
 
-    if not db_json_path.exists():
-        print(f"Error: db.json not found at {db_json_path}")
+    if not args.file.exists():
+        print(f"Error: db.json not found at {args.file}")
+        sys.exit(1)
+    if not 1 <= args.batch_size <= MAX_BATCH_SIZE:
+        print(f"Error: --batch-size must be between 1 and {MAX_BATCH_SIZE}")
         sys.exit(1)
 
     # Create database engine and session
-    engine = create_async_engine(settings.database_url, echo=False)
+    engine = create_async_engine(args.url, echo=False)
     async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
     async with async_session() as session:
         try:
-            stats = await migrate_patients(db_json_path, session)
+            stats = await migrate_patients(args.file, session, args.batch_size)
 
             print("\n" + "=" * 50)
             print("Migration Summary")
             print("=" * 50)
-            print(f"Total patients: {stats['total']}")
-            print(f"Successful: {stats['successful']}")
-            print(f"Failed: {stats['failed']}")
-            print(f"Skipped: {stats['skipped']}")
+            print(f"Total patients: {stats['total']:,}")
+            print(f"Inserted: {stats['inserted']:,}")
+            print(f"Updated: {stats['updated']:,}")
+            print(f"Unchanged: {stats['unchanged']:,}")
+            print(f"Failed: {stats['failed']:,}")
+            print(f"Elapsed: {stats['elapsed']:.2f}s ({stats['rate']:,.0f} records/s)")
 
             if stats["errors"]:
                 print("\nErrors:")
                 for error in stats["errors"]:
                     print(f"  - {error}")
 
-            if stats["failed"] > 0 or stats["skipped"] > 0:
+            if stats["failed"] > 0:
                 sys.exit(1)
             else:
                 print("\n✓ Migration completed successfully!")
@@ -138,4 +351,3 @@ async def main():
 
 if __name__ == "__main__":
     asyncio.run(main())
-
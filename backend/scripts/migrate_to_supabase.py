@@ -36,6 +36,7 @@ import argparse
 import logging
 import os
 import sys
+from collections.abc import Sequence
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -43,13 +44,16 @@ from typing import Optional
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy import text, select
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
 
 from app.config import settings
 from app.models.patient import Patient
 from app.models.migration_checkpoint import MigrationCheckpoint
+from app.services.patient_service import batch_change_xid, on_conflict_update_patients
 
 # Configure logging
 logging.basicConfig(
@@ -66,6 +70,17 @@ logger = logging.getLogger(__name__)
 BATCH_SIZE = 500  # Records per batch
 CHECKPOINT_INTERVAL = 1  # Update checkpoint after each batch
 
+# Columns read from the local table; plain rows rather than ORM objects
+SOURCE_COLUMNS = (
+    Patient.id,
+    Patient.patient_id,
+    Patient.name,
+    Patient.age,
+    Patient.gender,
+    Patient.medical_condition,
+    Patient.last_visit,
+)
+
 
 async def run_alembic_migrations(supabase_url: str) -> bool:
     """
@@ -252,6 +267,9 @@ async def migrate_patients_data(
             "status": "already_completed",
         }
 
+    last_id = start_id
+    successful = records_migrated
+
     # Update checkpoint status to in_progress
     await save_checkpoint(
         supabase_session,
@@ -263,66 +281,56 @@ async def migrate_patients_data(
     )
 
     try:
-        # Get total count
-        total_result = await local_session.execute(
-            select(Patient).order_by(Patient.id)
-        )
-        all_patients = total_result.scalars().all()
-        total = len(all_patients)
+        total = await local_session.scalar(select(func.count()).select_from(Patient))
 
         logger.info(f"Total records to migrate: {total}")
         if start_id:
             logger.info(f"Resuming from record ID: {start_id}")
 
-        successful = records_migrated
         failed = 0
         errors = []
 
-        # Process in batches
-        current_batch = []
-        for patient in all_patients:
-            # Skip if already migrated
-            if start_id and patient.id <= start_id:
-                continue
-
-            current_batch.append(patient)
-
-            if len(current_batch) >= BATCH_SIZE:
-                batch_success, batch_failed, batch_errors = await migrate_batch(
-                    current_batch, supabase_session, batch_number
-                )
-                successful += batch_success
-                failed += batch_failed
-                errors.extend(batch_errors)
-
-                # Update checkpoint
-                last_id = current_batch[-1].id
-                batch_number += 1
-                await save_checkpoint(
-                    supabase_session,
-                    table_name,
-                    last_id,
-                    batch_number,
-                    successful,
-                    "in_progress",
-                )
-
-                logger.info(
-                    f"Batch {batch_number}: {batch_success} migrated, "
-                    f"{batch_failed} failed. Total: {successful}/{total}"
-                )
-
-                current_batch = []
+        # Keyset pagination: each batch starts after the last migrated id, so
+        # only one batch is held in memory and a resumed run never reads the
+        # rows that were already copied
+        last_id = start_id or 0
+        while True:
+            result = await local_session.execute(
+                select(*SOURCE_COLUMNS)
+                .where(Patient.id > last_id)
+                .order_by(Patient.id)
+                .limit(BATCH_SIZE)
+            )
+            current_batch = result.all()
+            if not current_batch:
+                break
 
-        # Process remaining records
-        if current_batch:
             batch_success, batch_failed, batch_errors = await migrate_batch(
                 current_batch, supabase_session, batch_number
             )
             successful += batch_success
             failed += batch_failed
             errors.extend(batch_errors)
+
+            # Update checkpoint
+            last_id = current_batch[-1].id
             batch_number += 1
+            await save_checkpoint(
+                supabase_session,
+                table_name,
+                last_id,
+                batch_number,
+                successful,
+                "in_progress",
+            )
+
+            logger.info(
+                f"Batch {batch_number}: {batch_success} migrated, "
+                f"{batch_failed} failed. Total: {successful}/{total}"
+            )
+
+            if len(current_batch) < BATCH_SIZE:
+                break
 
         # Mark as completed
         await save_checkpoint(
@@ -348,10 +356,12 @@ async def migrate_patients_data(
 
     except Exception as e:
         logger.error(f"Migration failed: {e}", exc_info=True)
+        # Keep the progress of the batches that did commit
+        records_migrated = successful
         await save_checkpoint(
             supabase_session,
             table_name,
-            start_id,
+            last_id or None,
             batch_number,
             records_migrated,
             "failed",
@@ -366,69 +376,74 @@ async def migrate_patients_data(
         }
 
 
+async def upsert_patients(supabase_session: AsyncSession, patients: Sequence[Row]) -> None:
+    """
+    Write patients with one INSERT ... ON CONFLICT (patient_id) DO UPDATE.
+
+    Rows whose values already match are left untouched, so re-running a
+    batch keeps their updated_at and version.
+
+    Args:
+        supabase_session: Supabase database session
+        patients: Source rows (SOURCE_COLUMNS) with unique patient_ids
+    """
+    is_postgresql = supabase_session.get_bind().dialect.name == "postgresql"
+    insert = postgresql.insert if is_postgresql else sqlite.insert
+    statement = on_conflict_update_patients(insert(Patient.__table__), skip_unchanged=True)
+    change_xid = await batch_change_xid(supabase_session)
+    await supabase_session.execute(
+        statement,
+        [
+            {
+                **change_xid,
+                "patient_id": patient.patient_id,
+                "name": patient.name,
+                "age": patient.age,
+                "gender": patient.gender,
+                "medical_condition": patient.medical_condition,
+                "last_visit": patient.last_visit,
+            }
+            for patient in patients
+        ],
+    )
+
+
 async def migrate_batch(
-    patients: list[Patient], supabase_session: AsyncSession, batch_number: int
+    patients: Sequence[Row], supabase_session: AsyncSession, batch_number: int
 ) -> tuple[int, int, list[str]]:
     """
     Migrate a batch of patients using idempotent UPSERT.
 
+    The batch is written with a single statement and commit. If a row
+    breaks a constraint the batch is rolled back and split in half, and
+    each half is retried the same way, so the bad rows are reported one by
+    one while the rest are still migrated in a few round trips. Connection
+    and other errors are raised to the caller.
+
     Args:
-        patients: List of Patient objects to migrate
+        patients: Source rows (SOURCE_COLUMNS) to migrate
         supabase_session: Supabase database session
         batch_number: Current batch number
 
     Returns:
         Tuple of (successful_count, failed_count, errors_list)
     """
-    successful = 0
-    failed = 0
-    errors = []
-
-    for patient in patients:
-        try:
-            # Use UPSERT (INSERT ... ON CONFLICT DO UPDATE) for idempotency
-            # Check if patient already exists by patient_id
-            result = await supabase_session.execute(
-                select(Patient).where(Patient.patient_id == patient.patient_id)
-            )
-            existing = result.scalar_one_or_none()
-
-            if existing:
-                # Update existing record (idempotent - safe to re-run)
-                existing.name = patient.name
-                existing.age = patient.age
-                existing.gender = patient.gender
-                existing.medical_condition = patient.medical_condition
-                existing.last_visit = patient.last_visit
-            else:
-                # Insert new record
-                new_patient = Patient(
-                    patient_id=patient.patient_id,
-                    name=patient.name,
-                    age=patient.age,
-                    gender=patient.gender,
-                    medical_condition=patient.medical_condition,
-                    last_visit=patient.last_visit,
-                )
-                supabase_session.add(new_patient)
-
-            successful += 1
-        except Exception as e:
-            failed += 1
-            error_msg = f"Patient {patient.patient_id}: {str(e)}"
-            errors.append(error_msg)
-            logger.warning(error_msg)
-
     try:
+        await upsert_patients(supabase_session, patients)
         await supabase_session.commit()
-    except Exception as e:
+        return len(patients), 0, []
+    except (IntegrityError, DataError) as e:
         await supabase_session.rollback()
-        logger.error(f"Batch commit failed: {e}", exc_info=True)
-        # Mark all records in this batch as failed
-        failed += len(patients) - successful
-        successful = 0
+        if len(patients) == 1:
+            error_msg = f"Patient {patients[0].patient_id}: {e.orig}"
+            logger.warning(error_msg)
+            return 0, 1, [error_msg]
 
-    return successful, failed, errors
+    middle = len(patients) // 2
+    logger.info(f"Batch {batch_number}: retrying {len(patients)} records in two halves")
+    first = await migrate_batch(patients[:middle], supabase_session, batch_number)
+    second = await migrate_batch(patients[middle:], supabase_session, batch_number)
+    return first[0] + second[0], first[1] + second[1], first[2] + second[2]
 
 
 async def main():
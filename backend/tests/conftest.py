@@ -7,6 +7,7 @@ from sqlalchemy.pool import StaticPool
 
 from app.database import Base, get_db
 from app.main import app
+from app.services.patient_service import patient_detail_cache, patient_list_cache
 
 
 # Test database URL (SQLite in-memory for unit tests)
@@ -46,6 +47,9 @@ async def test_client(test_session: AsyncSession):
         yield test_session
 
     app.dependency_overrides[get_db] = override_get_db
+    # Cached reads must not leak between tests that reuse patient IDs
+    patient_list_cache.clear()
+    patient_detail_cache.clear()
 
     async with AsyncClient(app=app, base_url="http://test") as client:
         yield client
@@ -1,9 +1,23 @@
 """Integration tests for patient API endpoints."""
 
+import base64
+import csv
+import io
+import json
+
 import pytest
 from datetime import date
 
+from sqlalchemy import event, update
+
 from app.models.patient import Patient
+from app.schemas.patient import PaginatedResponse, PatientCreate, PatientResponse
+from app.services.patient_import import ImportBatch
+from app.services.patient_service import (
+    encode_cursor,
+    import_patients,
+    patient_event_broker,
+)
 
 
 @pytest.mark.asyncio
@@ -79,3 +93,978 @@ async def test_post_patients_create(test_client, test_session):
     saved_patient = result.scalar_one()
     assert saved_patient.name == "Jane Smith"
 
+
+
+async def _seed_patients(test_session, count: int) -> None:
+    """Insert patients P001..P{count} with repeating ages to exercise tie-breaks."""
+    for i in range(1, count + 1):
+        test_session.add(
+            Patient(
+                patient_id=f"P{i:03d}",
+                name=f"Patient {i:03d}",
+                age=30 + (i % 3),
+                gender="Other",
+                medical_condition="Checkup",
+                last_visit=date(2024, 1, 1),
+            )
+        )
+    await test_session.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_by", ["patientID", "name", "age"])
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+async def test_get_patients_cursor_pagination_matches_offset(
+    test_client, test_session, sort_by, sort_order
+):
+    """Test following next_cursor walks the same rows as offset pagination."""
+    await _seed_patients(test_session, 7)
+    params = {"page_size": 3, "sort_by": sort_by, "sort_order": sort_order}
+
+    offset_ids = []
+    for page in (1, 2, 3):
+        response = await test_client.get("/patients", params={**params, "page": page})
+        offset_ids += [p["id"] for p in response.json()["items"]]
+
+    cursor_ids = []
+    response = await test_client.get("/patients", params=params)
+    while True:
+        data = response.json()
+        cursor_ids += [p["id"] for p in data["items"]]
+        if data["next_cursor"] is None:
+            break
+        response = await test_client.get(
+            "/patients", params={**params, "cursor": data["next_cursor"]}
+        )
+
+    assert len(cursor_ids) == 7
+    assert cursor_ids == offset_ids
+
+
+@pytest.mark.asyncio
+async def test_get_patients_cursor_rejects_mismatched_sort(test_client, test_session):
+    """Test a cursor issued for one sort order is rejected for another."""
+    await _seed_patients(test_session, 3)
+    response = await test_client.get("/patients", params={"page_size": 1, "sort_by": "name"})
+    cursor = response.json()["next_cursor"]
+
+    response = await test_client.get("/patients", params={"sort_by": "age", "cursor": cursor})
+    assert response.status_code == 400
+
+    response = await test_client.get("/patients", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+    # Well-formed JSON with values of the wrong type is rejected, not a 500
+    for sort_by, value, last_id in [
+        ("age", "40", 1),
+        ("age", True, 1),
+        ("name", ["a"], 1),
+        ("name", {"a": 1}, 1),
+        ("name", "Patient", "1"),
+        ("name", "Patient", 1.5),
+    ]:
+        cursor = encode_cursor(sort_by, "asc", value, last_id)
+        response = await test_client.get(
+            "/patients", params={"sort_by": sort_by, "cursor": cursor}
+        )
+        assert response.status_code == 400, (sort_by, value, last_id)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", ["exact", "none"])
+async def test_get_patients_single_statement_per_page(
+    test_client, test_session, test_engine, count
+):
+    """Test list requests fetch the page and its total in one statement."""
+    await _seed_patients(test_session, 5)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await test_client.get(
+            "/patients", params={"page_size": 2, "count": count}
+        )
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_patients_count_modes(test_client, test_session):
+    """Test each count mode reports its total, count_mode and has_more."""
+    await _seed_patients(test_session, 5)
+
+    data = (await test_client.get("/patients", params={"page_size": 2})).json()
+    assert data["count_mode"] == "exact"
+    assert (data["total"], data["total_pages"], data["has_more"]) == (5, 3, True)
+
+    data = (
+        await test_client.get("/patients", params={"page_size": 2, "page": 3, "count": "none"})
+    ).json()
+    assert data["count_mode"] == "none"
+    assert data["total"] is None and data["total_pages"] is None
+    assert data["has_more"] is False
+    assert len(data["items"]) == 1
+
+    # Planner estimates are PostgreSQL-only; other engines fall back to exact
+    data = (await test_client.get("/patients", params={"count": "estimated"})).json()
+    assert data["count_mode"] == "exact"
+    assert data["total"] == 5
+
+    # A page past the end still reports the exact total
+    data = (await test_client.get("/patients", params={"page_size": 2, "page": 9})).json()
+    assert data["items"] == []
+    assert data["total"] == 5
+
+    # Cursor pages skip the count; the first page already reported it
+    first = (await test_client.get("/patients", params={"page_size": 2})).json()
+    data = (
+        await test_client.get(
+            "/patients", params={"page_size": 2, "cursor": first["next_cursor"]}
+        )
+    ).json()
+    assert data["count_mode"] == "none"
+    assert data["total"] is None and data["has_more"] is True
+
+
+@pytest.mark.asyncio
+async def test_get_patients_search_substring_and_wildcards(test_client, test_session):
+    """Test search matches substrings case-insensitively and treats % and _ literally."""
+    await _seed_patients(test_session, 12)
+
+    data = (await test_client.get("/patients", params={"search": "atient 01"})).json()
+    assert [p["patientID"] for p in data["items"]] == ["P010", "P011", "P012"]
+
+    data = (await test_client.get("/patients", params={"search": "p00"})).json()
+    assert data["total"] == 9
+
+    for term in ("%", "_"):
+        data = (await test_client.get("/patients", params={"search": term})).json()
+        assert data["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_patients_fulltext_search_mode(test_client, test_session):
+    """Test fulltext mode matches words in name and medical condition."""
+    conditions = ["Type 2 Diabetes", "Hypertension", "Diabetes and Hypertension"]
+    for i, condition in enumerate(conditions, start=1):
+        test_session.add(
+            Patient(
+                patient_id=f"F{i:03d}",
+                name=f"Fulltext {i}",
+                age=50,
+                gender="Female",
+                medical_condition=condition,
+                last_visit=date(2024, 3, 1),
+            )
+        )
+    await test_session.commit()
+
+    params = {"search": "diabetes", "search_mode": "fulltext"}
+    data = (await test_client.get("/patients", params=params)).json()
+    assert sorted(p["patientID"] for p in data["items"]) == ["F001", "F003"]
+    assert data["total"] == 2
+
+    params = {"search": "hypertension diabetes", "search_mode": "fulltext"}
+    data = (await test_client.get("/patients", params=params)).json()
+    assert [p["patientID"] for p in data["items"]] == ["F003"]
+
+    # Substring mode does not look at medical conditions
+    data = (await test_client.get("/patients", params={"search": "diabetes"})).json()
+    assert data["total"] == 0
+
+    params = {"search": "diabetes", "search_mode": "fulltext", "page_size": 1}
+    data = (await test_client.get("/patients", params=params)).json()
+    assert data["has_more"] is True and data["next_cursor"] is None
+    response = await test_client.get("/patients", params={**params, "cursor": "abc"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_patient_reads_are_cached_and_invalidated_by_writes(
+    test_client, test_session, test_engine
+):
+    """Test repeated reads skip the database and writes invalidate them."""
+    await _seed_patients(test_session, 3)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        first = (await test_client.get("/patients", params={"page_size": 2})).json()
+        await test_client.get("/patients/P001")
+        await test_client.get("/patients/P404")
+        executed = len(statements)
+
+        assert (await test_client.get("/patients", params={"page_size": 2})).json() == first
+        assert (await test_client.get("/patients/P001")).json()["name"] == "Patient 001"
+        assert (await test_client.get("/patients/P404")).status_code == 404
+        assert len(statements) == executed
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+    await test_client.put("/patients/P001", json={"name": "Renamed"})
+    assert (await test_client.get("/patients/P001")).json()["name"] == "Renamed"
+
+    await test_client.post(
+        "/patients",
+        json={
+            "patientID": "P404",
+            "name": "Late Arrival",
+            "age": 40,
+            "gender": "Male",
+            "medicalCondition": "Flu",
+            "lastVisit": "2024-05-01",
+        },
+    )
+    assert (await test_client.get("/patients/P404")).status_code == 200
+    data = (await test_client.get("/patients", params={"page_size": 2})).json()
+    assert data["total"] == 4
+
+    await test_client.delete("/patients/P002")
+    assert (await test_client.get("/patients/P002")).status_code == 404
+
+    stats = (await test_client.get("/health/cache")).json()
+    assert stats["patient_detail"]["hits"] >= 2
+    assert stats["patient_list"]["misses"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_patient_read_racing_a_write_is_not_cached(
+    test_client, test_session, monkeypatch
+):
+    """Test a read whose query ran before a write commits does not cache its result."""
+    await _seed_patients(test_session, 2)
+    execute = test_session.execute
+    pending_writes = []
+
+    async def execute_then_write(*args, **kwargs):
+        # The read has its (pre-write) rows; a write commits before it caches them
+        result = await execute(*args, **kwargs)
+        if pending_writes:
+            await pending_writes.pop()()
+        return result
+
+    monkeypatch.setattr(test_session, "execute", execute_then_write)
+
+    pending_writes.append(lambda: test_client.put("/patients/P001", json={"name": "Renamed"}))
+    assert (await test_client.get("/patients/P001")).json()["name"] == "Patient 001"
+    assert (await test_client.get("/patients/P001")).json()["name"] == "Renamed"
+
+    pending_writes.append(lambda: test_client.delete("/patients/P002"))
+    assert (await test_client.get("/patients")).json()["total"] == 2
+    assert (await test_client.get("/patients")).json()["total"] == 1
+
+    stats = (await test_client.get("/health/cache")).json()
+    assert stats["patient_detail"]["stale_sets"] == 1
+    assert stats["patient_list"]["stale_sets"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_patient_conditional_get(test_client, test_session):
+    """Test single-patient ETags honor If-None-Match and change with the row version."""
+    await _seed_patients(test_session, 1)
+
+    response = await test_client.get("/patients/P001")
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    response = await test_client.get("/patients/P001", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    response = await test_client.get("/patients/P001", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+
+    # Any UPDATE bumps version, which the ETag is built from
+    await test_session.execute(
+        update(Patient).where(Patient.patient_id == "P001").values(name="Renamed")
+    )
+    await test_session.commit()
+    response = await test_client.get("/patients/P001", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_get_patients_conditional_get(test_client, test_session):
+    """Test list ETags depend on query parameters and the collection version."""
+    await _seed_patients(test_session, 3)
+
+    response = await test_client.get("/patients", params={"page_size": 2})
+    etag = response.headers["ETag"]
+    other = await test_client.get("/patients", params={"page_size": 1})
+    assert other.headers["ETag"] != etag
+
+    response = await test_client.get(
+        "/patients", params={"page_size": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    await test_client.delete("/patients/P003")
+    response = await test_client.get(
+        "/patients", params={"page_size": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_read_endpoints_skip_orm(test_client, test_session):
+    """Test list/detail reads return schema-shaped JSON without loading ORM instances."""
+    await _seed_patients(test_session, 3)
+    test_session.expunge_all()
+
+    response = await test_client.get("/patients", params={"page_size": 2})
+    assert response.status_code == 200
+    page = PaginatedResponse.model_validate(response.json())
+    assert [p.patientID for p in page.items] == ["P001", "P002"]
+    assert response.json()["items"][0]["lastVisit"] == "2024-01-01"
+
+    response = await test_client.get("/patients/P003")
+    assert response.status_code == 200
+    assert PatientResponse.model_validate(response.json()).name == "Patient 003"
+
+    assert len(test_session.identity_map) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_patients_structured_filters(test_client, test_session):
+    """Test age/gender/condition/last-visit filters narrow pages, totals and exports."""
+    conditions = ["Asthma", "Diabetes"]
+    genders = ["Male", "Female", "Other"]
+    for i in range(1, 13):
+        test_session.add(
+            Patient(
+                patient_id=f"P{i:03d}",
+                name=f"Patient {i:03d}",
+                age=20 + i * 5,
+                gender=genders[i % 3],
+                medical_condition=conditions[i % 2],
+                last_visit=date(2024, i, 1),
+            )
+        )
+    await test_session.commit()
+
+    async def patient_ids(**params):
+        response = await test_client.get("/patients", params={"page_size": 50, **params})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == len(data["items"])
+        return [p["patientID"] for p in data["items"]]
+
+    assert await patient_ids(age_min=40, age_max=50) == ["P004", "P005", "P006"]
+    assert await patient_ids(gender="Male") == ["P003", "P006", "P009", "P012"]
+    assert await patient_ids(medical_condition="Asthma", gender="Male") == ["P006", "P012"]
+    assert await patient_ids(
+        last_visit_from="2024-03-01", last_visit_to="2024-04-30"
+    ) == ["P003", "P004"]
+    assert await patient_ids(search="Patient 01", age_min=75) == ["P011", "P012"]
+
+    response = await test_client.get(
+        "/patients", params={"age_min": 60, "page_size": 2, "count": "estimated"}
+    )
+    assert response.json()["total"] == 5
+    assert response.json()["count_mode"] == "exact"
+
+    response = await test_client.get("/patients/export", params={"gender": "Female"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["patientID"] for r in rows] == ["P001", "P004", "P007", "P010"]
+
+    response = await test_client.get("/patients", params={"age_min": 50, "age_max": 40})
+    assert response.status_code == 400
+    assert (await test_client.get("/patients", params={"gender": "Unknown"})).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_patients_facets(test_client, test_session, test_engine):
+    """Test facets count all filtered matches in the same statement as the page."""
+    conditions = ["Asthma", "Asthma", "Diabetes"]
+    genders = ["Male", "Female", "Other", "Female"]
+    for i in range(1, 13):
+        test_session.add(
+            Patient(
+                patient_id=f"P{i:03d}",
+                name=f"Patient {i:03d}",
+                age=30 + i,
+                gender=genders[i % 4],
+                medical_condition=conditions[i % 3],
+                last_visit=date(2024, 1, 1),
+            )
+        )
+    await test_session.commit()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await test_client.get(
+            "/patients",
+            params={"facets": "medicalCondition,gender", "page_size": 2, "age_min": 35},
+        )
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+    assert len(statements) == 1
+    data = response.json()
+    assert len(data["items"]) == 2
+    assert data["facets"] == {
+        "gender": {"Female": 4, "Male": 2, "Other": 2},
+        "medicalCondition": {"Asthma": 5, "Diabetes": 3},
+    }
+    assert list(data["facets"]["gender"]) == ["Female", "Male", "Other"]
+
+    # Past the last page the facets still describe every match
+    response = await test_client.get(
+        "/patients", params={"facets": "gender", "page": 9, "search": "Patient 00"}
+    )
+    assert response.json()["items"] == []
+    assert response.json()["facets"] == {"gender": {"Female": 5, "Male": 2, "Other": 2}}
+
+    response = await test_client.get("/patients")
+    assert response.json()["facets"] is None
+    response = await test_client.get("/patients", params={"facets": "age"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_patient_stats_follow_writes(test_client, test_session):
+    """Test /patients/stats reflects creates, updates, deletes and bulk writes."""
+    response = await test_client.get("/patients/stats")
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+    assert response.json()["updated_at"] is None
+
+    await test_client.post(
+        "/patients",
+        json={
+            "patientID": "P001",
+            "name": "Ann",
+            "age": 34,
+            "gender": "Female",
+            "medicalCondition": "Migraine",
+            "lastVisit": date.today().isoformat(),
+        },
+    )
+    await test_client.post(
+        "/patients/bulk",
+        json=[_bulk_row("P002", "Bea"), _bulk_row("P003", "Cal")],
+    )
+    await test_client.put("/patients/P003", json={"gender": "Male", "age": 71})
+    await test_client.delete("/patients/P002")
+
+    stats = (await test_client.get("/patients/stats")).json()
+    assert stats["total"] == 2
+    assert stats["gender"] == {"Female": 1, "Male": 1}
+    assert stats["top_conditions"] == [
+        {"bucket": "Asthma", "count": 1},
+        {"bucket": "Migraine", "count": 1},
+    ]
+    assert stats["age_histogram"] == [
+        {"bucket": "30-39", "count": 1},
+        {"bucket": "70-79", "count": 1},
+    ]
+    assert [b["bucket"] for b in stats["visit_recency"]] == [
+        "0-3 months", "3-6 months", "6-12 months", "12+ months"
+    ]
+    assert stats["visit_recency"][0]["count"] >= 1
+    assert sum(b["count"] for b in stats["visit_recency"]) == 2
+    assert stats["updated_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_patient_changes_delta_sync(test_client, test_session):
+    """Test /patients/changes pages through writes and tombstones after a watermark."""
+    for i in range(1, 4):
+        test_session.add(
+            Patient(
+                patient_id=f"P{i:03d}",
+                name=f"Patient {i:03d}",
+                age=40,
+                gender="Other",
+                medical_condition="Checkup",
+                last_visit=date(2024, 1, 1),
+            )
+        )
+    await test_session.commit()
+
+    async def sync(since=None, limit=2):
+        params = {"limit": limit, **({"since": since} if since else {})}
+        response = await test_client.get("/patients/changes", params=params)
+        assert response.status_code == 200
+        return response.json()
+
+    # Initial full sync in pages of two
+    first = await sync()
+    assert [p["patientID"] for p in first["changes"]] == ["P001", "P002"]
+    assert first["has_more"] is True
+    second = await sync(first["next_since"])
+    assert [p["patientID"] for p in second["changes"]] == ["P003"]
+    assert second["deleted"] == []
+    assert second["has_more"] is False
+    idle = await sync(second["next_since"])
+    assert idle["changes"] == [] and idle["deleted"] == []
+    assert idle["next_since"] == second["next_since"]
+
+    await test_session.execute(
+        update(Patient)
+        .where(Patient.patient_id == "P001")
+        .values(name="Renamed")
+    )
+    await test_session.commit()
+    patient_pk = (await test_client.get("/patients/P002")).json()["id"]
+    await test_client.delete("/patients/P002")
+
+    delta = await sync(idle["next_since"])
+    assert [(p["patientID"], p["name"]) for p in delta["changes"]] == [("P001", "Renamed")]
+    assert [(d["id"], d["patientID"]) for d in delta["deleted"]] == [(patient_pk, "P002")]
+    assert (await sync(delta["next_since"]))["deleted"] == []
+
+    # Tokens from the former (updated_at, id, deletion id) watermark are rejected
+    legacy_token = base64.urlsafe_b64encode(b'["2025-01-01T12:00:03",3,0]').decode()
+    for token in ("not-a-token", legacy_token):
+        response = await test_client.get("/patients/changes", params={"since": token})
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_patient_writes_publish_events(test_client):
+    """Test single, bulk and batch writes publish change events after commit."""
+    subscription = patient_event_broker.subscribe()
+    try:
+        await test_client.post("/patients", json=_bulk_row("P001", "Patient P001"))
+        await test_client.put("/patients/P001", json={"name": "Renamed"})
+        await test_client.post(
+            "/patients/bulk", json=[_bulk_row("P002", "Patient P002"), _bulk_row("P003", "Patient P003")]
+        )
+        await test_client.post(
+            "/patients/_batch",
+            json={"atomic": False, "operations": [
+                {"op": "delete", "patientID": "P002"},
+                {"op": "delete", "patientID": "P404"},
+            ]},
+        )
+        await test_client.delete("/patients/P001")
+        # A rejected write publishes nothing
+        await test_client.post("/patients", json=_bulk_row("P003", "Patient P003"))
+
+        events = []
+        while not subscription._queue.empty():
+            events.append(await subscription.get())
+    finally:
+        patient_event_broker.unsubscribe(subscription)
+
+    assert [(e["type"], e["patientID"]) for e in events] == [
+        ("created", "P001"),
+        ("updated", "P001"),
+        ("created", "P002"),
+        ("created", "P003"),
+        ("deleted", "P002"),
+        ("deleted", "P001"),
+    ]
+    assert events[0]["id"] == events[1]["id"] == events[-1]["id"]
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_writes(test_client, test_session):
+    """Test POST and PUT retried with the same Idempotency-Key write once."""
+    payload = _bulk_row("P001", "Jane Doe")
+    headers = {"Idempotency-Key": "create-p001"}
+
+    first = await test_client.post("/patients", json=payload, headers=headers)
+    retry = await test_client.post("/patients", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    # Without the key the same request conflicts
+    assert (await test_client.post("/patients", json=payload)).status_code == 409
+
+    # Reusing the key for another request is rejected
+    other = await test_client.post("/patients", json=_bulk_row("P002", "Other"), headers=headers)
+    assert other.status_code == 422
+
+    # A retried update is not applied twice: a later change is not overwritten
+    update_headers = {"Idempotency-Key": "rename-1"}
+    await test_client.put("/patients/P001", json={"name": "First"}, headers=update_headers)
+    await test_client.put("/patients/P001", json={"name": "Second"})
+    replayed = await test_client.put(
+        "/patients/P001", json={"name": "First"}, headers=update_headers
+    )
+    assert replayed.json()["name"] == "First"
+    assert (await test_client.get("/patients/P001")).json()["name"] == "Second"
+
+    # The key also covers If-Match: the same body under another precondition
+    # is a different request, not a retry
+    etag = (await test_client.get("/patients/P001")).headers["ETag"]
+    guarded_headers = {"Idempotency-Key": "rename-2", "If-Match": etag}
+    third = {"name": "Third"}
+    guarded = await test_client.put("/patients/P001", json=third, headers=guarded_headers)
+    assert guarded.status_code == 200
+    for retry_headers in ({"If-Match": '"stale"'}, {}):
+        retry_headers["Idempotency-Key"] = "rename-2"
+        retry = await test_client.put("/patients/P001", json=third, headers=retry_headers)
+        assert retry.status_code == 422
+    retry = await test_client.put("/patients/P001", json=third, headers=guarded_headers)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    # 4xx responses are replayed too
+    missing_headers = {"Idempotency-Key": "missing-1"}
+    await test_client.put("/patients/P404", json={"name": "X"}, headers=missing_headers)
+    missing = await test_client.put("/patients/P404", json={"name": "X"}, headers=missing_headers)
+    assert missing.status_code == 404
+    assert missing.headers["Idempotent-Replayed"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_update_if_match_version(test_client, test_session):
+    """Test PUT with If-Match applies only on the current version, else 412."""
+    created = await test_client.post("/patients", json=_bulk_row("P001", "Jane Doe"))
+    etag = created.headers["ETag"]
+    assert (await test_client.get("/patients/P001")).headers["ETag"] == etag
+
+    updated = await test_client.put(
+        "/patients/P001", json={"name": "First"}, headers={"If-Match": etag}
+    )
+    assert updated.status_code == 200
+    new_etag = updated.headers["ETag"]
+    assert new_etag != etag
+
+    # A concurrent editor still holding the old ETag loses without overwriting
+    stale = await test_client.put(
+        "/patients/P001", json={"name": "Lost"}, headers={"If-Match": etag}
+    )
+    assert stale.status_code == 412
+    weak = await test_client.put(
+        "/patients/P001", json={"name": "Lost"}, headers={"If-Match": f"W/{new_etag}"}
+    )
+    assert weak.status_code == 412
+    assert (await test_client.get("/patients/P001")).json()["name"] == "First"
+
+    # Any listed tag may match; "*" only requires the patient to exist
+    both = await test_client.put(
+        "/patients/P001", json={"age": 50}, headers={"If-Match": f"{etag}, {new_etag}"}
+    )
+    assert both.status_code == 200
+    assert (await test_client.put(
+        "/patients/P001", json={"age": 51}, headers={"If-Match": "*"}
+    )).status_code == 200
+    missing = await test_client.put(
+        "/patients/P404", json={"age": 51}, headers={"If-Match": etag}
+    )
+    assert missing.status_code == 404
+
+    # Bulk upserts bump the version too
+    current = (await test_client.get("/patients/P001")).headers["ETag"]
+    await test_client.post(
+        "/patients/bulk",
+        params={"on_conflict": "update"},
+        json=[_bulk_row("P001", "Bulk")],
+    )
+    assert (await test_client.put(
+        "/patients/P001", json={"name": "Late"}, headers={"If-Match": current}
+    )).status_code == 412
+
+
+@pytest.mark.asyncio
+async def test_import_patients_upload(test_client, test_session):
+    """Test POST /patients/import stages, merges and reports per-row rejects."""
+    await test_client.post("/patients", json=_bulk_row("P001", "Existing"))
+    export = await test_client.get("/patients/export", params={"format": "csv"})
+    upload = export.text + (
+        "0,P002,New,30,Male,Flu,2024-03-01\n"
+        "0,P003,Bad,-5,Male,Flu,2024-03-01\n"
+        "0,P002,Again,31,Male,Flu,2024-03-01\n"
+    )
+
+    response = await test_client.post(
+        "/patients/import", params={"format": "csv"}, content=upload.encode()
+    )
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["received"], summary["created"], summary["updated"]) == (4, 1, 1)
+    assert summary["rejected"] == 2
+    assert [(r["row"], r["patientID"]) for r in summary["rejects"]] == [(3, "P003"), (4, "P002")]
+    assert summary["rows_per_second"] > 0
+    assert (await test_client.get("/patients/P002")).json()["name"] == "New"
+
+    # Re-running with skip leaves existing rows alone
+    rerun = await test_client.post(
+        "/patients/import",
+        params={"format": "csv", "on_conflict": "skip"},
+        content=upload.encode(),
+    )
+    assert (rerun.json()["created"], rerun.json()["skipped"]) == (0, 2)
+
+
+@pytest.mark.asyncio
+async def test_import_reads_upload_before_using_the_database(test_session):
+    """Test no connection or transaction is held while the upload is still arriving."""
+    await test_session.commit()
+
+    async def slow_upload():
+        for number in range(1, 4):
+            assert not test_session.in_transaction()
+            patient = PatientCreate(**_bulk_row(f"P00{number}", "Imported"))
+            yield ImportBatch(rows=[(number, patient)])
+
+    summary = await import_patients(test_session, slow_upload())
+
+    assert (summary["received"], summary["created"]) == (3, 3)
+    assert not test_session.in_transaction()
+
+
+@pytest.mark.asyncio
+async def test_suggest_patients(test_client, test_session):
+    """Test typeahead returns patientID then name prefix matches, without a count."""
+    for patient_id, name in [
+        ("P100", "Alice Parker"),
+        ("P101", "Bob Stone"),
+        ("PA_1", "Paula Green"),
+        ("Q200", "peter pan"),
+    ]:
+        test_session.add(
+            Patient(
+                patient_id=patient_id,
+                name=name,
+                age=40,
+                gender="Other",
+                medical_condition="Checkup",
+                last_visit=date(2024, 1, 1),
+            )
+        )
+    await test_session.commit()
+
+    response = await test_client.get("/patients/suggest", params={"q": "p"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"patientID": "P100", "name": "Alice Parker"},
+        {"patientID": "P101", "name": "Bob Stone"},
+        {"patientID": "PA_1", "name": "Paula Green"},
+        {"patientID": "Q200", "name": "peter pan"},
+    ]
+
+    response = await test_client.get("/patients/suggest", params={"q": "Pa_", "limit": 5})
+    assert response.json() == [{"patientID": "PA_1", "name": "Paula Green"}]
+
+    response = await test_client.get("/patients/suggest", params={"q": "p", "limit": 2})
+    assert [s["patientID"] for s in response.json()] == ["P100", "P101"]
+
+    assert (await test_client.get("/patients/suggest", params={"q": " "})).json() == []
+    response = await test_client.get("/patients/suggest", params={"q": "p", "limit": 0})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets(test_client, test_session, test_engine):
+    """Test fields= narrows the SELECT list and the response on list and detail reads."""
+    await _seed_patients(test_session, 3)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await test_client.get(
+            "/patients", params={"fields": "name,patientID", "page_size": 2}
+        )
+        detail = await test_client.get("/patients/P003", params={"fields": "name"})
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+    data = response.json()
+    assert data["items"] == [
+        {"patientID": "P001", "name": "Patient 001"},
+        {"patientID": "P002", "name": "Patient 002"},
+    ]
+    assert data["next_cursor"] is not None
+    assert detail.json() == {"name": "Patient 003"}
+    assert all("medical_condition" not in s for s in statements)
+
+    # The cursor still works with a sparse fieldset
+    response = await test_client.get(
+        "/patients", params={"fields": "name", "cursor": data["next_cursor"]}
+    )
+    assert response.json()["items"] == [{"name": "Patient 003"}]
+
+    # A cached full record is narrowed too, under a representation-specific ETag
+    full = await test_client.get("/patients/P003")
+    detail = await test_client.get("/patients/P003", params={"fields": "name"})
+    assert detail.json() == {"name": "Patient 003"}
+    assert detail.headers["ETag"] != full.headers["ETag"]
+
+    for path in ("/patients", "/patients/P001"):
+        response = await test_client.get(path, params={"fields": "name,ssn"})
+        assert response.status_code == 400
+        assert "ssn" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_export_patients_ndjson_and_csv(test_client, test_session):
+    """Test exports stream every matching row with camelCase fields."""
+    await _seed_patients(test_session, 12)
+
+    response = await test_client.get(
+        "/patients/export", params={"search": "Patient 01", "sort_order": "desc"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["patientID"] for r in rows] == ["P012", "P011", "P010"]
+    assert set(rows[0]) == {
+        "id", "patientID", "name", "age", "gender", "medicalCondition", "lastVisit"
+    }
+    assert rows[0]["lastVisit"] == "2024-01-01"
+
+    response = await test_client.get("/patients/export", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    records = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(records) == 12
+    assert records[0]["patientID"] == "P001"
+    assert records[0]["medicalCondition"] == "Checkup"
+
+    response = await test_client.get(
+        "/patients/export", params={"format": "csv", "search": "nobody"}
+    )
+    assert response.text.strip() == "id,patientID,name,age,gender,medicalCondition,lastVisit"
+
+
+def _bulk_row(patient_id: str, name: str) -> dict:
+    """Build a camelCase PatientCreate payload for bulk tests."""
+    return {
+        "patientID": patient_id,
+        "name": name,
+        "age": 33,
+        "gender": "Female",
+        "medicalCondition": "Asthma",
+        "lastVisit": "2024-06-01",
+    }
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_patients_conflict_modes(test_client, test_session):
+    """Test bulk writes report per-row outcomes for skip, update and fail."""
+    await _seed_patients(test_session, 2)
+    payload = [
+        _bulk_row("P001", "Updated One"),
+        _bulk_row("B001", "Bulk One"),
+        _bulk_row("B001", "Bulk One Again"),
+        _bulk_row("B002", "Bulk Two"),
+    ]
+
+    response = await test_client.post("/patients/bulk?on_conflict=skip", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["updated"], data["skipped"]) == (2, 0, 2)
+    assert [r["status"] for r in data["results"]] == ["skipped", "created", "duplicate", "created"]
+    assert data["results"][1]["id"] is not None
+    assert (await test_client.get("/patients/P001")).json()["name"] == "Patient 001"
+
+    payload = [_bulk_row("P001", "Updated One"), _bulk_row("B003", "Bulk Three")]
+    response = await test_client.post("/patients/bulk?on_conflict=update", json=payload)
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["updated", "created"]
+    assert (await test_client.get("/patients/P001")).json()["name"] == "Updated One"
+
+    payload = [_bulk_row("B004", "Bulk Four"), _bulk_row("P002", "Clash")]
+    response = await test_client.post("/patients/bulk", json=payload)
+    assert response.status_code == 409
+    statuses = [r["status"] for r in response.json()["detail"]["results"]]
+    assert statuses == ["rolled_back", "conflict"]
+    assert (await test_client.get("/patients/B004")).status_code == 404
+    assert (await test_client.get("/patients")).json()["total"] == 5
+
+
+@pytest.mark.asyncio
+async def test_batch_operations_best_effort(test_client, test_session):
+    """Test best-effort batches apply what they can and report the rest."""
+    await _seed_patients(test_session, 3)
+    operations = [
+        {"op": "create", "data": _bulk_row("B001", "Batch One")},
+        {"op": "create", "data": _bulk_row("P001", "Clash")},
+        {"op": "update", "patientID": "P002", "data": {"name": "Batch Renamed"}},
+        {"op": "update", "patientID": "P003", "data": {"patientID": "P001"}},
+        {"op": "update", "patientID": "P404", "data": {"age": 9}},
+        {"op": "delete", "patientID": "P003"},
+        {"op": "delete", "patientID": "P404"},
+    ]
+
+    response = await test_client.post(
+        "/patients/_batch", json={"atomic": False, "operations": operations}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is True
+    assert [r["status"] for r in data["results"]] == [
+        "ok", "conflict", "ok", "conflict", "not_found", "ok", "not_found"
+    ]
+    assert data["results"][2]["patient"]["name"] == "Batch Renamed"
+
+    assert (await test_client.get("/patients/B001")).status_code == 200
+    assert (await test_client.get("/patients/P002")).json()["name"] == "Batch Renamed"
+    assert (await test_client.get("/patients/P003")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_batch_operations_atomic_rolls_back(test_client, test_session):
+    """Test an atomic batch is rolled back entirely when one operation fails."""
+    await _seed_patients(test_session, 2)
+    operations = [
+        {"op": "delete", "patientID": "P001"},
+        {"op": "update", "patientID": "P404", "data": {"name": "Ghost"}},
+        {"op": "create", "data": _bulk_row("B001", "Never Written")},
+    ]
+
+    response = await test_client.post("/patients/_batch", json={"operations": operations})
+    assert response.status_code == 409
+    report = response.json()["detail"]
+    assert report["committed"] is False
+    assert [r["status"] for r in report["results"]] == ["rolled_back", "not_found", "skipped"]
+
+    assert (await test_client.get("/patients/P001")).status_code == 200
+    assert (await test_client.get("/patients/B001")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_write_endpoints_issue_one_statement_each(test_client, test_session, test_engine):
+    """Test every write endpoint costs one SQL statement (plus commit) with unchanged codes."""
+    await _seed_patients(test_session, 2)
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    requests = [
+        ("post", "/patients", _bulk_row("W001", "Write One"), 201),
+        ("post", "/patients", _bulk_row("W001", "Write One"), 409),
+        ("put", "/patients/W001", {"name": "Write Renamed"}, 200),
+        ("put", "/patients/W001", {"patientID": "P001"}, 409),
+        ("put", "/patients/P404", {"name": "Nobody"}, 404),
+        ("delete", "/patients/W001", None, 204),
+        ("delete", "/patients/W001", None, 404),
+    ]
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        for method, url, body, expected_status in requests:
+            statements.clear()
+            kwargs = {"json": body} if body is not None else {}
+            response = await getattr(test_client, method)(url, **kwargs)
+            assert response.status_code == expected_status, (method, url)
+            assert len(statements) == 1, (method, url, statements)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
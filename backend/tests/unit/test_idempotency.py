@@ -0,0 +1,70 @@
+"""Unit tests for the Idempotency-Key replay store."""
+
+import asyncio
+
+import pytest
+
+from app.services.idempotency import IdempotencyKeyReusedError, IdempotencyStore, StoredResponse
+
+
+class CountingWrite:
+    """Stand-in for a write endpoint that records how often it runs."""
+
+    def __init__(self, status_code: int = 201, delay: float = 0):
+        self.calls = 0
+        self.status_code = status_code
+        self.delay = delay
+
+    async def __call__(self) -> StoredResponse:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return StoredResponse(status_code=self.status_code, body=b'{"id":%d}' % self.calls)
+
+
+@pytest.mark.asyncio
+async def test_retry_replays_first_response():
+    """Test a repeated key runs the write once and replays its response."""
+    store = IdempotencyStore(maxsize=10, ttl=60)
+    write = CountingWrite()
+
+    first, first_replayed = await store.run("k1", "req", write)
+    second, second_replayed = await store.run("k1", "req", write)
+
+    assert write.calls == 1
+    assert second == first
+    assert (first_replayed, second_replayed) == (False, True)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_retry_waits_for_original():
+    """Test a retry arriving mid-flight waits instead of writing again."""
+    store = IdempotencyStore(maxsize=10, ttl=60)
+    write = CountingWrite(delay=0.01)
+
+    results = await asyncio.gather(store.run("k1", "req", write), store.run("k1", "req", write))
+
+    assert write.calls == 1
+    assert sorted(replayed for _, replayed in results) == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_different_request_is_rejected():
+    """Test a key cannot be replayed against a different request."""
+    store = IdempotencyStore(maxsize=10, ttl=60)
+    await store.run("k1", "create P001", CountingWrite())
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        await store.run("k1", "create P002", CountingWrite())
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_not_stored():
+    """Test a 5xx response lets the retry execute again."""
+    store = IdempotencyStore(maxsize=10, ttl=60)
+    write = CountingWrite(status_code=500)
+
+    await store.run("k1", "req", write)
+    _, replayed = await store.run("k1", "req", write)
+
+    assert write.calls == 2
+    assert replayed is False
@@ -0,0 +1,79 @@
+"""Unit tests for the incremental db.json reader."""
+
+import io
+import json
+
+import pytest
+
+from scripts.migrate_db_json import JsonArrayStream
+
+DOCUMENT = {
+    "meta": {"note": "skip me", "tags": ["a", "b"], "ids": [1, 2]},
+    "patients": [
+        {"patientID": "P001", "name": "Doe, Jane", "age": 45, "lastVisit": "2024-01-15"},
+        {"patientID": "P002", "name": "Quote \" and \\u00e9 é", "age": 7},
+        {"patientID": "P003", "nested": {"list": [1.5, -2e3, True, None]}},
+    ],
+    "after": [{"patientID": "ignored"}],
+}
+
+
+def _read(text: str, chunk_size: int, key: str = "patients") -> list:
+    """Read every element of the array under key."""
+    stream = JsonArrayStream(io.StringIO(text), chunk_size=chunk_size)
+    stream.seek_array(key)
+    return list(stream.items())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_tokens_split_across_chunks(chunk_size):
+    """Test every chunk boundary yields the same elements as json.loads."""
+    text = json.dumps(DOCUMENT, indent=2)
+    assert _read(text, chunk_size) == DOCUMENT["patients"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 6])
+def test_number_at_buffer_end_is_not_truncated(chunk_size):
+    """Test a number cut off by the end of a chunk is completed from the next one."""
+    assert _read("[12345,-6.25e1, 789]", chunk_size, key="") == [12345, -62.5, 789]
+
+
+def test_number_at_end_of_file():
+    """Test a top-level number ending exactly at EOF is still decoded."""
+    stream = JsonArrayStream(io.StringIO("12345"), chunk_size=3)
+    assert stream._value() == 12345
+
+
+def test_top_level_array_is_read_as_is():
+    """Test a document that is itself an array needs no key."""
+    patients = DOCUMENT["patients"]
+    assert _read(json.dumps(patients), chunk_size=5, key="anything") == patients
+    assert _read("  [ ]  ", chunk_size=2) == []
+
+
+@pytest.mark.parametrize("text", ['"patients"', "42", "null", ""])
+def test_non_container_top_level_is_rejected(text):
+    """Test a document that is neither an object nor an array fails."""
+    with pytest.raises(ValueError):
+        _read(text, chunk_size=4)
+
+
+def test_key_holding_a_non_array_is_rejected():
+    """Test the key must hold an array."""
+    with pytest.raises(ValueError, match="Expected '\\['"):
+        _read('{"patients": {"P001": {}}}', chunk_size=4)
+
+
+def test_missing_key_is_rejected():
+    """Test a document without the key fails after skipping every other value."""
+    text = json.dumps({key: value for key, value in DOCUMENT.items() if key != "patients"})
+    with pytest.raises(ValueError, match='No "patients" array'):
+        _read(text, chunk_size=5)
+    with pytest.raises(ValueError, match='No "patients" array'):
+        _read("{}", chunk_size=5)
+
+
+def test_extra_keys_are_skipped():
+    """Test keys before and after the array are ignored, including look-alike values."""
+    text = json.dumps({"users": ["patients"], "patientsCount": 1, **DOCUMENT})
+    assert _read(text, chunk_size=3) == DOCUMENT["patients"]
@@ -0,0 +1,68 @@
+"""Unit tests for the patient event broker."""
+
+import pytest
+
+from app.services.patient_events import RESYNC_EVENT, PatientEventBroker
+
+
+def _drain(subscription) -> list[dict]:
+    """Return every event currently queued for a subscription."""
+    events = []
+    while not subscription._queue.empty():
+        events.append(subscription._queue.get_nowait())
+    return events
+
+
+@pytest.mark.asyncio
+async def test_broker_fans_out_to_every_subscriber():
+    """Test each subscriber receives published events in order."""
+    broker = PatientEventBroker(queue_size=8)
+    first, second = broker.subscribe(), broker.subscribe()
+    events = [{"type": "created", "id": 1}, {"type": "deleted", "id": 1}]
+
+    broker.publish(events)
+
+    assert _drain(first) == events
+    assert _drain(second) == events
+    broker.unsubscribe(first)
+    broker.publish(events[:1])
+    assert _drain(first) == []
+    assert broker.subscriber_count == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_collapsed_to_resync():
+    """Test a full queue is replaced by one resync event instead of growing."""
+    broker = PatientEventBroker(queue_size=3)
+    slow = broker.subscribe()
+
+    broker.publish([{"type": "updated", "id": i} for i in range(10)])
+
+    queued = _drain(slow)
+    assert len(queued) <= 3
+    assert RESYNC_EVENT in queued
+
+
+@pytest.mark.asyncio
+async def test_broker_limits_subscribers():
+    """Test subscribe raises once max_subscribers are connected."""
+    broker = PatientEventBroker(max_subscribers=1)
+    broker.subscribe()
+
+    with pytest.raises(OverflowError):
+        broker.subscribe()
+
+
+@pytest.mark.asyncio
+async def test_events_yield_keepalive_and_unsubscribe_on_close():
+    """Test idle streams yield None and closing the stream unsubscribes."""
+    broker = PatientEventBroker()
+    stream = broker.events(broker.subscribe(), keepalive=0.01)
+
+    assert await stream.__anext__() is None
+    broker.publish([{"type": "created", "id": 1}])
+    assert await stream.__anext__() == {"type": "created", "id": 1}
+
+    await stream.aclose()
+    assert broker.subscriber_count == 0
+
@@ -0,0 +1,117 @@
+"""Unit tests for streaming import parsing and validation."""
+
+import pytest
+
+from app.services.patient_import import MAX_RECORD_LINES, read_patient_batches
+
+CSV_UPLOAD = (
+    "\ufeffid,patientID,name,age,gender,medicalCondition,lastVisit\r\n"
+    '1,P001,"Doe, Jane",45,Female,"Asthma\nmild",2024-01-15\r\n'
+    "2,P002,John,0,Male,Flu,2024-01-15\r\n"
+    "3,P003,Short,row\r\n"
+    "\r\n"
+    "4,P004,Ann,30,Other,Flu,2024-02-01"
+).encode()
+
+
+async def _chunks(data: bytes, size: int):
+    """Split data into fixed-size chunks, as an upload would arrive."""
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def _read_all(data: bytes, fmt: str, size: int = 7, batch_rows: int = 2):
+    """Collect rows and rejects across every yielded batch."""
+    rows, rejects, batches = [], [], 0
+    async for batch in read_patient_batches(_chunks(data, size), fmt, batch_rows):
+        batches += 1
+        rows.extend(batch.rows)
+        rejects.extend(batch.rejects)
+    return rows, rejects, batches
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 7, 4096])
+async def test_csv_records_survive_any_chunking(size):
+    """Test quoted commas and line breaks parse the same whatever the chunk size."""
+    rows, rejects, _ = await _read_all(CSV_UPLOAD, "csv", size=size)
+
+    assert [(n, p.patientID) for n, p in rows] == [(1, "P001"), (4, "P004")]
+    assert rows[0][1].name == "Doe, Jane"
+    assert rows[0][1].medicalCondition == "Asthma\nmild"
+    assert [(r.row, r.patientID) for r in rejects] == [(2, "P002"), (3, None)]
+    assert "age" in rejects[0].error
+    assert "columns" in rejects[1].error
+
+
+@pytest.mark.asyncio
+async def test_ndjson_rejects_bad_lines_and_batches():
+    """Test invalid JSON and non-objects are rejected and batches stay bounded."""
+    upload = (
+        b'{"patientID":"P001","name":"A","age":1,"gender":"Male",'
+        b'"medicalCondition":"C","lastVisit":"2024-01-01"}\n'
+        b"not json\n"
+        b"[1, 2]\n"
+        b'{"patientID":"P002"}\n'
+    )
+
+    rows, rejects, batches = await _read_all(upload, "ndjson", batch_rows=2)
+
+    assert [p.patientID for _, p in rows] == ["P001"]
+    assert [r.row for r in rejects] == [2, 3, 4]
+    assert rejects[2].patientID == "P002"
+    assert batches == 2
+
+
+@pytest.mark.asyncio
+async def test_unterminated_quote_is_rejected():
+    """Test a quoted field left open at end of file becomes a reject."""
+    upload = (
+        b"patientID,name,age,gender,medicalCondition,lastVisit\n"
+        b'P001,"Open,1,Male,C,2024-01-01\n'
+    )
+
+    rows, rejects, _ = await _read_all(upload, "csv")
+
+    assert rows == []
+    assert rejects[0].error == "Unterminated quoted field"
+
+
+@pytest.mark.asyncio
+async def test_stray_quote_costs_one_record():
+    """Test a quote that never closes rejects its record and the rest still import."""
+    valid = b"P%03d,Name,40,Other,Checkup,2024-01-01\n"
+    upload = (
+        b"patientID,name,age,gender,medicalCondition,lastVisit\n"
+        + valid % 1
+        + b'P002,"Open,40,Other,Checkup,2024-01-01\n'
+        + b"".join(valid % number for number in range(3, MAX_RECORD_LINES + 10))
+    )
+
+    rows, rejects, _ = await _read_all(upload, "csv", size=4096, batch_rows=1000)
+
+    assert [(r.row, r.error) for r in rejects] == [(2, "Unterminated quoted field")]
+    assert [p.patientID for _, p in rows] == ["P001"] + [
+        f"P{number:03d}" for number in range(3, MAX_RECORD_LINES + 10)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_only_newline_ends_a_line():
+    """Test separators str.splitlines would break on stay inside a record."""
+    # JSON strings may hold U+2028/U+2029/U+0085 raw, but not ASCII controls
+    json_name = "Line\u2028Para\u2029Next\x85End"
+    csv_name = json_name + "\x0bTab\x0cFeed\x1cFile"
+    ndjson = (
+        '{"patientID":"P001","name":"%s","age":40,"gender":"Other",'
+        '"medicalCondition":"C","lastVisit":"2024-01-01"}\n' % json_name
+    )
+    csv_upload = (
+        "patientID,name,age,gender,medicalCondition,lastVisit\n"
+        f"P001,{csv_name},40,Other,C,2024-01-01\n"
+    )
+
+    for upload, fmt, name in ((ndjson, "ndjson", json_name), (csv_upload, "csv", csv_name)):
+        rows, rejects, _ = await _read_all(upload.encode(), fmt)
+        assert rejects == []
+        assert [p.name for _, p in rows] == [name]
@@ -0,0 +1,87 @@
+"""Unit tests for the in-process query cache."""
+
+from app.services.query_cache import MISSING, QueryCache
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_query_cache_hit_and_miss_counters():
+    """Test hits and misses are counted and None is a cacheable value."""
+    cache = QueryCache(maxsize=4, ttl=10)
+
+    assert cache.get("P001") is MISSING
+    cache.set("P001", None)
+    assert cache.get("P001") is None
+
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_query_cache_evicts_least_recently_used():
+    """Test the least recently used entry is evicted when full."""
+    cache = QueryCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_query_cache_entries_expire_after_ttl():
+    """Test entries are dropped once their TTL has passed."""
+    clock = FakeClock()
+    cache = QueryCache(maxsize=2, ttl=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is MISSING
+    assert cache.stats()["size"] == 0
+
+
+def test_query_cache_invalidate_and_disable():
+    """Test single-key invalidation and that maxsize=0 stores nothing."""
+    cache = QueryCache(maxsize=2, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is MISSING
+    assert cache.get("b") == 2
+
+    disabled = QueryCache(maxsize=0, ttl=5)
+    disabled.set("a", 1)
+    assert disabled.get("a") is MISSING
+
+
+def test_query_cache_drops_value_read_before_invalidation():
+    """Test set() skips a value computed before an invalidation."""
+    cache = QueryCache(maxsize=4, ttl=5)
+    generation = cache.generation
+    assert cache.get("a") is MISSING
+    cache.clear()  # a write commits while the reader awaits the database
+    cache.set("a", "stale", generation)
+    assert cache.get("a") is MISSING
+    assert cache.stats()["stale_sets"] == 1
+
+    generation = cache.generation
+    cache.set("a", "fresh", generation)
+    assert cache.get("a") == "fresh"
+
+    generation = cache.generation
+    cache.invalidate("b")
+    cache.set("a", "stale", generation)
+    assert cache.get("a") == "fresh"